@@ -14,4 +14,6 @@ api_router.include_router(inventory_router.router, prefix="/inventory", tags=["i
 from app.api.v1.endpoints import category_router
 api_router.include_router(category_router.router, prefix="/category", tags=["category"])
 from app.api.v1.endpoints import item_router
-api_router.include_router(item_router.router, prefix="/item", tags=["item"])
\ No newline at end of file
+api_router.include_router(item_router.router, prefix="/item", tags=["item"])
+from app.api.v1.endpoints import export_router
+api_router.include_router(export_router.router, prefix="/export", tags=["export"])
\ No newline at end of file
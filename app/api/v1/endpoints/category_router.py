@@ -1,54 +1,156 @@
-from typing import List, Any
+from typing import List, Any, Optional, Union
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.exc import IntegrityError
 
-from app.core.database import get_session
-from app.models.category import Category
+from app.core import config
+from app.core.batch import BatchRequest, BatchResult, batch_get, check_batch_size, parse_ids
+from app.core.database import DBSession, get_session
+from app.core.fields import fields_response, get_fields, parse_fields, select_fields
+from app.core.group_commit import add_and_commit
+from app.core.pagination import CursorPage, paginate
+from app.core.streaming import StreamFormat, stream_response
+from app.exceptions import CategoryCycleError, CategoryNotFoundException, InvalidCursorError, InvalidFieldsError
+from app.models.category import Category, CategoryCreate, CategoryNode, CategoryRollup, CategoryUpdate
+from app.services.category_service import CategoryService
 import logging
 
 router = APIRouter()
 
 @router.post("/", response_model=Category)
 async def create_category(
-    item: Category,
-    session: Session = Depends(get_session)
+    item: CategoryCreate,
+    session: DBSession = Depends(get_session)
 ):
     try:
         logging.info("Create category request")
-        session.add(item)
-        session.commit()
-        session.refresh(item)
-        return item
+        return await add_and_commit(session, Category.model_validate(item.model_dump(exclude_none=True)))
     except Exception as e:
         logging.error(f"Error creating category: {e}")
         raise HTTPException(status_code=500, detail="Failed to create category")
 
+@router.get("/rollup", response_model=List[CategoryRollup])
+async def get_category_rollup(
+    session: DBSession = Depends(get_session)
+):
+    try:
+        logging.info("Category rollup request")
+        return await CategoryService(session).rollup()
+    except Exception as e:
+        logging.error(f"Error getting category rollup: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get category rollup")
+
+@router.get("/batch", response_model=BatchResult[Category])
+async def get_categories_batch(
+    ids: List[str] = Query(..., description="Comma-separated ids; may be repeated"),
+    session: DBSession = Depends(get_session)
+):
+    try:
+        return await batch_get(session, Category, parse_ids(ids, UUID))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error batch getting categories: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get categories")
+
+@router.post("/batch", response_model=BatchResult[Category])
+async def post_categories_batch(
+    batch: BatchRequest[UUID],
+    session: DBSession = Depends(get_session)
+):
+    try:
+        check_batch_size(batch.ids)
+        return await batch_get(session, Category, batch.ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error batch getting categories: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get categories")
+
 @router.get("/{id}", response_model=Category)
 async def get_category(
     id: UUID,
-    session: Session = Depends(get_session)
+    fields: Optional[str] = None,
+    session: DBSession = Depends(get_session)
 ):
     try:
         logging.info(f"Get category request for id: {id}")
-        item = session.get(Category, id)
+        names = parse_fields(Category, fields)
+        item = await get_fields(session, Category, id, names)
         if not item:
             raise HTTPException(status_code=404, detail="Category not found")
-        return item
+        return fields_response(Category, names, item)
+    except HTTPException:
+        raise
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logging.error(f"Error getting category: {e}")
         raise HTTPException(status_code=500, detail="Failed to get category")
 
-@router.get("/", response_model=List[Category])
+@router.get("/{id}/subtree", response_model=List[CategoryNode])
+async def get_category_subtree(
+    id: UUID,
+    max_depth: Optional[int] = None,
+    session: DBSession = Depends(get_session)
+):
+    try:
+        logging.info(f"Get category subtree request for id: {id}")
+        return await CategoryService(session).subtree(id, max_depth)
+    except CategoryNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error getting category subtree: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get category subtree")
+
+@router.get("/{id}/ancestors", response_model=List[CategoryNode])
+async def get_category_ancestors(
+    id: UUID,
+    session: DBSession = Depends(get_session)
+):
+    try:
+        logging.info(f"Get category ancestors request for id: {id}")
+        return await CategoryService(session).ancestors(id)
+    except CategoryNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error getting category ancestors: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get category ancestors")
+
+@router.get("/{id}/descendants/count")
+async def count_category_descendants(
+    id: UUID,
+    session: DBSession = Depends(get_session)
+):
+    try:
+        logging.info(f"Count category descendants request for id: {id}")
+        return {"id": id, "count": await CategoryService(session).descendant_count(id)}
+    except CategoryNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error counting category descendants: {e}")
+        raise HTTPException(status_code=500, detail="Failed to count category descendants")
+
+@router.get("/", response_model=Union[List[Category], CursorPage[Category]])
 async def list_categorys(
     skip: int = 0,
-    limit: int = 100,
-    session: Session = Depends(get_session)
+    limit: int = Query(100, ge=1, le=config.settings.PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: Optional[StreamFormat] = None,
+    session: DBSession = Depends(get_session)
 ):
     try:
         logging.info("List categories request")
-        statement = select(Category).offset(skip).limit(limit)
-        return session.exec(statement).all()
+        names = parse_fields(Category, fields)
+        statement = select_fields(Category, names, (Category.name, Category.id))
+        if stream is not None:
+            return stream_response(session, Category, names, statement, stream)
+        if cursor is not None:
+            return fields_response(Category, names, await paginate(session, statement, (Category.name, Category.id), cursor, limit))
+        return fields_response(Category, names, (await session.exec(statement.offset(skip).limit(limit))).all())
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logging.error(f"Error listing categories: {e}")
         raise HTTPException(status_code=500, detail="Failed to list categories")
@@ -56,41 +158,63 @@ async def list_categorys(
 @router.put("/{id}", response_model=Category)
 async def update_category(
     id: UUID,
-    item_update: Category,
-    session: Session = Depends(get_session)
+    item_update: CategoryCreate,
+    session: DBSession = Depends(get_session)
 ):
     try:
         logging.info(f"Update category request for id: {id}")
-        db_item = session.get(Category, id)
-        if not db_item:
-            raise HTTPException(status_code=404, detail="Category not found")
-        
         item_data = {"name": item_update.name, "description": item_update.description, "parent_id": item_update.parent_id}
         item_data = {k: v for k, v in item_data.items() if v is not None}
-        for key, value in item_data.items():
-            setattr(db_item, key, value)
-        
-        session.add(db_item)
-        session.commit()
-        session.refresh(db_item)
+        # An explicit null parent_id moves the category to the root
+        if "parent_id" in item_update.model_fields_set and item_update.parent_id is None:
+            item_data["parent_id"] = None
+        db_item = await CategoryService(session).update(id, item_data)
+        if not db_item:
+            raise HTTPException(status_code=404, detail="Category not found")
         return db_item
+    except HTTPException:
+        raise
+    except CategoryNotFoundException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (CategoryCycleError, IntegrityError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logging.error(f"Error updating category: {e}")
         raise HTTPException(status_code=500, detail="Failed to update category")
 
+@router.patch("/{id}", response_model=Category)
+async def patch_category(
+    id: UUID,
+    item_update: CategoryUpdate,
+    session: DBSession = Depends(get_session)
+):
+    try:
+        logging.info(f"Patch category request for id: {id}")
+        db_item = await CategoryService(session).update(id, item_update.model_dump(exclude_unset=True))
+        if not db_item:
+            raise HTTPException(status_code=404, detail="Category not found")
+        return db_item
+    except HTTPException:
+        raise
+    except CategoryNotFoundException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (CategoryCycleError, IntegrityError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error patching category: {e}")
+        raise HTTPException(status_code=500, detail="Failed to update category")
+
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_category(
     id: UUID,
-    session: Session = Depends(get_session)
+    session: DBSession = Depends(get_session)
 ):
     try:
         logging.info(f"Delete category request for id: {id}")
-        item = session.get(Category, id)
-        if not item:
+        if not await CategoryService(session).delete(id):
             raise HTTPException(status_code=404, detail="Category not found")
-        
-        session.delete(item)
-        session.commit()
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error deleting category: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete category")
@@ -1,68 +1,90 @@
-from typing import List, Any
-from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from typing import List, Any, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 
-from app.core.database import get_session
-from app.models.error import Error
+from app.core import config
+from app.core.database import DBSession, get_session
+from app.core.fields import fields_response, get_fields, parse_fields, select_fields
+from app.core.group_commit import add_and_commit
+from app.core.pagination import CursorPage, paginate
+from app.core.streaming import StreamFormat, stream_response
+from app.core.writes import delete_returning, update_returning
+from app.exceptions import InvalidCursorError, InvalidFieldsError
+from app.models.error import Error, ErrorUpdate
 
 router = APIRouter()
 
 @router.post("/", response_model=Error)
 async def create_error(
     item: Error,
-    session: Session = Depends(get_session)
+    session: DBSession = Depends(get_session)
 ):
-    session.add(item)
-    session.commit()
-    session.refresh(item)
-    return item
+    return await add_and_commit(session, item)
 
 @router.get("/{id}", response_model=Error)
 async def get_error(
-    id: UUID,
-    session: Session = Depends(get_session)
+    id: int,
+    fields: Optional[str] = None,
+    session: DBSession = Depends(get_session)
 ):
-    item = session.get(Error, id)
+    try:
+        names = parse_fields(Error, fields)
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    item = await get_fields(session, Error, id, names)
     if not item:
         raise HTTPException(status_code=404, detail="Error not found")
-    return item
+    return fields_response(Error, names, item)
 
-@router.get("/", response_model=List[Error])
+@router.get("/", response_model=Union[List[Error], CursorPage[Error]])
 async def list_errors(
     skip: int = 0,
-    limit: int = 100,
-    session: Session = Depends(get_session)
+    limit: int = Query(100, ge=1, le=config.settings.PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: Optional[StreamFormat] = None,
+    session: DBSession = Depends(get_session)
 ):
-    statement = select(Error).offset(skip).limit(limit)
-    return session.exec(statement).all()
+    try:
+        names = parse_fields(Error, fields)
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    statement = select_fields(Error, names, (Error.id,))
+    if stream is not None:
+        return stream_response(session, Error, names, statement, stream)
+    if cursor is not None:
+        try:
+            return fields_response(Error, names, await paginate(session, statement, (Error.id,), cursor, limit))
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return fields_response(Error, names, (await session.exec(statement.offset(skip).limit(limit))).all())
 
 @router.put("/{id}", response_model=Error)
 async def update_error(
-    id: UUID,
+    id: int,
     item_update: Error,
-    session: Session = Depends(get_session)
+    session: DBSession = Depends(get_session)
 ):
-    db_item = session.get(Error, id)
+    item_data = item_update.model_dump(exclude_unset=True, exclude={"id"})
+    db_item = await update_returning(session, Error, id, item_data)
+    if not db_item:
+        raise HTTPException(status_code=404, detail="Error not found")
+    return db_item
+
+@router.patch("/{id}", response_model=Error)
+async def patch_error(
+    id: int,
+    item_update: ErrorUpdate,
+    session: DBSession = Depends(get_session)
+):
+    db_item = await update_returning(session, Error, id, item_update.model_dump(exclude_unset=True))
     if not db_item:
         raise HTTPException(status_code=404, detail="Error not found")
-    
-    item_data = item_update.model_dump(exclude_unset=True)
-    db_item.sqlmodel_update(item_data)
-    
-    session.add(db_item)
-    session.commit()
-    session.refresh(db_item)
     return db_item
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_error(
-    id: UUID,
-    session: Session = Depends(get_session)
+    id: int,
+    session: DBSession = Depends(get_session)
 ):
-    item = session.get(Error, id)
-    if not item:
+    if not await delete_returning(session, Error, id):
         raise HTTPException(status_code=404, detail="Error not found")
-    
-    session.delete(item)
-    session.commit()
\ No newline at end of file
@@ -0,0 +1,65 @@
+from typing import Iterator
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+import logging
+import os
+
+from app.core.database import DBSession, get_session
+from app.core.export import ExportJob, ExportRequest, MEDIA_TYPES, file_path, load_job, parse_range, submit_export
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.post("/", response_model=ExportJob, status_code=status.HTTP_202_ACCEPTED)
+async def create_export(
+    request: ExportRequest,
+    session: DBSession = Depends(get_session)
+):
+    try:
+        return submit_export(request, session.get_bind())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error creating export: {e}")
+        raise HTTPException(status_code=500, detail="Failed to create export")
+
+@router.get("/{job_id}", response_model=ExportJob)
+async def get_export(job_id: UUID):
+    job = load_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return job
+
+def _read(path: str, start: int, length: int, chunk_size: int = 1 << 16) -> Iterator[bytes]:
+    with open(path, "rb") as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+@router.get("/{job_id}/download")
+async def download_export(job_id: UUID, request: Request):
+    job = load_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Export is {job.status}")
+    path = file_path(job)
+    size = os.path.getsize(path)
+    headers = {"Accept-Ranges": "bytes", "Content-Disposition": f'attachment; filename="{job.file}"'}
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except ValueError as e:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"}, content=str(e))
+    if byte_range is None:
+        return FileResponse(path, media_type=MEDIA_TYPES[job.compression], headers=headers)
+    start, end = byte_range
+    headers.update({"Content-Range": f"bytes {start}-{end}/{size}", "Content-Length": str(end - start + 1)})
+    return StreamingResponse(
+        _read(path, start, end - start + 1), status_code=206, media_type=MEDIA_TYPES[job.compression], headers=headers
+    )
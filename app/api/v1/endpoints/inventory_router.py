@@ -1,10 +1,24 @@
-from typing import List, Any
+from typing import List, Any, Optional, Union
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy.exc import IntegrityError
 
-from app.core.database import get_session
-from app.models.inventory import Inventory
+from app.core import config
+from app.core.bulk import BulkCreateResult, read_bulk_body
+from app.core.batch import BatchRequest, BatchResult, batch_get, check_batch_size, parse_ids
+from app.core.database import DBSession, get_session
+from app.core.fields import fields_response, get_fields, parse_fields, select_fields
+from app.core.group_commit import add_and_commit
+from app.core.pagination import CursorPage, paginate
+from app.core.search import search_statement
+from app.core.stock import StockAdjustment, StockAdjustmentLine, StockLevel
+from app.core.stock_import import ImportFormat, ImportReport, media_type_format, read_records
+from app.core.streaming import StreamFormat, stream_response
+from app.exceptions import (
+    InsufficientStockError, InvalidCursorError, InvalidFieldsError, ItemNotFoundError, MissingIndexError,
+)
+from app.models.inventory import Inventory, InventoryUpdate
+from app.services.inventory_service import InventoryService
 import logging
 
 # Define logging configuration
@@ -16,40 +30,187 @@ router = APIRouter()
 @router.post("/", response_model=Inventory)
 async def create_inventory(
     item: Inventory,
-    session: Session = Depends(get_session)
+    session: DBSession = Depends(get_session)
 ):
     try:
-        session.add(item)
-        session.commit()
-        session.refresh(item)
-        return item
+        return await add_and_commit(session, item)
+    except IntegrityError as e:
+        raise HTTPException(status_code=409, detail=str(e.orig))
     except Exception as e:
         logger.error(f"Error creating inventory: {e}")
         raise HTTPException(status_code=500, detail="Error creating inventory")
 
+@router.post("/bulk", response_model=BulkCreateResult)
+async def bulk_create_inventory(
+    request: Request,
+    session: DBSession = Depends(get_session)
+):
+    try:
+        rows = await read_bulk_body(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return await InventoryService(session).bulk_create(rows)
+    except Exception as e:
+        logger.error(f"Error bulk creating inventory: {e}")
+        raise HTTPException(status_code=500, detail="Error bulk creating inventory")
+
+@router.post("/import", response_model=ImportReport)
+async def import_inventory(
+    request: Request,
+    format: Optional[ImportFormat] = None,
+    session: DBSession = Depends(get_session)
+):
+    """Upsert a stock-take file, CSV or NDJSON per `format` or Content-Type, streamed from the body."""
+    format = format or media_type_format(request.headers.get("content-type", ""))
+    if format is None:
+        raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson, or pass format=")
+
+    def progress(report: ImportReport) -> None:
+        logger.info(
+            f"Inventory import: {report.rows:,} rows, {report.upserted:,} upserted, "
+            f"{report.unchanged:,} unchanged, {report.failed:,} failed"
+        )
+
+    try:
+        return await InventoryService(session).import_stock(read_records(request.stream(), format), progress)
+    except MissingIndexError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing inventory: {e}")
+        raise HTTPException(status_code=500, detail="Error importing inventory")
+
+@router.post("/adjust", response_model=List[StockLevel])
+async def adjust_inventory_levels(
+    lines: List[StockAdjustmentLine],
+    session: DBSession = Depends(get_session)
+):
+    try:
+        return await InventoryService(session).adjust_many(lines)
+    except ItemNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error adjusting inventory levels: {e}")
+        raise HTTPException(status_code=500, detail="Error adjusting inventory levels")
+
+@router.post("/{id}/adjust", response_model=StockLevel)
+async def adjust_inventory(
+    id: UUID,
+    adjustment: StockAdjustment,
+    session: DBSession = Depends(get_session)
+):
+    try:
+        return await InventoryService(session).adjust(id, adjustment.delta)
+    except ItemNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error adjusting inventory: {e}")
+        raise HTTPException(status_code=500, detail="Error adjusting inventory")
+
+@router.get("/search", response_model=Union[List[Inventory], CursorPage[Inventory]])
+async def search_items(
+    query: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=config.settings.PAGE_MAX_LIMIT),
+    fields: Optional[str] = None,
+    stream: Optional[StreamFormat] = None,
+    session: DBSession = Depends(get_session)
+):
+    try:
+        names = parse_fields(Inventory, fields)
+        statement = select_fields(Inventory, names, (Inventory.name, Inventory.id))
+        statement = search_statement(session.get_bind(), Inventory, query, ranked=cursor is None, statement=statement)
+        if stream is not None:
+            return stream_response(session, Inventory, names, statement, stream)
+        if cursor is not None:
+            return fields_response(Inventory, names, await paginate(session, statement, (Inventory.name, Inventory.id), cursor, limit))
+        return fields_response(Inventory, names, (await session.exec(statement)).all())
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching items: {e}")
+        raise HTTPException(status_code=500, detail="Error searching items")
+
+@router.get("/summary", response_model=dict)
+async def get_inventory_summary(
+    session: DBSession = Depends(get_session)
+):
+    try:
+        return await InventoryService(session).get_summary()
+    except Exception as e:
+        logger.error(f"Error getting inventory summary: {e}")
+        raise HTTPException(status_code=500, detail="Error getting inventory summary")
+
+@router.get("/batch", response_model=BatchResult[Inventory])
+async def get_inventory_batch(
+    ids: List[str] = Query(..., description="Comma-separated ids; may be repeated"),
+    session: DBSession = Depends(get_session)
+):
+    try:
+        return await batch_get(session, Inventory, parse_ids(ids, UUID))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error batch getting inventory: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get inventory")
+
+@router.post("/batch", response_model=BatchResult[Inventory])
+async def post_inventory_batch(
+    batch: BatchRequest[UUID],
+    session: DBSession = Depends(get_session)
+):
+    try:
+        check_batch_size(batch.ids)
+        return await batch_get(session, Inventory, batch.ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error batch getting inventory: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get inventory")
+
 @router.get("/{id}", response_model=Inventory)
 async def get_inventory(
     id: UUID,
-    session: Session = Depends(get_session)
+    fields: Optional[str] = None,
+    session: DBSession = Depends(get_session)
 ):
     try:
-        item = session.get(Inventory, id)
+        names = parse_fields(Inventory, fields)
+        item = await get_fields(session, Inventory, id, names)
         if not item:
             raise HTTPException(status_code=404, detail="Inventory not found")
-        return item
+        return fields_response(Inventory, names, item)
+    except HTTPException:
+        raise
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting inventory: {e}")
         raise HTTPException(status_code=500, detail="Error getting inventory")
 
-@router.get("/", response_model=List[Inventory])
+@router.get("/", response_model=Union[List[Inventory], CursorPage[Inventory]])
 async def list_inventorys(
     skip: int = 0,
-    limit: int = 100,
-    session: Session = Depends(get_session)
+    limit: int = Query(100, ge=1, le=config.settings.PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: Optional[StreamFormat] = None,
+    session: DBSession = Depends(get_session)
 ):
     try:
-        statement = select(Inventory).offset(skip).limit(limit)
-        return session.exec(statement).all()
+        names = parse_fields(Inventory, fields)
+        statement = select_fields(Inventory, names, (Inventory.name, Inventory.id))
+        if stream is not None:
+            return stream_response(session, Inventory, names, statement, stream)
+        if cursor is not None:
+            return fields_response(Inventory, names, await paginate(session, statement, (Inventory.name, Inventory.id), cursor, limit))
+        return fields_response(Inventory, names, (await session.exec(statement.offset(skip).limit(limit))).all())
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing inventory: {e}")
         raise HTTPException(status_code=500, detail="Error listing inventory")
@@ -58,80 +219,75 @@ async def list_inventorys(
 async def update_inventory(
     id: UUID,
     item_update: Inventory,
-    session: Session = Depends(get_session)
+    session: DBSession = Depends(get_session)
 ):
     try:
-        db_item = session.get(Inventory, id)
+        item_data = item_update.model_dump(exclude_unset=True, exclude={"id"})
+        db_item = await InventoryService(session).update(id, item_data)
         if not db_item:
             raise HTTPException(status_code=404, detail="Inventory not found")
-        
-        item_data = item_update.model_dict(exclude_unset=True)
-        for key, value in item_data.items():
-            setattr(db_item, key, value)
-        
-        session.add(db_item)
-        session.commit()
-        session.refresh(db_item)
         return db_item
+    except HTTPException:
+        raise
+    except IntegrityError as e:
+        raise HTTPException(status_code=409, detail=str(e.orig))
     except Exception as e:
         logger.error(f"Error updating inventory: {e}")
         raise HTTPException(status_code=500, detail="Error updating inventory")
 
-@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_inventory(
+@router.patch("/{id}", response_model=Inventory)
+async def patch_inventory(
     id: UUID,
-    session: Session = Depends(get_session)
+    item_update: InventoryUpdate,
+    session: DBSession = Depends(get_session)
 ):
     try:
-        item = session.get(Inventory, id)
-        if not item:
+        db_item = await InventoryService(session).update(id, item_update.model_dump(exclude_unset=True))
+        if not db_item:
             raise HTTPException(status_code=404, detail="Inventory not found")
-        
-        session.delete(item)
-        session.commit()
+        return db_item
+    except HTTPException:
+        raise
+    except IntegrityError as e:
+        raise HTTPException(status_code=409, detail=str(e.orig))
     except Exception as e:
-        logger.error(f"Error deleting inventory: {e}")
-        raise HTTPException(status_code=500, detail="Error deleting inventory")
+        logger.error(f"Error patching inventory: {e}")
+        raise HTTPException(status_code=500, detail="Error updating inventory")
 
-@router.get("/summary", response_model=dict)
-async def get_inventory_summary(
-    session: Session = Depends(get_session)
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_inventory(
+    id: UUID,
+    session: DBSession = Depends(get_session)
 ):
     try:
-        statement = select(Inventory)
-        items = session.exec(statement).all()
-        total_items = len(items)
-        categories = set(item.category for item in items)
-        category_count = len(categories)
-        
-        return {
-            "total_items": total_items,
-            "category_count": category_count
-        }
+        if not await InventoryService(session).delete(id):
+            raise HTTPException(status_code=404, detail="Inventory not found")
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error getting inventory summary: {e}")
-        raise HTTPException(status_code=500, detail="Error getting inventory summary")
+        logger.error(f"Error deleting inventory: {e}")
+        raise HTTPException(status_code=500, detail="Error deleting inventory")
 
-@router.get("/category/{category}", response_model=List[Inventory])
+@router.get("/category/{category}", response_model=Union[List[Inventory], CursorPage[Inventory]])
 async def get_items_by_category(
     category: str,
-    session: Session = Depends(get_session)
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=config.settings.PAGE_MAX_LIMIT),
+    fields: Optional[str] = None,
+    stream: Optional[StreamFormat] = None,
+    session: DBSession = Depends(get_session)
 ):
     try:
-        statement = select(Inventory).where(Inventory.category == category)
-        return session.exec(statement).all()
+        names = parse_fields(Inventory, fields)
+        statement = select_fields(Inventory, names, (Inventory.name, Inventory.id))
+        statement = statement.where(Inventory.category == category)
+        if stream is not None:
+            return stream_response(session, Inventory, names, statement, stream)
+        if cursor is not None:
+            return fields_response(Inventory, names, await paginate(session, statement, (Inventory.name, Inventory.id), cursor, limit))
+        return fields_response(Inventory, names, (await session.exec(statement)).all())
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting items by category: {e}")
         raise HTTPException(status_code=500, detail="Error getting items by category")
-
-@router.get("/search", response_model=List[Inventory])
-async def search_items(
-    query: str,
-    session: Session = Depends(get_session)
-):
-    try:
-        statement = select(Inventory).where(Inventory.name.contains(query) | Inventory.description.contains(query))
-        return session.exec(statement).all()
-    except Exception as e:
-        logger.error(f"Error searching items: {e}")
-        raise HTTPException(status_code=500, detail="Error searching items")
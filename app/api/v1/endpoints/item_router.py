@@ -1,54 +1,218 @@
-from typing import List, Any
+from typing import List, Any, Optional, Union
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy.exc import IntegrityError
 import logging
 
-from app.core.database import get_session
-from app.models.item import Item, CATEGORIES
-from app.exceptions import InvalidCategoryError, ItemNotFoundError
+from app.core import config
+from app.core.bulk import BulkCreateResult, read_bulk_body
+from app.core.batch import BatchRequest, BatchResult, batch_get, check_batch_size, parse_ids
+from app.core.database import DBSession, get_session
+from app.core.fields import fields_response, get_fields, parse_fields, select_fields
+from app.core.group_commit import add_and_commit
+from app.core.pagination import CursorPage, paginate
+from app.core.search import search_statement
+from app.core.stock import StockAdjustment, StockAdjustmentLine, StockLevel
+from app.core.streaming import StreamFormat, stream_response
+from app.models.item import Item, ItemUpdate, CATEGORIES
+from app.exceptions import InsufficientStockError, InvalidCategoryError, InvalidCursorError, InvalidFieldsError, ItemNotFoundError
+from app.services.item_service import ItemService
 
 router = APIRouter()
 
 @router.post("/", response_model=Item)
 async def create_item(
     item: Item,
-    session: Session = Depends(get_session)
+    session: DBSession = Depends(get_session)
 ):
     try:
         if item.category not in CATEGORIES:
             raise InvalidCategoryError
-        session.add(item)
-        session.commit()
-        session.refresh(item)
-        return item
+        return await add_and_commit(session, item)
     except Exception as e:
         logging.error(f"Error creating item: {e}")
         raise HTTPException(status_code=500, detail="Failed to create item")
 
+@router.post("/bulk", response_model=BulkCreateResult)
+async def bulk_create_items(
+    request: Request,
+    session: DBSession = Depends(get_session)
+):
+    try:
+        rows = await read_bulk_body(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        return await ItemService(session).bulk_create(rows)
+    except Exception as e:
+        logging.error(f"Error bulk creating items: {e}")
+        raise HTTPException(status_code=500, detail="Failed to bulk create items")
+
+@router.post("/adjust", response_model=List[StockLevel])
+async def adjust_items(
+    lines: List[StockAdjustmentLine],
+    session: DBSession = Depends(get_session)
+):
+    try:
+        return await ItemService(session).adjust_many(lines)
+    except ItemNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error adjusting items: {e}")
+        raise HTTPException(status_code=500, detail="Failed to adjust items")
+
+@router.post("/{id}/adjust", response_model=StockLevel)
+async def adjust_item(
+    id: UUID,
+    adjustment: StockAdjustment,
+    session: DBSession = Depends(get_session)
+):
+    try:
+        return await ItemService(session).adjust(id, adjustment.delta)
+    except ItemNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InsufficientStockError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error adjusting item: {e}")
+        raise HTTPException(status_code=500, detail="Failed to adjust item")
+
+@router.get("/filter", response_model=Union[List[Item], CursorPage[Item]])
+async def filter_items(
+    name: str = None,
+    category: str = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=config.settings.PAGE_MAX_LIMIT),
+    fields: Optional[str] = None,
+    stream: Optional[StreamFormat] = None,
+    session: DBSession = Depends(get_session)
+):
+    try:
+        names = parse_fields(Item, fields)
+        statement = select_fields(Item, names, (Item.name, Item.id))
+        if name:
+            statement = statement.filter(Item.name.like(f"%{name}%"))
+        if category:
+            statement = statement.filter(Item.category == category)
+        if stream is not None:
+            return stream_response(session, Item, names, statement, stream)
+        if cursor is not None:
+            return fields_response(Item, names, await paginate(session, statement, (Item.name, Item.id), cursor, limit))
+        return fields_response(Item, names, (await session.exec(statement)).all())
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error filtering items: {e}")
+        raise HTTPException(status_code=500, detail="Failed to filter items")
+
+@router.get("/search", response_model=Union[List[Item], CursorPage[Item]])
+async def search_items(
+    query: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=config.settings.PAGE_MAX_LIMIT),
+    fields: Optional[str] = None,
+    stream: Optional[StreamFormat] = None,
+    session: DBSession = Depends(get_session)
+):
+    try:
+        names = parse_fields(Item, fields)
+        statement = select_fields(Item, names, (Item.name, Item.id))
+        statement = search_statement(session.get_bind(), Item, query, ranked=cursor is None, statement=statement)
+        if stream is not None:
+            return stream_response(session, Item, names, statement, stream)
+        if cursor is not None:
+            return fields_response(Item, names, await paginate(session, statement, (Item.name, Item.id), cursor, limit))
+        return fields_response(Item, names, (await session.exec(statement)).all())
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error searching items: {e}")
+        raise HTTPException(status_code=500, detail="Failed to search items")
+
+@router.get("/summary", response_model=dict)
+async def get_summary(
+    session: DBSession = Depends(get_session)
+):
+    try:
+        return await ItemService(session).get_item_summary()
+    except Exception as e:
+        logging.error(f"Error getting summary: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get summary")
+
+@router.get("/categories", response_model=List[str])
+async def get_categories():
+    try:
+        return CATEGORIES
+    except Exception as e:
+        logging.error(f"Error getting categories: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get categories")
+
+@router.get("/batch", response_model=BatchResult[Item])
+async def get_items_batch(
+    ids: List[str] = Query(..., description="Comma-separated ids; may be repeated"),
+    session: DBSession = Depends(get_session)
+):
+    try:
+        return await batch_get(session, Item, parse_ids(ids, UUID))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error batch getting items: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get items")
+
+@router.post("/batch", response_model=BatchResult[Item])
+async def post_items_batch(
+    batch: BatchRequest[UUID],
+    session: DBSession = Depends(get_session)
+):
+    try:
+        check_batch_size(batch.ids)
+        return await batch_get(session, Item, batch.ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error batch getting items: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get items")
+
 @router.get("/{id}", response_model=Item)
 async def get_item(
     id: UUID,
-    session: Session = Depends(get_session)
+    fields: Optional[str] = None,
+    session: DBSession = Depends(get_session)
 ):
     try:
-        item = session.get(Item, id)
+        names = parse_fields(Item, fields)
+        item = await get_fields(session, Item, id, names)
         if not item:
             raise ItemNotFoundError
-        return item
+        return fields_response(Item, names, item)
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logging.error(f"Error getting item: {e}")
         raise HTTPException(status_code=404, detail="Item not found")
 
-@router.get("/", response_model=List[Item])
+@router.get("/", response_model=Union[List[Item], CursorPage[Item]])
 async def list_items(
     skip: int = 0,
-    limit: int = 100,
-    session: Session = Depends(get_session)
+    limit: int = Query(100, ge=1, le=config.settings.PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: Optional[StreamFormat] = None,
+    session: DBSession = Depends(get_session)
 ):
     try:
-        statement = select(Item).offset(skip).limit(limit)
-        return session.exec(statement).all()
+        names = parse_fields(Item, fields)
+        statement = select_fields(Item, names, (Item.name, Item.id))
+        if stream is not None:
+            return stream_response(session, Item, names, statement, stream)
+        if cursor is not None:
+            return fields_response(Item, names, await paginate(session, statement, (Item.name, Item.id), cursor, limit))
+        return fields_response(Item, names, (await session.exec(statement.offset(skip).limit(limit))).all())
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logging.error(f"Error listing items: {e}")
         raise HTTPException(status_code=500, detail="Failed to list items")
@@ -57,71 +221,48 @@ async def list_items(
 async def update_item(
     id: UUID,
     item_update: Item,
-    session: Session = Depends(get_session)
+    session: DBSession = Depends(get_session)
 ):
     try:
-        db_item = session.get(Item, id)
-        if not db_item:
-            raise ItemNotFoundError
-        if item_update.category not in CATEGORIES:
-            raise InvalidCategoryError
-        item_data = item_update.model_dump(exclude_unset=True)
-        db_item.sqlmodel_update(item_data)
-        session.add(db_item)
-        session.commit()
-        session.refresh(db_item)
-        return db_item
+        item_data = item_update.model_dump(exclude_unset=True, exclude={"id"})
+        return await ItemService(session).update(id, item_data)
+    except ItemNotFoundError:
+        raise HTTPException(status_code=404, detail="Item not found")
+    except InvalidCategoryError:
+        raise HTTPException(status_code=400, detail="Invalid category")
+    except IntegrityError as e:
+        raise HTTPException(status_code=409, detail=str(e.orig))
     except Exception as e:
         logging.error(f"Error updating item: {e}")
         raise HTTPException(status_code=500, detail="Failed to update item")
 
-@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_item(
+@router.patch("/{id}", response_model=Item)
+async def patch_item(
     id: UUID,
-    session: Session = Depends(get_session)
-):
-    try:
-        item = session.get(Item, id)
-        if not item:
-            raise ItemNotFoundError
-        session.delete(item)
-        session.commit()
-    except Exception as e:
-        logging.error(f"Error deleting item: {e}")
-        raise HTTPException(status_code=500, detail="Failed to delete item")
-
-@router.get("/summary", response_model=List[Item])
-async def get_summary(
-    session: Session = Depends(get_session)
+    item_update: ItemUpdate,
+    session: DBSession = Depends(get_session)
 ):
     try:
-        statement = select(Item)
-        return session.exec(statement).all()
-    except Exception as e:
-        logging.error(f"Error getting summary: {e}")
-        raise HTTPException(status_code=500, detail="Failed to get summary")
-
-@router.get("/categories", response_model=List[str])
-async def get_categories():
-    try:
-        return CATEGORIES
+        return await ItemService(session).update(id, item_update.model_dump(exclude_unset=True))
+    except ItemNotFoundError:
+        raise HTTPException(status_code=404, detail="Item not found")
+    except InvalidCategoryError:
+        raise HTTPException(status_code=400, detail="Invalid category")
+    except IntegrityError as e:
+        raise HTTPException(status_code=409, detail=str(e.orig))
     except Exception as e:
-        logging.error(f"Error getting categories: {e}")
-        raise HTTPException(status_code=500, detail="Failed to get categories")
+        logging.error(f"Error patching item: {e}")
+        raise HTTPException(status_code=500, detail="Failed to update item")
 
-@router.get("/filter", response_model=List[Item])
-async def filter_items(
-    name: str = None,
-    category: str = None,
-    session: Session = Depends(get_session)
+@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_item(
+    id: UUID,
+    session: DBSession = Depends(get_session)
 ):
     try:
-        statement = select(Item)
-        if name:
-            statement = statement.filter(Item.name.like(f"%{name}%"))
-        if category:
-            statement = statement.filter(Item.category == category)
-        return session.exec(statement).all()
+        await ItemService(session).delete(id)
+    except ItemNotFoundError:
+        raise HTTPException(status_code=404, detail="Item not found")
     except Exception as e:
-        logging.error(f"Error filtering items: {e}")
-        raise HTTPException(status_code=500, detail="Failed to filter items")
+        logging.error(f"Error deleting item: {e}")
+        raise HTTPException(status_code=500, detail="Failed to delete item")
@@ -1,12 +1,16 @@
-from typing import List, Any
-from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from pydantic import BaseModel, ValidationError
+from typing import List, Any, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlmodel import select
+from pydantic import BaseModel
 import logging
-from app.models.system import System
+from app.core import config
+from app.models.system import System, SystemCreate, SystemUpdate
 from app.models.error import Error
-from app.core.database import get_session
+from app.core.cache import cache_stats
+from app.core.database import DBSession, get_session
+from app.core.pagination import CursorPage, paginate
+from app.core.writes import delete_returning, update_returning
+from app.exceptions import InvalidCursorError
 
 router = APIRouter()
 
@@ -14,38 +18,49 @@ router = APIRouter()
 @router.post("/", response_model=System)
 async def create_system(
     item: System,
-    session: Session = Depends(get_session)
+    session: DBSession = Depends(get_session)
 ):
     try:
         session.add(item)
-        session.commit()
-        session.refresh(item)
+        await session.commit()
+        await session.refresh(item)
         return item
     except Exception as e:
         logging.error(str(e))
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 
+@router.get("/cache", response_model=dict)
+async def get_cache_stats():
+    """Hit, miss and eviction counters of the get-by-id entity caches."""
+    return cache_stats()
+
+
 @router.get("/{id}", response_model=System)
 async def get_system(
-    id: UUID,
-    session: Session = Depends(get_session)
+    id: int,
+    session: DBSession = Depends(get_session)
 ):
-    item = session.get(System, id)
+    item = await session.get(System, id)
     if not item:
         raise HTTPException(status_code=404, detail="System not found")
     return item
 
 
-@router.get("/", response_model=List[System])
+@router.get("/", response_model=Union[List[System], CursorPage[System]])
 async def list_systems(
     skip: int = 0,
-    limit: int = 100,
-    session: Session = Depends(get_session)
+    limit: int = Query(100, ge=1, le=config.settings.PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    session: DBSession = Depends(get_session)
 ):
     try:
+        if cursor is not None:
+            return await paginate(session, select(System), (System.id,), cursor, limit)
         statement = select(System).offset(skip).limit(limit)
-        return session.exec(statement).all()
+        return (await session.exec(statement)).all()
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logging.error(str(e))
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -53,26 +68,35 @@ async def list_systems(
 
 @router.put("/{id}", response_model=System)
 async def update_system(
-    id: UUID,
-    item_update: System,
-    session: Session = Depends(get_session)
+    id: int,
+    item_update: SystemCreate,
+    session: DBSession = Depends(get_session)
 ):
     try:
-        db_item = session.get(System, id)
+        db_item = await update_returning(session, System, id, item_update.model_dump())
         if not db_item:
             raise HTTPException(status_code=404, detail="System not found")
-        
-        item_data = item_update.model_dump(exclude_unset=True)
-        db_item.sqlmodel_update(item_data)
-        
-        session.add(db_item)
-        session.commit()
-        session.refresh(db_item)
         return db_item
-    except ValidationError as e:
+    except HTTPException:
+        raise
+    except Exception as e:
         logging.error(str(e))
-        invalid_fields = [field.name for field in e.models[0].fields]
-        raise HTTPException(status_code=422, detail=f"Invalid fields: {', '.join(invalid_fields)}")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+@router.patch("/{id}", response_model=System)
+async def patch_system(
+    id: int,
+    item_update: SystemUpdate,
+    session: DBSession = Depends(get_session)
+):
+    try:
+        db_item = await update_returning(session, System, id, item_update.model_dump(exclude_unset=True))
+        if not db_item:
+            raise HTTPException(status_code=404, detail="System not found")
+        return db_item
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(str(e))
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -80,17 +104,15 @@ async def update_system(
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_system(
-    id: UUID,
-    session: Session = Depends(get_session)
+    id: int,
+    session: DBSession = Depends(get_session)
 ):
     try:
-        item = session.get(System, id)
-        if not item:
+        if not await delete_returning(session, System, id):
             raise HTTPException(status_code=404, detail="System not found")
-        
-        session.delete(item)
-        session.commit()
         return
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(str(e))
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -100,16 +122,16 @@ async def delete_system(
 @router.post("/duplicate", response_model=None)
 async def save_duplicate_system(
     item: System,
-    session: Session = Depends(get_session)
+    session: DBSession = Depends(get_session)
 ):
     try:
-        existing_item = session.query(System).filter(System.name == item.name).first()
+        existing_item = (await session.exec(select(System).where(System.name == item.name))).first()
         if existing_item:
             raise HTTPException(status_code=422, detail="System with same name already exists")
         
         session.add(item)
-        session.commit()
-        session.refresh(item)
+        await session.commit()
+        await session.refresh(item)
         return item
     except Exception as e:
         logging.error(str(e))
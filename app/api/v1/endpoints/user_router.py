@@ -1,9 +1,17 @@
-from typing import List, Any
+from typing import List, Any, Optional, Union
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlmodel import Session, select, Field
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select, Field
 
-from app.core.database import get_session
+from app.core import config
+from app.core.batch import BatchRequest, BatchResult, batch_get, check_batch_size, parse_ids
+from app.core.database import DBSession, get_session
+from app.core.fields import fields_response, get_fields, parse_fields, select_fields
+from app.core.pagination import CursorPage, paginate
+from app.core.streaming import StreamFormat, stream_response
+from app.core.writes import delete_returning, update_returning
+from app.exceptions import InvalidCursorError, InvalidFieldsError
 from app.models.user import User, UserCreate, UserUpdate
 import logging
 
@@ -16,13 +24,13 @@ router = APIRouter()
 @router.post("/", response_model=User)
 async def create_user(
     item: UserCreate,
-    session: Session = Depends(get_session)
+    session: DBSession = Depends(get_session)
 ):
     try:
         user = User.create(session, model_create=True, obj_in=item)
         session.add(user)
-        session.commit()
-        session.refresh(user)
+        await session.commit()
+        await session.refresh(user)
         return user
     except ValidationError as e:
         raise HTTPException(status_code=422, detail=e.json())
@@ -30,69 +38,106 @@ async def create_user(
         logger.error(f"An error occurred: {e}")
         raise HTTPException(status_code=500, detail="An error occurred")
 
+@router.get("/batch", response_model=BatchResult[User])
+async def get_users_batch(
+    ids: List[str] = Query(..., description="Comma-separated ids; may be repeated"),
+    session: DBSession = Depends(get_session)
+):
+    try:
+        return await batch_get(session, User, parse_ids(ids, int))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error batch getting users: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get users")
+
+@router.post("/batch", response_model=BatchResult[User])
+async def post_users_batch(
+    batch: BatchRequest[int],
+    session: DBSession = Depends(get_session)
+):
+    try:
+        check_batch_size(batch.ids)
+        return await batch_get(session, User, batch.ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error batch getting users: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get users")
+
 @router.get("/{id}", response_model=User)
 async def get_user(
-    id: UUID,
-    session: Session = Depends(get_session)
+    id: int,
+    fields: Optional[str] = None,
+    session: DBSession = Depends(get_session)
 ):
     try:
-        item = session.get(User, id)
+        names = parse_fields(User, fields)
+        item = await get_fields(session, User, id, names)
         if not item:
             raise HTTPException(status_code=404, detail="User not found")
-        return item
+        return fields_response(User, names, item)
+    except HTTPException:
+        raise
+    except InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"An error occurred: {e}")
         raise HTTPException(status_code=500, detail="An error occurred")
 
-@router.get("/", response_model=List[User])
+@router.get("/", response_model=Union[List[User], CursorPage[User]])
 async def list_users(
     skip: int = 0,
-    limit: int = 100,
-    session: Session = Depends(get_session)
+    limit: int = Query(100, ge=1, le=config.settings.PAGE_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: Optional[StreamFormat] = None,
+    session: DBSession = Depends(get_session)
 ):
     try:
-        statement = select(User).offset(skip).limit(limit)
-        return session.exec(statement).all()
+        names = parse_fields(User, fields)
+        statement = select_fields(User, names, (User.id,))
+        if stream is not None:
+            return stream_response(session, User, names, statement, stream)
+        if cursor is not None:
+            return fields_response(User, names, await paginate(session, statement, (User.id,), cursor, limit))
+        return fields_response(User, names, (await session.exec(statement.offset(skip).limit(limit))).all())
+    except (InvalidCursorError, InvalidFieldsError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"An error occurred: {e}")
         raise HTTPException(status_code=500, detail="An error occurred")
 
 @router.put("/{id}", response_model=User)
+@router.patch("/{id}", response_model=User)
 async def update_user(
-    id: UUID,
+    id: int,
     item_update: UserUpdate,
-    session: Session = Depends(get_session)
+    session: DBSession = Depends(get_session)
 ):
     try:
-        db_item = session.get(User, id)
+        db_item = await update_returning(session, User, id, item_update.model_dump(exclude_unset=True))
         if not db_item:
             raise HTTPException(status_code=404, detail="User not found")
-        
-        item_data = item_update.dict(exclude_unset=True)
-        db_item.sqlmodel_update(item_data)
-        
-        session.add(db_item)
-        session.commit()
-        session.refresh(db_item)
         return db_item
-    except ValidationError as e:
-        raise HTTPException(status_code=422, detail=e.json())
+    except HTTPException:
+        raise
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Email already registered")
     except Exception as e:
         logger.error(f"An error occurred: {e}")
         raise HTTPException(status_code=500, detail="An error occurred")
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
-    id: UUID,
-    session: Session = Depends(get_session)
+    id: int,
+    session: DBSession = Depends(get_session)
 ):
     try:
-        item = session.get(User, id)
-        if not item:
+        if not await delete_returning(session, User, id):
             raise HTTPException(status_code=404, detail="User not found")
-        
-        session.delete(item)
-        session.commit()
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"An error occurred: {e}")
         raise HTTPException(status_code=500, detail="An error occurred")
@@ -113,13 +158,12 @@ class UserUpdate(BaseModel):
 
 from typing import Any
 from fastapi import HTTPException
-from sqlmodel import Session
 
 from app.models.user import User
 
-def verify_duplicate_email(session: Session, email: str) -> bool:
+async def verify_duplicate_email(session: DBSession, email: str) -> bool:
     try:
-        session.query(User).filter(User.email == email).first()
+        (await session.exec(select(User).where(User.email == email))).first()
         return True
     except Exception as e:
         logger.error(f"An error occurred: {e}")
@@ -0,0 +1,230 @@
+"""
+Maintenance commands.
+
+Usage:
+    python -m app.cli rebuild-counters [--check-only]
+    python -m app.cli reindex-search
+    python -m app.cli rebuild-category-closure [--check-only]
+    python -m app.cli migrate-uuid-storage [--vacuum]
+    python -m app.cli create-indexes
+    python -m app.cli import-stock FILE [--format csv|ndjson] [--batch-size N]
+    python -m app.cli generate [--items N] [--inventory N] [--categories N] [--users N] [--errors N]
+                               [--seed 1] [--skew 1.1] [--tree-depth 8] [--description-words 30]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import AsyncIterator, List, Optional
+
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.core.database import (
+    connect_args, create_db_and_tables, create_missing_indexes, database_url, duplicate_keys, engine,
+    install_sqlite_pragmas, missing_indexes, sqlite_pragmas,
+)
+from app.core.dataset import DatasetSpec, load_dataset
+from app.core.ids import migrate_uuid_storage
+from app.core.search import fts_enabled, rebuild_search_index
+from app.core.stock_import import ImportReport, read_records
+from app.exceptions import MissingIndexError
+from app.models import category, category_closure, inventory, item, summary  # noqa: F401  (register tables)
+from app.models.category_closure import check_category_closure, closure_enabled, rebuild_category_closure
+from app.models.summary import check_summary_counters, rebuild_summary_counters
+from app.services.inventory_service import InventoryService
+
+
+def rebuild_counters(args: argparse.Namespace) -> int:
+    create_db_and_tables()
+    with engine.begin() as connection:
+        if not args.check_only:
+            rebuild_summary_counters(connection)
+            print("Summary counters rebuilt")
+        mismatches = check_summary_counters(connection)
+    for mismatch in mismatches:
+        print(
+            f"Mismatch {mismatch['source']}/{mismatch['category']}: "
+            f"expected {mismatch['expected']}, stored {mismatch['actual']}"
+        )
+    print(f"Summary counters {'OK' if not mismatches else f'have {len(mismatches)} mismatches'}")
+    return 1 if mismatches else 0
+
+
+def reindex_search(args: argparse.Namespace) -> int:
+    if not fts_enabled(engine):
+        print("Full-text search is disabled (SEARCH_BACKEND or database dialect)")
+        return 1
+    create_db_and_tables()
+    with engine.begin() as connection:
+        rebuild_search_index(connection)
+    print("Search index rebuilt")
+    return 0
+
+
+def rebuild_closure(args: argparse.Namespace) -> int:
+    if not closure_enabled(engine):
+        print("The category closure table is only maintained on SQLite")
+        return 1
+    create_db_and_tables()
+    with engine.begin() as connection:
+        if not args.check_only:
+            rebuild_category_closure(connection)
+            print("Category closure rebuilt")
+        mismatches = check_category_closure(connection)
+    for kind, ancestor_id, descendant_id, depth in mismatches:
+        print(f"{kind.capitalize()} row {ancestor_id} -> {descendant_id} at depth {depth}")
+    print(f"Category closure {'OK' if not mismatches else f'has {len(mismatches)} mismatches'}")
+    return 1 if mismatches else 0
+
+
+def migrate_uuids(args: argparse.Namespace) -> int:
+    if engine.dialect.name != "sqlite":
+        print("Only SQLite stored UUIDs as text; nothing to migrate")
+        return 0
+    # Not create_db_and_tables(), which converts the ids itself before they could be counted here
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        converted = migrate_uuid_storage(connection)
+    for table, rows in converted.items():
+        print(f"{table}: {rows:,} rows converted")
+    if args.vacuum:
+        # VACUUM reclaims the freed pages but may renumber rowids, which the search index points at
+        with engine.connect() as connection:
+            connection.exec_driver_sql("VACUUM")
+        if fts_enabled(engine):
+            with engine.begin() as connection:
+                rebuild_search_index(connection)
+        print("Database vacuumed")
+    return 0
+
+
+def create_indexes(args: argparse.Namespace) -> int:
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        created = create_missing_indexes(connection)
+        blocked = {index: duplicate_keys(connection, index) for index in missing_indexes(connection) if index.unique}
+    for name in created:
+        print(f"Created index {name}")
+    blocked = {index: rows for index, rows in blocked.items() if rows}
+    for index, rows in blocked.items():
+        columns = "+".join(column.name for column in index.columns)
+        print(f"Cannot create unique index {index.name}: rows share {columns}")
+        for *values, count in rows:
+            print(f"  {', '.join(map(str, values))}: {count} rows")
+    if blocked:
+        print("Merge or rename those rows, then run create-indexes again")
+        return 1
+    with engine.begin() as connection:
+        unique = create_missing_indexes(connection, unique=True)
+    for name in unique:
+        print(f"Created index {name}")
+    print(f"{len(created) + len(unique)} missing indexes created")
+    return 0
+
+
+async def read_file(path: str, size: int = 1 << 16) -> AsyncIterator[bytes]:
+    with (sys.stdin.buffer if path == "-" else open(path, "rb")) as file:
+        while chunk := file.read(size):
+            yield chunk
+
+
+def import_stock(args: argparse.Namespace) -> int:
+    format = args.format or ("csv" if args.file.lower().endswith(".csv") else "ndjson")
+    create_db_and_tables()
+    started = time.perf_counter()
+
+    def progress(report: ImportReport) -> None:
+        rate = report.rows / (time.perf_counter() - started)
+        counts = f"{report.upserted:,} upserted, {report.unchanged:,} unchanged, {report.failed:,} failed"
+        print(f"{report.rows:,} rows, {counts} ({rate:,.0f} rows/s)", file=sys.stderr)
+
+    with Session(engine) as session:
+        service = InventoryService(session)
+        try:
+            report = asyncio.run(service.import_stock(read_records(read_file(args.file), format), progress, args.batch_size))
+        except MissingIndexError as e:
+            print(e)
+            return 1
+    for error in report.errors:
+        print(f"line {error.line}: {error.error}")
+    if report.failed > len(report.errors):
+        print(f"... {report.failed - len(report.errors):,} more failed lines not listed")
+    print(f"Imported {report.upserted:,} of {report.rows:,} rows, {report.unchanged:,} unchanged")
+    return 1 if report.failed else 0
+
+
+def generate(args: argparse.Namespace) -> int:
+    spec = DatasetSpec(**{
+        field: getattr(args, field) for field in DatasetSpec.__dataclass_fields__ if getattr(args, field) is not None
+    })
+    # A separate engine so the unsafe bulk-load PRAGMAs never reach the application's connections
+    loader = create_engine(args.database_url or database_url, connect_args=connect_args)
+    install_sqlite_pragmas(loader, sqlite_pragmas("bulk_load"))
+    SQLModel.metadata.create_all(loader)
+
+    def report(table: str, rows: int, elapsed: float) -> None:
+        rate = f" ({rows / elapsed:,.0f} rows/s)" if rows and elapsed else ""
+        print(f"{table}: {rows:,} rows in {elapsed:.1f}s{rate}" if rows else f"{table}: {elapsed:.1f}s")
+
+    load_dataset(loader, spec, report)
+    loader.dispose()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    counters = commands.add_parser("rebuild-counters", help="Recompute summary counters and verify them")
+    counters.add_argument("--check-only", action="store_true", help="Only compare counters with the live tables")
+    counters.set_defaults(func=rebuild_counters)
+
+    reindex = commands.add_parser("reindex-search", help="Rebuild the full-text search indexes")
+    reindex.set_defaults(func=reindex_search)
+
+    closure = commands.add_parser("rebuild-category-closure", help="Recompute the category closure table and verify it")
+    closure.add_argument("--check-only", action="store_true", help="Only compare the closure with Category.parent_id")
+    closure.set_defaults(func=rebuild_closure)
+
+    uuids = commands.add_parser("migrate-uuid-storage", help="Convert UUIDs stored as text into 16-byte blobs")
+    uuids.add_argument("--vacuum", action="store_true", help="VACUUM afterwards to shrink the database file")
+    uuids.set_defaults(func=migrate_uuids)
+
+    indexes = commands.add_parser(
+        "create-indexes", help="Create indexes that tables made by an older release are missing, unique keys included"
+    )
+    indexes.set_defaults(func=create_indexes)
+
+    stock = commands.add_parser("import-stock", help="Upsert inventory from a stock-take CSV or NDJSON file by name+category")
+    stock.add_argument("file", help="file to import, or - for stdin")
+    stock.add_argument("--format", choices=("csv", "ndjson"), help="file format (default from the .csv extension, else ndjson)")
+    stock.add_argument("--batch-size", type=int, help="rows per transaction (default IMPORT_BATCH_SIZE)")
+    stock.set_defaults(func=import_stock)
+
+    gen = commands.add_parser(
+        "generate",
+        help="Bulk-load a deterministic synthetic dataset",
+        description="Bulk-load a deterministic synthetic dataset. Ids derive from the seed, so load each seed "
+        "into a database only once.",
+    )
+    defaults = DatasetSpec()
+    for field in ("items", "inventory", "categories", "users", "errors"):
+        gen.add_argument(f"--{field}", type=int, help=f"{field} rows to add (default {getattr(defaults, field):,})")
+    gen.add_argument("--seed", type=int, help=f"RNG seed; the same seed gives the same rows (default {defaults.seed})")
+    gen.add_argument("--skew", type=float, help=f"Zipf exponent of category and word frequencies (default {defaults.skew})")
+    gen.add_argument("--tree-depth", type=int, help=f"maximum category tree depth (default {defaults.tree_depth})")
+    gen.add_argument("--description-words", type=int, help=f"words per description (default {defaults.description_words})")
+    gen.add_argument("--batch-size", type=int, help=f"rows per executemany chunk (default {defaults.batch_size:,})")
+    gen.add_argument("--database-url", help="target database (default DATABASE_URL)")
+    gen.set_defaults(func=generate)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
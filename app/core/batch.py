@@ -0,0 +1,59 @@
+from typing import Any, Dict, Generic, List, Optional, Sequence, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlmodel import SQLModel, select
+
+from app.core import config
+from app.core.bulk import chunked
+from app.core.cache import entity_cache
+
+T = TypeVar("T")
+K = TypeVar("K")
+
+
+class BatchRequest(BaseModel, Generic[K]):
+    """Ids to fetch with POST /batch."""
+    ids: List[K]
+
+
+class BatchResult(BaseModel, Generic[T]):
+    """Rows in request order, with None where an id has no row; those ids are also listed in `missing`."""
+    items: List[Optional[T]]
+    missing: List[Any]
+
+
+def parse_ids(values: Sequence[str], key_type: type) -> List[Any]:
+    """Ids from `?ids=a,b&ids=c` query values; raises ValueError on a malformed id or too many ids."""
+    ids = [key_type(part.strip()) for value in values for part in value.split(",") if part.strip()]
+    check_batch_size(ids)
+    return ids
+
+
+def check_batch_size(ids: Sequence[Any]) -> None:
+    if len(ids) > config.settings.BATCH_GET_MAX_IDS:
+        raise ValueError(f"At most {config.settings.BATCH_GET_MAX_IDS} ids per batch")
+
+
+async def batch_get(session: Any, model: Type[SQLModel], ids: Sequence[Any]) -> BatchResult:
+    """
+    Fetch rows by primary key, cache first, then one `WHERE id IN (...)` per chunk of misses.
+
+    Chunks of BULK_CHUNK_SIZE keep each statement under SQLite's bound-variable limit.
+    """
+    cache = entity_cache(model)
+    found: Dict[Any, SQLModel] = {}
+    wanted: List[Any] = []
+    for id in dict.fromkeys(ids):
+        data = cache.get(id) if cache is not None else None
+        if data is not None:
+            found[id] = model.model_validate(data)
+        else:
+            wanted.append(id)
+    epoch = cache.epoch() if cache is not None else 0
+    for chunk in chunked(wanted, config.settings.BULK_CHUNK_SIZE):
+        for row in (await session.exec(select(model).where(model.id.in_(chunk)))).all():
+            found[row.id] = row
+            if cache is not None:
+                cache.set(row.id, row.model_dump(), epoch)
+    items = [found.get(id) for id in ids]
+    return BatchResult(items=items, missing=[id for id, item in zip(ids, items) if item is None])
@@ -0,0 +1,144 @@
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from fastapi import Request
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, tuple_
+from sqlmodel import SQLModel, select
+
+from app.core import config
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+class BulkRowResult(BaseModel):
+    """Outcome of one row of a bulk request."""
+    index: int
+    status: str
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkCreateResult(BaseModel):
+    """Per-row report for a bulk create."""
+    created: int
+    failed: int
+    results: List[BulkRowResult]
+
+
+def chunked(rows: Sequence[Any], size: int):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+async def read_bulk_body(request: Request) -> List[Any]:
+    """
+    Parse a bulk request body given as a JSON array or as NDJSON.
+
+    NDJSON lines that are not valid JSON are returned as ValueError entries
+    so they can be reported against their line instead of failing the batch.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in NDJSON_MEDIA_TYPES:
+        rows: List[Any] = []
+        for line in body.decode().splitlines():
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                rows.append(ValueError(f"Invalid JSON: {e}"))
+        return rows
+    rows = json.loads(body or b"[]")
+    if not isinstance(rows, list):
+        raise ValueError("Bulk body must be a JSON array or NDJSON")
+    return rows
+
+
+def validate_rows(
+    model: Type[SQLModel], rows: Sequence[Any], check: Optional[Callable[[SQLModel], None]] = None
+) -> Tuple[List[Tuple[int, SQLModel]], List[BulkRowResult]]:
+    """Validate every row up front, splitting the batch into instances to insert and failures."""
+    valid: List[Tuple[int, SQLModel]] = []
+    failures: List[BulkRowResult] = []
+    for index, row in enumerate(rows):
+        try:
+            if isinstance(row, Exception):
+                raise row
+            instance = model.model_validate(row)
+            if check:
+                check(instance)
+            valid.append((index, instance))
+        except ValidationError as e:
+            errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            failures.append(BulkRowResult(index=index, status="failed", error=errors))
+        except Exception as e:
+            failures.append(BulkRowResult(index=index, status="failed", error=str(e) or type(e).__name__))
+    return valid, failures
+
+
+def unique_keys(model: Type[SQLModel]) -> List[Tuple[str, ...]]:
+    """Column names of each unique index on `model`."""
+    return [tuple(column.name for column in index.columns) for index in model.__table__.indexes if index.unique]
+
+
+async def existing_keys(session: Any, model: Type[SQLModel], key: Sequence[str], values: Sequence[tuple]) -> set:
+    """The tuples of `values` already present in `model` on the columns `key`."""
+    columns = [model.__table__.columns[name] for name in key]
+    found = set()
+    # Each tuple binds one parameter per column
+    for chunk in chunked(list(dict.fromkeys(values)), max(1, config.settings.BULK_CHUNK_SIZE // len(key))):
+        found.update(tuple(row) for row in (await session.exec(select(*columns).where(tuple_(*columns).in_(chunk)))).all())
+    return found
+
+
+async def bulk_insert(
+    session: Any, model: Type[SQLModel], valid: List[Tuple[int, SQLModel]], failures: List[BulkRowResult]
+) -> BulkCreateResult:
+    """
+    Insert validated rows in chunked executemany batches inside one transaction.
+
+    Rows whose primary key or unique key already exists, in the table or
+    earlier in the batch, are reported as failures before anything is written.
+    """
+    chunk_size = config.settings.BULK_CHUNK_SIZE
+    keys = unique_keys(model)
+    pending: List[Tuple[int, SQLModel]] = []
+    seen = set()
+    seen_keys: Dict[Tuple[str, ...], set] = {key: set() for key in keys}
+    for chunk in chunked(valid, chunk_size):
+        ids = [instance.id for _, instance in chunk if instance.id is not None]
+        existing = set((await session.exec(select(model.id).where(model.id.in_(ids)))).all()) if ids else set()
+        taken = {}
+        for key in keys:
+            values = [tuple(getattr(instance, name) for name in key) for _, instance in chunk]
+            taken[key] = await existing_keys(session, model, key, values)
+        for index, instance in chunk:
+            if instance.id in existing or instance.id in seen:
+                failures.append(BulkRowResult(index=index, status="failed", error=f"Duplicate id: {instance.id}"))
+                continue
+            values = {key: tuple(getattr(instance, name) for name in key) for key in keys}
+            duplicate = next((key for key in keys if values[key] in taken[key] or values[key] in seen_keys[key]), None)
+            if duplicate is not None:
+                error = f"Duplicate {'+'.join(duplicate)}: {', '.join(map(str, values[duplicate]))}"
+                failures.append(BulkRowResult(index=index, status="failed", error=error))
+                continue
+            seen.add(instance.id)
+            for key in keys:
+                seen_keys[key].add(values[key])
+            pending.append((index, instance))
+
+    try:
+        for chunk in chunked(pending, chunk_size):
+            await session.exec(insert(model), params=[instance.model_dump() for _, instance in chunk])
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+
+    results = failures + [
+        BulkRowResult(index=index, status="created", id=str(instance.id)) for index, instance in pending
+    ]
+    results.sort(key=lambda result: result.index)
+    return BulkCreateResult(created=len(pending), failed=len(failures), results=results)
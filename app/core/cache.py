@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Type
+
+from sqlmodel import SQLModel
+
+from app.core import config
+
+
+class EntityCache:
+    """
+    Bounded LRU cache with a per-entry TTL.
+
+    Holds plain column dicts rather than ORM instances, so entries never
+    reference a session. Entries are per process: writes made by another
+    worker only become visible here once the TTL expires.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, data = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def epoch(self) -> int:
+        """Token to pass to `set` so a fill racing with a write is dropped."""
+        return self._epoch
+
+    def set(self, key: Hashable, data: Dict[str, Any], epoch: Optional[int] = None) -> None:
+        with self._lock:
+            if epoch is not None and epoch != self._epoch:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+_caches: Dict[str, EntityCache] = {}
+
+
+def named_cache(name: str) -> Optional[EntityCache]:
+    """Cache sized from Settings.<NAME>_CACHE_SIZE/_TTL; None when disabled."""
+    if name not in _caches:
+        prefix = name.upper()
+        maxsize = getattr(config.settings, f"{prefix}_CACHE_SIZE", 0)
+        if maxsize <= 0:
+            return None
+        _caches[name] = EntityCache(name, maxsize, getattr(config.settings, f"{prefix}_CACHE_TTL"))
+    return _caches[name]
+
+
+def entity_cache(model: Type[SQLModel]) -> Optional[EntityCache]:
+    """Cache for `model`, sized from Settings.<TABLE>_CACHE_SIZE/_TTL; None when disabled."""
+    return named_cache(model.__tablename__)
+
+
+async def cached_get(session: Any, model: Type[SQLModel], id: Any) -> Optional[SQLModel]:
+    """
+    Read-through get by primary key.
+
+    Hits return a fresh detached copy; use `session.get` when the row will be modified.
+    """
+    cache = entity_cache(model)
+    if cache is None:
+        return await session.get(model, id)
+    data = cache.get(id)
+    if data is not None:
+        return model.model_validate(data)
+    epoch = cache.epoch()
+    item = await session.get(model, id)
+    if item is not None:
+        cache.set(id, item.model_dump(), epoch)
+    return item
+
+
+def invalidate(model: Type[SQLModel], id: Any) -> None:
+    cache = entity_cache(model)
+    if cache is not None:
+        cache.invalidate(id)
+
+
+def clear_entity_cache(model: Type[SQLModel]) -> None:
+    """Drop every cached row of `model`, for writes that touch rows other than the one by id."""
+    cache = entity_cache(model)
+    if cache is not None:
+        cache.clear()
+
+
+def clear_entity_caches() -> None:
+    for cache in _caches.values():
+        cache.clear()
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _caches.items()}
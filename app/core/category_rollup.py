@@ -0,0 +1,136 @@
+"""
+Item and inventory totals rolled up the category tree.
+
+Items and inventory rows name their category by string, so a node's totals
+cover every row whose category matches the name of any category in its
+subtree, the node itself included. On SQLite the rollup is one grouped join
+of the closure table with the summary counters; elsewhere a recursive CTE
+walks parent_id and the totals are aggregated from the live tables.
+
+The result is cached as a whole and dropped when a session commits a write to
+category, item or inventory.
+"""
+from itertools import chain
+from typing import Any, List
+
+from sqlalchemy import case, event, func, literal, union_all
+from sqlalchemy.orm import Session, aliased
+from sqlmodel import select
+
+from app.core.cache import named_cache
+from app.models.category import Category, CategoryRollup
+from app.models.category_closure import CategoryClosure, closure_enabled
+from app.models.inventory import Inventory
+from app.models.item import Item
+from app.models.summary import SummaryCounter, counters_enabled
+
+CACHE_NAME = "category_rollup"
+ROLLUP_TABLES = {"category", "item", "inventory"}
+_STALE_KEY = "category_rollup_stale"
+
+
+def _pairs(bind: Any) -> Any:
+    """(ancestor_id, descendant_id) for every node paired with each node of its subtree."""
+    if closure_enabled(bind):
+        return select(CategoryClosure.ancestor_id, CategoryClosure.descendant_id).subquery()
+    tree = select(
+        Category.id.label("ancestor_id"), Category.id.label("descendant_id")
+    ).cte("tree", recursive=True)
+    child = aliased(Category)
+    return tree.union_all(
+        select(tree.c.ancestor_id, child.id).where(child.parent_id == tree.c.descendant_id)
+    )
+
+
+def _totals(bind: Any) -> Any:
+    """(source, category, count, quantity, value) per category name."""
+    if counters_enabled(bind):
+        return select(
+            SummaryCounter.source, SummaryCounter.category, SummaryCounter.count,
+            SummaryCounter.quantity, SummaryCounter.value,
+        ).subquery()
+    return union_all(
+        select(
+            literal("item").label("source"), Item.category.label("category"), func.count().label("count"),
+            func.coalesce(func.sum(Item.quantity), 0).label("quantity"),
+            func.coalesce(func.sum(Item.price * Item.quantity), 0.0).label("value"),
+        ).group_by(Item.category),
+        select(
+            literal("inventory"), Inventory.category, func.count(),
+            func.coalesce(func.sum(Inventory.quantity), 0), literal(0.0),
+        ).group_by(Inventory.category),
+    ).subquery()
+
+
+def rollup_statement(bind: Any) -> Any:
+    pairs = _pairs(bind)
+    descendant = aliased(Category)
+    # Distinct names, so two nodes of one subtree sharing a name do not count its rows twice
+    names = (
+        select(pairs.c.ancestor_id, descendant.name)
+        .join(descendant, descendant.id == pairs.c.descendant_id)
+        .distinct()
+        .subquery()
+    )
+    totals = _totals(bind)
+
+    def total(source: str, column: Any) -> Any:
+        return func.coalesce(func.sum(case((totals.c.source == source, column), else_=0)), 0)
+
+    return (
+        select(
+            Category.id, Category.name, Category.parent_id,
+            total("item", totals.c.count).label("item_count"),
+            total("item", totals.c.quantity).label("item_quantity"),
+            total("item", totals.c.value).label("item_value"),
+            total("inventory", totals.c.count).label("inventory_count"),
+            total("inventory", totals.c.quantity).label("inventory_quantity"),
+        )
+        .outerjoin(names, names.c.ancestor_id == Category.id)
+        .outerjoin(totals, totals.c.category == names.c.name)
+        .group_by(Category.id, Category.name, Category.parent_id)
+        .order_by(Category.name, Category.id)
+    )
+
+
+async def category_rollup(session: Any) -> List[CategoryRollup]:
+    """Totals for every category, each including its whole subtree."""
+    cache = named_cache(CACHE_NAME)
+    data = cache.get(CACHE_NAME) if cache is not None else None
+    if data is None:
+        epoch = cache.epoch() if cache is not None else 0
+        rows = (await session.exec(rollup_statement(session.get_bind()))).all()
+        data = {"nodes": [CategoryRollup.model_validate(row._mapping).model_dump() for row in rows]}
+        if cache is not None:
+            cache.set(CACHE_NAME, data, epoch)
+    return [CategoryRollup.model_validate(node) for node in data["nodes"]]
+
+
+def invalidate_rollup() -> None:
+    cache = named_cache(CACHE_NAME)
+    if cache is not None:
+        cache.invalidate(CACHE_NAME)
+
+
+@event.listens_for(Session, "after_flush")
+def _flag_flushed_writes(session: Session, flush_context: Any) -> None:
+    if any(
+        getattr(obj, "__tablename__", None) in ROLLUP_TABLES
+        for obj in chain(session.new, session.dirty, session.deleted)
+    ):
+        session.info[_STALE_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_bulk_writes(state: Any) -> None:
+    # update()/delete()/insert() statements bypass the flush
+    if (state.is_update or state.is_delete or state.is_insert) and getattr(
+        getattr(state.statement, "table", None), "name", None
+    ) in ROLLUP_TABLES:
+        state.session.info[_STALE_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    if session.info.pop(_STALE_KEY, False):
+        invalidate_rollup()
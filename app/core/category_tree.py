@@ -0,0 +1,142 @@
+from typing import Any, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, literal
+from sqlalchemy.orm import aliased
+from sqlmodel import delete, select, update
+
+from app.core.cache import clear_entity_cache
+from app.core.writes import update_returning
+from app.exceptions import CategoryCycleError, CategoryNotFoundException
+from app.models.category import Category, CategoryNode
+from app.models.category_closure import CategoryClosure, closure_enabled
+
+
+def _descendants(session: Any, id: UUID) -> Any:
+    """(descendant_id, depth) rows of the subtree rooted at `id`, itself included at depth 0."""
+    if closure_enabled(session.get_bind()):
+        return (
+            select(CategoryClosure.descendant_id, CategoryClosure.depth)
+            .where(CategoryClosure.ancestor_id == id)
+            .subquery()
+        )
+    # Without the trigger-maintained closure, walk parent_id with a recursive CTE
+    tree = (
+        select(Category.id.label("descendant_id"), literal(0).label("depth"))
+        .where(Category.id == id)
+        .cte("subtree", recursive=True)
+    )
+    child = aliased(Category)
+    return tree.union_all(
+        select(child.id, tree.c.depth + 1).where(child.parent_id == tree.c.descendant_id)
+    )
+
+
+def _ancestors(session: Any, id: UUID) -> Any:
+    """(ancestor_id, depth) rows of the path from `id` to its root, itself included at depth 0."""
+    if closure_enabled(session.get_bind()):
+        return (
+            select(CategoryClosure.ancestor_id, CategoryClosure.depth)
+            .where(CategoryClosure.descendant_id == id)
+            .subquery()
+        )
+    path = (
+        select(Category.id.label("ancestor_id"), Category.parent_id.label("parent_id"), literal(0).label("depth"))
+        .where(Category.id == id)
+        .cte("path", recursive=True)
+    )
+    parent = aliased(Category)
+    return path.union_all(
+        select(parent.id, parent.parent_id, path.c.depth + 1).where(parent.id == path.c.parent_id)
+    )
+
+
+async def _require(session: Any, id: UUID) -> None:
+    if (await session.exec(select(Category.id).where(Category.id == id))).first() is None:
+        raise CategoryNotFoundException(f"Category {id} not found")
+
+
+async def subtree(session: Any, id: UUID, max_depth: Optional[int] = None) -> List[CategoryNode]:
+    """The category and all of its descendants, breadth first, in one query."""
+    tree = _descendants(session, id)
+    statement = select(Category, tree.c.depth).join(tree, tree.c.descendant_id == Category.id)
+    if max_depth is not None:
+        statement = statement.where(tree.c.depth <= max_depth)
+    rows = (await session.exec(statement.order_by(tree.c.depth, Category.name, Category.id))).all()
+    if not rows:
+        raise CategoryNotFoundException(f"Category {id} not found")
+    return [CategoryNode(**category.model_dump(), depth=depth) for category, depth in rows]
+
+
+async def ancestors(session: Any, id: UUID) -> List[CategoryNode]:
+    """The path from the root down to the category's parent."""
+    await _require(session, id)
+    path = _ancestors(session, id)
+    statement = (
+        select(Category, path.c.depth)
+        .join(path, path.c.ancestor_id == Category.id)
+        .where(path.c.depth > 0)
+        .order_by(path.c.depth.desc())
+    )
+    rows = (await session.exec(statement)).all()
+    return [CategoryNode(**category.model_dump(), depth=depth) for category, depth in rows]
+
+
+async def descendant_count(session: Any, id: UUID) -> int:
+    """Number of categories below `id`, excluding itself."""
+    await _require(session, id)
+    tree = _descendants(session, id)
+    return (await session.exec(select(func.count()).select_from(tree).where(tree.c.depth > 0))).one()
+
+
+async def check_move(session: Any, id: UUID, parent_id: Optional[UUID]) -> None:
+    """Reject a new parent that does not exist or lies inside the category's own subtree."""
+    if parent_id is None:
+        return
+    await _require(session, parent_id)
+    tree = _descendants(session, id)
+    inside = (await session.exec(select(tree.c.descendant_id).where(tree.c.descendant_id == parent_id))).first()
+    if inside is not None:
+        raise CategoryCycleError(f"Category {id} cannot be moved under its own subtree")
+
+
+async def update_category(session: Any, id: UUID, update_data: dict) -> Optional[Category]:
+    """
+    Apply `update_data` to a category with one UPDATE, moving it when `parent_id` is given.
+
+    The move check and the UPDATE share one transaction; on SQLite the closure
+    triggers rewrite the subtree's ancestor links inside that same transaction.
+    """
+    if "parent_id" in update_data:
+        try:
+            await check_move(session, id, update_data["parent_id"])
+        except Exception:
+            await session.rollback()
+            raise
+    return await update_returning(session, Category, id, update_data)
+
+
+async def delete_category(session: Any, id: UUID) -> bool:
+    """Delete a category with one DELETE; its children move up to its parent."""
+    bind = session.get_bind()
+    statement = delete(Category).where(Category.id == id)
+    try:
+        if bind.dialect.delete_returning:
+            row = (await session.exec(statement.returning(Category.parent_id))).first()
+        else:
+            row = (await session.exec(select(Category.parent_id).where(Category.id == id))).first()
+            if row is not None:
+                await session.exec(statement)
+        if row is None:
+            await session.rollback()
+            return False
+        # On SQLite the closure trigger reparents the children itself
+        if not closure_enabled(bind):
+            await session.exec(update(Category).where(Category.parent_id == id).values(parent_id=row.parent_id))
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    # Reparented children are stale in the cache too
+    clear_entity_cache(Category)
+    return True
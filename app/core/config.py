@@ -1,15 +1,87 @@
 from pydantic_settings import BaseSettings
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "test"
     API_V1_STR: str = "/api/v1"
     DATABASE_URL: str = "sqlite:///./app.db"
-    
+
+    # Database access mode: "sync" runs queries on the blocking Session,
+    # "async" uses an AsyncEngine/AsyncSession (e.g. aiosqlite for SQLite).
+    DATABASE_MODE: str = "sync"
+    # Optional explicit async driver URL; derived from DATABASE_URL when unset
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # SQLite PRAGMA preset applied to every new connection: "none" (SQLite's own defaults),
+    # "dev", "throughput", "durable" or "bulk_load" (offline loads only; unsafe on a crash)
+    SQLITE_PROFILE: str = "none"
+    # Per-PRAGMA overrides on top of the preset, e.g. {"cache_size": -131072}
+    SQLITE_PRAGMAS: Dict[str, Union[int, str]] = {}
+
+    # Group commit: single-row creates and updates from concurrent requests share one
+    # transaction, flushed after GROUP_COMMIT_WINDOW_MS or once GROUP_COMMIT_MAX_OPS are waiting.
+    # Each request still returns only after the commit holding its write has completed.
+    GROUP_COMMIT_ENABLED: bool = False
+    GROUP_COMMIT_WINDOW_MS: float = 2.0
+    GROUP_COMMIT_MAX_OPS: int = 256
+
+    # Rows per executemany batch for bulk endpoints
+    BULK_CHUNK_SIZE: int = 500
+    # Largest ?limit= accepted by list, filter and search routes
+    PAGE_MAX_LIMIT: int = 10_000
+    # Most ids accepted by one GET/POST /batch request
+    BATCH_GET_MAX_IDS: int = 1000
+    # Rows fetched per server-side cursor batch for ?stream= responses
+    STREAM_CHUNK_SIZE: int = 1000
+    # Stock-take imports: rows validated and committed per transaction, and line errors kept in the report
+    IMPORT_BATCH_SIZE: int = 5000
+    IMPORT_MAX_ERRORS: int = 1000
+    # Background exports: snapshot files and their job manifests go to EXPORT_DIR
+    EXPORT_DIR: str = "./exports"
+    EXPORT_WORKERS: int = 1
+    # gzip (1-9) or zstd (1-22) level; 3 is about 3x faster than gzip's usual 6 for ~8% larger files
+    EXPORT_COMPRESSION_LEVEL: int = 3
+
+    # Text search backend: "fts" uses SQLite FTS5 indexes, "like" scans with LIKE '%q%'
+    SEARCH_BACKEND: str = "fts"
+
+    # In-process get-by-id cache per model: max entries (0 disables) and TTL in seconds.
+    # Each worker has its own cache, so other workers' writes show up after at most the TTL.
+    ITEM_CACHE_SIZE: int = 1024
+    ITEM_CACHE_TTL: float = 30.0
+    INVENTORY_CACHE_SIZE: int = 1024
+    INVENTORY_CACHE_TTL: float = 30.0
+    CATEGORY_CACHE_SIZE: int = 256
+    CATEGORY_CACHE_TTL: float = 300.0
+    USER_CACHE_SIZE: int = 1024
+    USER_CACHE_TTL: float = 30.0
+    # Category tree rollup: one entry, also dropped on any committed category/item/inventory write
+    CATEGORY_ROLLUP_CACHE_SIZE: int = 1
+    CATEGORY_ROLLUP_CACHE_TTL: float = 60.0
+
+    # Serve Prometheus request metrics at /metrics
+    METRICS_ENABLED: bool = True
+    # Debug mode: adds X-DB-Query-Count/-Time-Ms/-Slowest-* headers to every response
+    DEBUG: bool = False
+    # Warn when one statement shape runs more than this many times in a request (0 disables)
+    QUERY_REPEAT_THRESHOLD: int = 10
+
+    # On-demand request profiling (see app/core/profiling.py). Requests carrying
+    # PROFILING_HEADER: PROFILING_TOKEN are profiled, plus a random PROFILING_SAMPLE_RATE share.
+    PROFILING_ENABLED: bool = False
+    PROFILING_HEADER: str = "X-Profile"
+    PROFILING_TOKEN: Optional[str] = None
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_MAX_PER_MINUTE: int = 10
+    # "cprofile" writes .prof files, "sample" writes collapsed stacks for flamegraphs
+    PROFILING_MODE: str = "cprofile"
+    PROFILING_SAMPLE_INTERVAL: float = 0.001
+    PROFILING_DIR: str = "./profiles"
+
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8000"]
 
     class Config:
         case_sensitive = True
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -1,17 +1,271 @@
+import logging
+import threading
+
+from sqlalchemy import Index, event, func, inspect, select
 from sqlmodel import SQLModel, create_engine, Session
-from typing import Generator
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Union
 
 from app.core import config
+from app.core.ids import migrate_uuid_storage
+from app.core.query_stats import install_query_stats
 
 # Database URL from settings
 database_url = str(config.settings.DATABASE_URL)
 
 connect_args = {"check_same_thread": False} if "sqlite" in database_url else {}
+
+# PRAGMA presets for SQLite connections, selected by SQLITE_PROFILE.
+# WAL lets readers run alongside the single writer; synchronous=NORMAL is
+# crash-safe under WAL but may lose the last commits on power loss, FULL does not.
+# cache_size is in KiB when negative; mmap_size is in bytes.
+SQLITE_PROFILES: Dict[str, Dict[str, Union[int, str]]] = {
+    "none": {},
+    "dev": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+    },
+    "throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16384,
+        "temp_store": "MEMORY",
+        "busy_timeout": 10000,
+    },
+    # Offline loads only: a crash mid-load can corrupt the database
+    "bulk_load": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+
+def sqlite_pragmas(profile: str, overrides: Optional[Dict[str, Union[int, str]]] = None) -> Dict[str, Union[int, str]]:
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE {profile!r}; expected one of {', '.join(SQLITE_PROFILES)}")
+    return {**SQLITE_PROFILES[profile], **(overrides or {})}
+
+
+def install_sqlite_pragmas(sync_engine: Any, pragmas: Dict[str, Union[int, str]]) -> None:
+    """Run `pragmas` on every connection the engine's pool opens."""
+    if sync_engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def apply_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
+pragmas = sqlite_pragmas(config.settings.SQLITE_PROFILE, config.settings.SQLITE_PRAGMAS)
 engine = create_engine(database_url, connect_args=connect_args)
+install_sqlite_pragmas(engine, pragmas)
+install_query_stats(engine)
+
+# Async drivers used when DATABASE_MODE is "async"
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync database URL to its async driver equivalent."""
+    if config.settings.ASYNC_DATABASE_URL:
+        return config.settings.ASYNC_DATABASE_URL
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+async_engine: Optional[AsyncEngine] = None
+if config.settings.DATABASE_MODE == "async":
+    async_engine = create_async_engine(get_async_database_url(database_url), connect_args=connect_args)
+    install_sqlite_pragmas(async_engine.sync_engine, pragmas)
+    install_query_stats(async_engine.sync_engine)
+
+
+class AwaitableSession:
+    """
+    Wraps a blocking Session behind the AsyncSession interface.
+
+    Lets routers and services be written once against awaitable calls while
+    DATABASE_MODE is "sync"; the queries still run on the calling thread.
+    """
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, instance: Any) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances: Any) -> None:
+        self.sync_session.add_all(instances)
+
+    def expunge(self, instance: Any) -> None:
+        self.sync_session.expunge(instance)
+
+    def get_bind(self, *args: Any, **kwargs: Any) -> Any:
+        return self.sync_session.get_bind(*args, **kwargs)
+
+    def in_transaction(self) -> bool:
+        return self.sync_session.in_transaction()
+
+    async def exec(self, statement: Any, **kwargs: Any) -> Any:
+        return self.sync_session.exec(statement, **kwargs)
+
+    async def execute(self, statement: Any, *args: Any, **kwargs: Any) -> Any:
+        return self.sync_session.execute(statement, *args, **kwargs)
+
+    async def scalar(self, statement: Any, *args: Any, **kwargs: Any) -> Any:
+        return self.sync_session.scalar(statement, *args, **kwargs)
+
+    async def get(self, entity: Any, ident: Any, **kwargs: Any) -> Any:
+        return self.sync_session.get(entity, ident, **kwargs)
+
+    async def delete(self, instance: Any) -> None:
+        self.sync_session.delete(instance)
+
+    async def merge(self, instance: Any, **kwargs: Any) -> Any:
+        return self.sync_session.merge(instance, **kwargs)
+
+    async def flush(self, objects: Any = None) -> None:
+        self.sync_session.flush(objects)
+
+    async def commit(self) -> None:
+        self.sync_session.commit()
+
+    async def rollback(self) -> None:
+        self.sync_session.rollback()
+
+    async def refresh(self, instance: Any, **kwargs: Any) -> None:
+        self.sync_session.refresh(instance, **kwargs)
+
+    async def close(self) -> None:
+        self.sync_session.close()
+
+    async def run_sync(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        return fn(self.sync_session, *args, **kwargs)
+
+
+DBSession = Union[AsyncSession, AwaitableSession]
+
+
+def as_async_session(session: Union[Session, DBSession]) -> DBSession:
+    """Return an awaitable session, wrapping a plain Session if needed."""
+    if isinstance(session, Session):
+        return AwaitableSession(session)
+    return session
+
+
+_blocking_engines: Dict[str, Any] = {}
+_blocking_engines_lock = threading.Lock()
+
+
+def blocking_engine(bind: Any) -> Any:
+    """
+    A blocking engine on the same database as `bind`, for work done on other threads.
+
+    Returns `bind` itself unless it belongs to an async engine, whose
+    connections can only be used from the event loop.
+    """
+    if not bind.dialect.is_async:
+        return bind
+    url = bind.url.set(drivername=bind.url.get_backend_name())
+    with _blocking_engines_lock:
+        if str(url) not in _blocking_engines:
+            sync_engine = create_engine(url, connect_args=connect_args)
+            install_sqlite_pragmas(sync_engine, pragmas)
+            install_query_stats(sync_engine)
+            _blocking_engines[str(url)] = sync_engine
+        return _blocking_engines[str(url)]
+
+
+def missing_indexes(connection: Any) -> List[Index]:
+    """The models' indexes absent from tables that an older release created without them."""
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    missing = []
+    for table in SQLModel.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        present = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing += sorted((index for index in table.indexes if index.name not in present), key=lambda index: index.name)
+    return missing
+
+
+def duplicate_keys(connection: Any, index: Index, limit: int = 20) -> List[Any]:
+    """Up to `limit` key values that more than one row shares, with their row counts, blocking a unique `index`."""
+    columns = list(index.columns)
+    statement = (
+        select(*columns, func.count().label("rows"))
+        .group_by(*columns)
+        .having(func.count() > 1)
+        .order_by(*columns)
+        .limit(limit)
+    )
+    return list(connection.execute(statement).all())
+
+
+def create_missing_indexes(connection: Any, unique: bool = False) -> List[str]:
+    """
+    Create the models' indexes on tables that an older release created without them.
+
+    create_all skips a table that already exists, indexes included. Unique
+    indexes are only created when `unique` is set, since rows already in the
+    table may violate them; see duplicate_keys(). Returns the names of the
+    indexes created.
+    """
+    created = []
+    for index in missing_indexes(connection):
+        if index.unique and not unique:
+            continue
+        index.create(connection)
+        created.append(index.name)
+    return created
+
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        # Ids written as hex text before 16-byte blob storage are invisible to lookups by id
+        converted = {table: rows for table, rows in migrate_uuid_storage(connection).items() if rows}
+        create_missing_indexes(connection)
+        skipped = [index.name for index in missing_indexes(connection)]
+    if converted:
+        counts = ", ".join(f"{table} {rows:,}" for table, rows in converted.items())
+        logging.warning(f"Converted ids stored as text to 16-byte blobs: {counts}")
+    if skipped:
+        logging.warning(f"Unique indexes missing: {', '.join(skipped)}; run `python -m app.cli create-indexes`")
+
+
+async def dispose_engines():
+    if async_engine is not None:
+        await async_engine.dispose()
+    for sync_engine in _blocking_engines.values():
+        sync_engine.dispose()
+    engine.dispose()
+
 
-def get_session() -> Generator[Session, None, None]:
-    with Session(engine) as session:
-        yield session
\ No newline at end of file
+async def get_session() -> AsyncGenerator[DBSession, None]:
+    if async_engine is not None:
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+    else:
+        with Session(engine) as session:
+            yield AwaitableSession(session)
@@ -0,0 +1,219 @@
+"""
+Deterministic synthetic datasets for scale testing.
+
+Rows are generated from a seeded RNG, so the same spec always produces the same
+database. Categories and description words follow a Zipf distribution, and the
+category table forms deep `parent_id` trees whose roots are the item CATEGORIES.
+"""
+import random
+import time
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import text
+
+from app.core.ids import uuid7_from
+from app.core.search import SEARCH_TABLES, search_ddl, rebuild_search_index
+from app.models.category import Category
+from app.models.error import Error
+from app.models.inventory import Inventory
+from app.models.item import CATEGORIES, Item
+from app.models.summary import COUNTER_SOURCES, counter_triggers, rebuild_summary_counters
+from app.models.user import User
+
+SYLLABLES = "ka lo mi ne ru sa te vo zi pa de fu go hi ja".split()
+WORDS = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+ERROR_MESSAGES = [
+    ("Item not found", 404),
+    ("Inventory not found", 404),
+    ("Invalid category", 400),
+    ("Validation failed", 422),
+    ("Insufficient stock", 409),
+    ("Invalid pagination cursor", 400),
+    ("Database is locked", 500),
+    ("Upstream timeout", 504),
+    ("Internal Server Error", 500),
+]
+# Distinct descriptions generated up front and then sampled, so long texts stay cheap
+DESCRIPTION_POOL = 4096
+PICK_CHUNK = 10_000
+# Generated ids are UUIDv7 with timestamps counting up from here, one millisecond per row
+ID_EPOCH_MS = 1_704_067_200_000  # 2024-01-01T00:00:00Z
+
+
+@dataclass
+class DatasetSpec:
+    items: int = 100_000
+    inventory: int = 100_000
+    categories: int = 1_000
+    users: int = 1_000
+    errors: int = 10_000
+    seed: int = 1
+    # Zipf exponent for category and word frequencies; 0 gives a uniform spread
+    skew: float = 1.1
+    tree_depth: int = 8
+    description_words: int = 30
+    batch_size: int = 20_000
+
+
+def zipf_cum_weights(n: int, skew: float) -> List[float]:
+    return list(accumulate(1 / rank ** skew for rank in range(1, n + 1)))
+
+
+def _uuid(rng: random.Random, i: int) -> UUID:
+    return uuid7_from(ID_EPOCH_MS + i, rng.getrandbits(12), rng.getrandbits(62))
+
+
+class DatasetGenerator:
+    def __init__(self, spec: DatasetSpec):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        word_weights = zipf_cum_weights(len(WORDS), spec.skew)
+        self.descriptions = [
+            " ".join(self.rng.choices(WORDS, cum_weights=word_weights, k=spec.description_words))
+            for _ in range(DESCRIPTION_POOL)
+        ]
+        self.names = self.rng.choices(WORDS, cum_weights=word_weights, k=DESCRIPTION_POOL)
+        self.category_names: List[str] = []
+
+    def _name(self, i: int) -> str:
+        return f"{self.rng.choice(self.names)} {self.rng.choice(self.names)} {i}"
+
+    def _picks(self, population: Sequence[Any], cum_weights: Optional[List[float]], n: int) -> Iterator[Any]:
+        """`n` weighted picks, drawn a chunk at a time since choices(k=...) is much cheaper per pick."""
+        for start in range(0, n, PICK_CHUNK):
+            yield from self.rng.choices(population, cum_weights=cum_weights, k=min(PICK_CHUNK, n - start))
+
+    def categories(self) -> Iterator[Dict[str, Any]]:
+        """
+        Category forest: the item CATEGORIES are the roots, and most nodes extend the
+        previous node's chain, so branches reach `tree_depth` levels.
+        """
+        spec, rng = self.spec, self.rng
+        depths: List[int] = []
+        ids: List[UUID] = []
+        for i in range(spec.categories):
+            if i < len(CATEGORIES):
+                name, parent, depth = CATEGORIES[i], None, 0
+            else:
+                candidate = i - 1 if rng.random() < 0.6 else rng.randrange(i)
+                while depths[candidate] >= spec.tree_depth - 1:
+                    candidate = rng.randrange(i)
+                name, parent, depth = self._name(i), ids[candidate], depths[candidate] + 1
+            ids.append(_uuid(rng, i))
+            depths.append(depth)
+            self.category_names.append(name)
+            yield {"id": ids[-1], "name": name, "description": rng.choice(self.descriptions), "parent_id": parent}
+
+    def items(self) -> Iterator[Dict[str, Any]]:
+        rng = self.rng
+        categories = self._picks(CATEGORIES, zipf_cum_weights(len(CATEGORIES), self.spec.skew), self.spec.items)
+        descriptions = self._picks(self.descriptions, None, self.spec.items)
+        for i, category, description in zip(range(self.spec.items), categories, descriptions):
+            yield {
+                "id": _uuid(rng, i),
+                "name": self._name(i),
+                "category": category,
+                "description": description,
+                "price": round(rng.lognormvariate(3, 1), 2),
+                "quantity": int(rng.paretovariate(1.5)) - 1,
+            }
+
+    def inventory(self) -> Iterator[Dict[str, Any]]:
+        rng = self.rng
+        names = self.category_names or CATEGORIES
+        categories = self._picks(names, zipf_cum_weights(len(names), self.spec.skew), self.spec.inventory)
+        descriptions = self._picks(self.descriptions, None, self.spec.inventory)
+        for i, category, description in zip(range(self.spec.inventory), categories, descriptions):
+            yield {
+                "id": _uuid(rng, i),
+                "name": self._name(i),
+                "category": category,
+                "description": description,
+                "quantity": int(rng.paretovariate(1.2)) - 1,
+            }
+
+    def users(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self.spec.users):
+            yield {"username": f"user{i}", "email": f"user{i}@example.com", "password": "!", "inventory": None}
+
+    def errors(self) -> Iterator[Dict[str, Any]]:
+        weights = zipf_cum_weights(len(ERROR_MESSAGES), self.spec.skew)
+        for _ in range(self.spec.errors):
+            message, code = self.rng.choices(ERROR_MESSAGES, cum_weights=weights)[0]
+            yield {"message": message, "code": code}
+
+
+def batches(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _drop_maintenance_triggers(connection: Any) -> None:
+    triggers = connection.execute(text(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name IN ('item', 'inventory')"
+    )).scalars().all()
+    for name in triggers:
+        connection.execute(text(f"DROP TRIGGER {name}"))
+
+
+def _restore_maintenance_triggers(connection: Any) -> None:
+    rebuild_summary_counters(connection)
+    for source in COUNTER_SOURCES:
+        for trigger in counter_triggers(source):
+            connection.execute(text(trigger))
+    if connection.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'item_fts'")).first():
+        for name in SEARCH_TABLES:
+            for statement in search_ddl(name):
+                connection.execute(text(statement))
+        rebuild_search_index(connection)
+
+
+def load_dataset(engine: Any, spec: DatasetSpec, report: Callable[[str, int, float], None] = lambda *a: None) -> None:
+    """
+    Bulk-insert a generated dataset with chunked executemany, one transaction per chunk.
+
+    On SQLite the counter and FTS triggers and the secondary indexes of the
+    loaded tables are dropped for the load and rebuilt once at the end, which
+    is much faster than maintaining them row by row.
+    """
+    generator = DatasetGenerator(spec)
+    # Categories first: inventory rows reference their names
+    plan: Sequence[Any] = [
+        (Category, generator.categories),
+        (Item, generator.items),
+        (Inventory, generator.inventory),
+        (User, generator.users),
+        (Error, generator.errors),
+    ]
+    sqlite = engine.dialect.name == "sqlite"
+    indexes = [index for model, _ in plan for index in model.__table__.indexes if not index.unique]
+    if sqlite:
+        with engine.begin() as connection:
+            _drop_maintenance_triggers(connection)
+            for index in indexes:
+                index.drop(connection, checkfirst=True)
+    try:
+        for model, rows in plan:
+            started, count = time.perf_counter(), 0
+            for batch in batches(rows(), spec.batch_size):
+                with engine.begin() as connection:
+                    connection.execute(model.__table__.insert(), batch)
+                count += len(batch)
+            report(model.__tablename__, count, time.perf_counter() - started)
+    finally:
+        if sqlite:
+            started = time.perf_counter()
+            with engine.begin() as connection:
+                for index in indexes:
+                    index.create(connection, checkfirst=True)
+                _restore_maintenance_triggers(connection)
+            report("indexes, counters and search", 0, time.perf_counter() - started)
@@ -0,0 +1,28 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json, to_jsonable_python
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode `content` as compact JSON bytes, with orjson when it is installed.
+
+    orjson handles dicts, lists, UUIDs and datetimes natively; anything else
+    (pydantic models, Decimals) goes through pydantic's encoder.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=to_jsonable_python)
+    return to_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded by `dumps` instead of the stdlib json module."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,236 @@
+import csv
+import gzip
+import io
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Literal, Optional, Tuple
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import func, select
+
+from app.core import config
+from app.core.database import blocking_engine
+from app.core.encoding import dumps
+from app.core.ids import uuid7
+from app.models.inventory import Inventory
+from app.models.item import Item
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstd exports are optional
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ExportTable = Literal["item", "inventory"]
+ExportFormat = Literal["csv", "ndjson"]
+ExportCompression = Literal["gzip", "zstd"]
+
+SUFFIXES = {"gzip": "gz", "zstd": "zst"}
+MEDIA_TYPES = {"gzip": "application/gzip", "zstd": "application/zstd"}
+
+
+class ExportRequest(BaseModel):
+    """Body of POST /export."""
+    table: ExportTable
+    format: ExportFormat = "csv"
+    compression: ExportCompression = "gzip"
+
+
+class ExportJob(BaseModel):
+    """State of an export, kept as a JSON manifest next to its file."""
+    id: UUID
+    table: ExportTable
+    format: ExportFormat
+    compression: ExportCompression
+    status: Literal["queued", "running", "done", "failed"] = "queued"
+    rows: int = 0
+    size: Optional[int] = None
+    file: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
+def export_statement(table: ExportTable) -> Any:
+    """Every row in key order; items carry their valuation, price times quantity."""
+    if table == "item":
+        value = (func.coalesce(Item.price, 0.0) * Item.quantity).label("value")
+        return select(*Item.__table__.columns, value).order_by(Item.id)
+    return select(*Inventory.__table__.columns).order_by(Inventory.id)
+
+
+def _path(name: str) -> str:
+    return os.path.join(config.settings.EXPORT_DIR, name)
+
+
+def manifest_path(id: UUID) -> str:
+    return _path(f"{id.hex}.json")
+
+
+def file_path(job: ExportJob) -> str:
+    return _path(job.file)
+
+
+def save_job(job: ExportJob) -> None:
+    """Write the manifest atomically, so any worker process can read a consistent status."""
+    path = manifest_path(job.id)
+    with open(f"{path}.tmp", "w") as file:
+        file.write(job.model_dump_json())
+    os.replace(f"{path}.tmp", path)
+
+
+def load_job(id: UUID) -> Optional[ExportJob]:
+    try:
+        with open(manifest_path(id)) as file:
+            return ExportJob.model_validate_json(file.read())
+    except FileNotFoundError:
+        return None
+
+
+def _open_compressed(path: str, compression: ExportCompression) -> BinaryIO:
+    level = config.settings.EXPORT_COMPRESSION_LEVEL
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=level).stream_writer(open(path, "wb"))
+    return gzip.open(path, "wb", compresslevel=level)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def run_export(job: ExportJob, engine: Any) -> None:
+    """Write the job's file from a server-side cursor, updating the manifest after every batch."""
+    job.status = "running"
+    save_job(job)
+    part = f"{file_path(job)}.part"
+    try:
+        with engine.connect() as connection, _open_compressed(part, job.compression) as raw:
+            result = connection.execution_options(yield_per=config.settings.STREAM_CHUNK_SIZE).execute(
+                export_statement(job.table)
+            )
+            names = list(result.keys())
+            if job.format == "csv":
+                text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+                writer = csv.writer(text)
+                writer.writerow(names)
+            for rows in result.partitions():
+                if job.format == "csv":
+                    writer.writerows(rows)
+                else:
+                    raw.write(b"".join(dumps(dict(zip(names, row))) + b"\n" for row in rows))
+                job.rows += len(rows)
+                save_job(job)
+            if job.format == "csv":
+                # Flush into the compressor before it is closed, without closing it twice
+                text.flush()
+                text.detach()
+        os.replace(part, file_path(job))
+        job.status, job.size = "done", os.path.getsize(file_path(job))
+    except Exception as e:
+        logger.error(f"Export {job.id} failed: {e}")
+        job.status, job.error = "failed", str(e)
+        if os.path.exists(part):
+            os.remove(part)
+    job.finished_at = datetime.now(timezone.utc)
+    save_job(job)
+
+
+def submit_export(request: ExportRequest, bind: Any) -> ExportJob:
+    """
+    Queue an export on the worker pool and return its job.
+
+    Raises ValueError when zstd is asked for but the zstandard package is missing.
+    """
+    global _executor
+    if request.compression == "zstd" and zstandard is None:
+        raise ValueError("zstd compression needs the zstandard package")
+    os.makedirs(config.settings.EXPORT_DIR, exist_ok=True)
+    id = uuid7()
+    job = ExportJob(
+        id=id,
+        **request.model_dump(),
+        file=f"{request.table}-{id.hex}.{request.format}.{SUFFIXES[request.compression]}",
+        created_at=datetime.now(timezone.utc),
+    )
+    save_job(job)
+    engine = blocking_engine(bind)
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.settings.EXPORT_WORKERS, thread_name_prefix="export")
+        future = _executor.submit(run_export, job.model_copy(), engine)
+
+    def fail_if_cancelled(future: Future) -> None:
+        if future.cancelled():
+            _fail(job, "Cancelled by application shutdown before it started")
+
+    future.add_done_callback(fail_if_cancelled)
+    return job
+
+
+def _fail(job: ExportJob, reason: str) -> None:
+    job.status, job.error, job.finished_at = "failed", reason, datetime.now(timezone.utc)
+    save_job(job)
+
+
+def shutdown_exports() -> None:
+    """Let running exports finish and fail queued ones, on application shutdown."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def fail_interrupted_exports() -> int:
+    """
+    Mark exports a previous process left queued or running as failed, on application startup.
+
+    Runs before this process accepts requests, so any such manifest belongs to
+    a process that died or was stopped mid-export. Returns the jobs failed.
+    """
+    if not os.path.isdir(config.settings.EXPORT_DIR):
+        return 0
+    failed = 0
+    for name in os.listdir(config.settings.EXPORT_DIR):
+        if not name.endswith(".json"):
+            continue
+        with open(_path(name)) as file:
+            job = ExportJob.model_validate_json(file.read())
+        if job.status in ("queued", "running"):
+            part = f"{file_path(job)}.part"
+            if os.path.exists(part):
+                os.remove(part)
+            _fail(job, f"Interrupted while {job.status}: the application stopped before the export finished")
+            failed += 1
+    if failed:
+        logger.warning(f"Marked {failed} interrupted exports as failed")
+    return failed
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    The inclusive byte range of a single-range `Range: bytes=...` header.
+
+    Returns None to send the whole file: no header, another unit, several
+    ranges or a malformed one. Raises ValueError when the range lies outside
+    the file.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start, _, end = header[len("bytes="):].strip().partition("-")
+    try:
+        if start:
+            first, last = int(start), int(end) if end else size - 1
+        else:
+            # bytes=-N is the last N bytes
+            first, last = max(size - int(end), 0), size - 1
+    except ValueError:
+        return None
+    if first >= size or last < first:
+        raise ValueError(f"Range {header!r} not satisfiable for {size} bytes")
+    return first, min(last, size - 1)
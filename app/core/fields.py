@@ -0,0 +1,77 @@
+from typing import Any, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import Select, select
+from sqlalchemy.engine import Row
+from sqlmodel import SQLModel
+
+from app.core.cache import cached_get, entity_cache
+from app.core.encoding import FastJSONResponse
+from app.core.pagination import CursorPage
+from app.exceptions import InvalidFieldsError
+
+
+def parse_fields(model: Type[SQLModel], fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Column names from `?fields=name,quantity`, id first; None when every column is wanted.
+
+    The primary key is always included so that rows stay addressable.
+    Raises InvalidFieldsError on a name that is not a column of `model`.
+    """
+    names = [part.strip() for part in (fields or "").split(",") if part.strip()]
+    if not names:
+        return None
+    columns = model.__table__.columns
+    unknown = [name for name in names if name not in columns]
+    if unknown:
+        raise InvalidFieldsError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(dict.fromkeys(["id", *names]))
+
+
+def column_names(model: Type[SQLModel]) -> Tuple[str, ...]:
+    return tuple(model.__table__.columns.keys())
+
+
+def select_fields(model: Type[SQLModel], names: Optional[Sequence[str]], keys: Sequence[Any] = ()) -> Select:
+    """
+    A Core select of the columns `names` of `model`, for the caller to add filters and order to.
+
+    With `names` None every column is selected; the rows are still plain
+    tuples, which skips ORM hydration. `keys` are the keyset pagination
+    columns; they are selected after `names` so the next cursor can be
+    built, and dropped again by `fields_response`.
+    """
+    columns = model.__table__.columns
+    wanted = dict.fromkeys([*(names or columns.keys()), *(key.key for key in keys)])
+    return select(*(columns[name] for name in wanted)).select_from(model.__table__)
+
+
+async def get_fields(session: Any, model: Type[SQLModel], id: Any, names: Optional[Sequence[str]]) -> Any:
+    """One row by primary key: whole through the entity cache when it is on, else only the wanted columns."""
+    if entity_cache(model) is not None:
+        return await cached_get(session, model, id)
+    return (await session.exec(select_fields(model, names).where(model.id == id))).first()
+
+
+def as_dict(row: Any, names: Sequence[str]) -> dict:
+    """The fields `names` of a Core row or a model instance."""
+    if isinstance(row, Row):
+        # select_fields puts `names` first, so zip drops trailing sort keys
+        return dict(zip(names, row))
+    return {name: getattr(row, name) for name in names}
+
+
+def fields_response(model: Type[SQLModel], names: Optional[Sequence[str]], result: Any) -> FastJSONResponse:
+    """
+    Encode one row, a list of rows or a CursorPage with only the fields `names`, or every column when None.
+
+    Rows from `select_fields` are encoded as they come from the driver,
+    without validating them against the route's response_model again.
+    """
+    names = names or column_names(model)
+    if isinstance(result, CursorPage):
+        content = {"items": [as_dict(row, names) for row in result.items], "next_cursor": result.next_cursor}
+    elif isinstance(result, (list, tuple)):
+        content = [as_dict(row, names) for row in result]
+    else:
+        content = as_dict(result, names)
+    return FastJSONResponse(content)
@@ -0,0 +1,144 @@
+import asyncio
+import contextvars
+import weakref
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlmodel import Session, SQLModel
+
+from app.core import config
+from app.core.database import blocking_engine
+
+# A write to run inside a shared transaction: takes a blocking Session, returns the request's result
+WriteOp = Callable[[Session], Any]
+
+
+class GroupCommitWriter:
+    """
+    Runs writes from concurrent requests in shared transactions, one commit per group.
+
+    The first write to arrive opens a window of `window` seconds, cut short
+    once `max_ops` writes are waiting; the group then runs and commits on a
+    worker thread while the next group collects. Each caller resumes only
+    after the commit holding its write returns, so a completed request is
+    exactly as durable as with its own commit. When a write fails, the group
+    is rolled back and its writes rerun one transaction each, so only the
+    failing request sees the error. A group's statements are shared by its
+    requests, so per-request query stats leave them out.
+    """
+
+    def __init__(self, engine: Any, window: float, max_ops: int):
+        self.engine = engine
+        self.window = window
+        self.max_ops = max_ops
+        self.commits = 0
+        self._pending: List[Tuple[WriteOp, asyncio.Future]] = []
+        self._full: Optional[asyncio.Event] = None
+        self._drainer: Optional[asyncio.Task] = None
+
+    async def run(self, op: WriteOp) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((op, future))
+        if len(self._pending) >= self.max_ops and self._full is not None:
+            self._full.set()
+        if self._drainer is None:
+            # A fresh context, so the group's statements are not credited to the request that started it
+            self._drainer = contextvars.Context().run(asyncio.create_task, self._drain())
+        return await future
+
+    async def _drain(self) -> None:
+        self._full = asyncio.Event()
+        try:
+            while self._pending:
+                if len(self._pending) < self.max_ops:
+                    self._full.clear()
+                    try:
+                        await asyncio.wait_for(self._full.wait(), self.window)
+                    except asyncio.TimeoutError:
+                        pass
+                group, self._pending = self._pending[:self.max_ops], self._pending[self.max_ops:]
+                try:
+                    outcomes = await asyncio.to_thread(self._commit_group, [op for op, _ in group])
+                except asyncio.CancelledError:
+                    for _, future in group + self._pending:
+                        future.cancel()
+                    raise
+                except Exception as e:
+                    outcomes = [(False, e)] * len(group)
+                for (_, future), (ok, value) in zip(group, outcomes):
+                    if future.done():
+                        continue
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(value)
+        finally:
+            self._drainer = None
+
+    def _commit(self, ops: List[WriteOp]) -> List[Any]:
+        with Session(self.engine, expire_on_commit=False) as session:
+            results = [op(session) for op in ops]
+            session.commit()
+        self.commits += 1
+        return results
+
+    def _commit_group(self, ops: List[WriteOp]) -> List[Tuple[bool, Any]]:
+        """(succeeded, result or exception) per op."""
+        try:
+            return [(True, result) for result in self._commit(ops)]
+        except Exception as e:
+            if len(ops) == 1:
+                return [(False, e)]
+        outcomes = []
+        for op in ops:
+            try:
+                outcomes.append((True, self._commit([op])[0]))
+            except Exception as e:
+                outcomes.append((False, e))
+        return outcomes
+
+
+_writers: "weakref.WeakKeyDictionary[Any, GroupCommitWriter]" = weakref.WeakKeyDictionary()
+
+
+def group_commit_enabled() -> bool:
+    return config.settings.GROUP_COMMIT_ENABLED
+
+
+def group_writer(session: Any) -> GroupCommitWriter:
+    """The writer for the database behind `session`, created on first use."""
+    engine = blocking_engine(session.get_bind())
+    writer = _writers.get(engine)
+    if writer is None:
+        writer = _writers[engine] = GroupCommitWriter(
+            engine, config.settings.GROUP_COMMIT_WINDOW_MS / 1000, config.settings.GROUP_COMMIT_MAX_OPS
+        )
+    return writer
+
+
+def _add(session: Session, instance: SQLModel) -> SQLModel:
+    session.add(instance)
+    session.flush()
+    return instance
+
+
+async def add_and_commit(session: Any, instance: SQLModel) -> SQLModel:
+    """Insert one row: through the group-commit writer when GROUP_COMMIT_ENABLED, else add, commit and refresh."""
+    if group_commit_enabled():
+        return await group_writer(session).run(lambda sync_session: _add(sync_session, instance))
+    session.add(instance)
+    await session.commit()
+    await session.refresh(instance)
+    return instance
+
+
+async def run_write(session: Any, op: WriteOp) -> Any:
+    """Run `op` on a blocking Session and commit: through the group-commit writer when enabled, else on `session`."""
+    if group_commit_enabled():
+        return await group_writer(session).run(op)
+    try:
+        result = await session.run_sync(op)
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    return result
@@ -0,0 +1,146 @@
+"""
+Time-ordered primary keys.
+
+`uuid7` builds RFC 9562 version 7 UUIDs: a 48-bit Unix millisecond timestamp
+followed by random bits, so keys generated later sort later. New rows land at
+the right edge of the primary key B-tree instead of on a random page, and
+`ORDER BY id` is creation order.
+
+`UUIDBinary` stores UUIDs as 16 raw bytes (native `uuid` on PostgreSQL)
+rather than the 32-character hex text SQLAlchemy uses on SQLite. Byte order
+equals the UUID's own order, so the time ordering carries over to the index.
+"""
+import secrets
+import threading
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import LargeBinary, Uuid, text
+from sqlalchemy.types import TypeDecorator
+from sqlmodel import SQLModel
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7_from(ms: int, counter: int, random_bits: int) -> UUID:
+    """Assemble a UUIDv7 from a millisecond timestamp, a 12-bit counter and 62 random bits."""
+    return UUID(int=(
+        (ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | (counter & 0xFFF) << 64
+        | 0b10 << 62
+        | random_bits & ((1 << 62) - 1)
+    ))
+
+
+def uuid7() -> UUID:
+    """
+    New UUIDv7, strictly increasing within the process.
+
+    The 12 bits after the timestamp are a counter that starts at a random
+    value each millisecond, so ids made in the same millisecond still sort in
+    creation order. When the counter runs out the timestamp is borrowed from
+    the next millisecond.
+    """
+    global _last_ms, _counter
+    ms = time.time_ns() // 1_000_000
+    with _lock:
+        if ms > _last_ms:
+            # Start in the lower half so a burst rarely overflows the counter
+            _last_ms, _counter = ms, secrets.randbits(11)
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms, _counter = _last_ms + 1, 0
+        ms, counter = _last_ms, _counter
+    return uuid7_from(ms, counter, secrets.randbits(62))
+
+
+def uuid7_time(value: UUID) -> float:
+    """Unix timestamp, in seconds, embedded in a UUIDv7."""
+    return (value.int >> 80) / 1000
+
+
+class UUIDBinary(TypeDecorator):
+    """UUID stored as 16 bytes, or as a native uuid where the database has one."""
+    impl = LargeBinary(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect: Any) -> Any:
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(Uuid())
+        return dialect.type_descriptor(LargeBinary(16))
+
+    def process_bind_param(self, value: Any, dialect: Any) -> Any:
+        if value is None:
+            return None
+        if not isinstance(value, UUID):
+            value = UUID(str(value))
+        return value if dialect.name == "postgresql" else value.bytes
+
+    def process_result_value(self, value: Any, dialect: Any) -> Optional[UUID]:
+        if value is None or isinstance(value, UUID):
+            return value
+        # Rows written before migrate_uuid_storage still hold hex text
+        return UUID(value) if isinstance(value, str) else UUID(bytes=bytes(value))
+
+    @property
+    def python_type(self) -> type:
+        return UUID
+
+
+def uuid_columns() -> Dict[str, list]:
+    """Table name -> names of its UUIDBinary columns, over every registered table."""
+    return {
+        table.name: [column.name for column in table.columns if isinstance(column.type, UUIDBinary)]
+        for table in SQLModel.metadata.sorted_tables
+        if any(isinstance(column.type, UUIDBinary) for column in table.columns)
+    }
+
+
+def migrate_uuid_storage(connection: Any) -> Dict[str, int]:
+    """
+    Rewrite UUIDs stored as hex text into 16-byte blobs, in place.
+
+    SQLite only; other databases already store SQLAlchemy UUIDs natively. The
+    ids keep their values, so version 4 keys stay version 4 and only new rows
+    get time-ordered keys. Triggers on the rewritten tables are dropped for the
+    rewrite and recreated from their stored SQL, since none of them derive
+    anything from the id bytes. Returns the rows converted per table.
+    """
+    if connection.dialect.name != "sqlite":
+        return {}
+    connection.connection.driver_connection.create_function(
+        "uuid_blob", 1, lambda value: UUID(value).bytes, deterministic=True
+    )
+    columns = uuid_columns()
+    existing = set(connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars())
+    converted = {name: 0 for name in columns if name in existing}
+    # Already-migrated databases stop here, without touching their triggers
+    tables = [
+        name for name in converted
+        if any(
+            connection.execute(text(f"SELECT 1 FROM {name} WHERE typeof({column}) = 'text' LIMIT 1")).first()
+            for column in columns[name]
+        )
+    ]
+    if not tables:
+        return converted
+    triggers = connection.execute(text(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name IN "
+        f"({', '.join(repr(name) for name in tables)})"
+    )).all()
+    for name, _ in triggers:
+        connection.execute(text(f"DROP TRIGGER {name}"))
+    for table in tables:
+        for column in columns[table]:
+            result = connection.execute(text(
+                f"UPDATE {table} SET {column} = uuid_blob({column}) WHERE typeof({column}) = 'text'"
+            ))
+            converted[table] = max(converted[table], result.rowcount)
+    for _, sql in triggers:
+        connection.execute(text(sql))
+    return converted
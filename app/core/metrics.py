@@ -0,0 +1,188 @@
+"""
+Prometheus metrics for HTTP requests.
+
+Metrics are aggregated per worker process in plain dicts. All updates happen
+on the event loop thread (the middleware and the async dependency below), so
+no locks are needed; each worker serves its own numbers at /metrics.
+"""
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Sequence, Tuple
+
+from fastapi import Request
+
+LabelValues = Tuple[str, ...]
+
+# Upper bounds in seconds; +Inf is implicit
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Label used for requests that matched no route, to keep label cardinality bounded
+UNMATCHED_ROUTE = "<unmatched>"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str]):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, labels: LabelValues, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in self.values.items()]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: LabelValues, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str], buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last slot is +Inf), sum]
+        self.values: Dict[LabelValues, list] = {}
+
+    def observe(self, labels: LabelValues, value: float) -> None:
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = _labels(self.labelnames, labels, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+REGISTRY: List[Any] = []
+
+
+def register(metric: Any) -> Any:
+    REGISTRY.append(metric)
+    return metric
+
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+REQUESTS = register(Counter(
+    "http_requests_total", "HTTP requests by method, route template and status code.", ("method", "route", "status")
+))
+LATENCY = register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template.", ("method", "route")
+))
+IN_PROGRESS = register(Gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled by method and route template.", ("method", "route")
+))
+
+ROUTE_KEY = "metrics.route"
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """
+    Route template of a routed request, e.g. /api/v1/item/{id}.
+
+    The matched route's path_format may lack the prefixes of the routers it
+    was included through, so the prefix is the literal part of the request
+    path in front of the segments the route's own pattern matches.
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    path_regex = getattr(route, "path_regex", None)
+    if not isinstance(path_format, str) or path_regex is None:
+        return UNMATCHED_ROUTE
+    path = scope["path"]
+    start = len(path)
+    while start > 0:
+        start = path.rindex("/", 0, start)
+        if path_regex.match(path[start:]):
+            return path[:start] + path_format
+    return UNMATCHED_ROUTE
+
+
+async def track_in_progress(request: Request) -> None:
+    """
+    App-wide dependency marking the request as in flight under its route template.
+
+    Runs once routing has resolved the route, which the middleware cannot see yet.
+    """
+    scope = request.scope
+    template = route_template(scope)
+    scope[ROUTE_KEY] = template
+    IN_PROGRESS.inc((scope["method"], template))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency and status per route template."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            method = scope["method"]
+            template = scope.get(ROUTE_KEY)
+            if template is not None:
+                IN_PROGRESS.dec((method, template))
+            else:
+                template = route_template(scope)
+            REQUESTS.inc((method, template, str(status)))
+            LATENCY.observe((method, template), elapsed)
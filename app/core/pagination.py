@@ -0,0 +1,62 @@
+import base64
+import json
+from typing import Any, Generic, List, Optional, Sequence, TypeVar
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import Uuid, bindparam, tuple_
+
+from app.core.ids import UUIDBinary
+from app.exceptions import InvalidCursorError
+
+T = TypeVar("T")
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """One page of a keyset-paginated listing."""
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort-key values of the last row into an opaque cursor."""
+    payload = json.dumps([str(v) if not isinstance(v, (int, float)) else v for v in values])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> Optional[List[Any]]:
+    """Decode a cursor back into typed sort-key values; an empty cursor starts from the top."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match sort key")
+        return [UUID(value) if isinstance(column.type, (Uuid, UUIDBinary)) else value for column, value in zip(columns, values)]
+    except Exception as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}") from e
+
+
+def keyset(statement: Any, columns: Sequence[Any], cursor: str, limit: int) -> Any:
+    """
+    Restrict a select to the rows after `cursor` in `columns` order.
+
+    Fetches one row more than `limit` so the caller can tell whether another page exists.
+    """
+    values = decode_cursor(cursor, columns)
+    if values is not None:
+        bounds = [bindparam(None, value, type_=column.type) for column, value in zip(columns, values)]
+        statement = statement.where(tuple_(*columns) > tuple_(*bounds))
+    return statement.order_by(*columns).limit(limit + 1)
+
+
+async def paginate(session: Any, statement: Any, columns: Sequence[Any], cursor: str, limit: int) -> CursorPage:
+    """Run a keyset-paginated select and build the page with its next cursor; an empty page has none."""
+    limit = max(limit, 0)
+    rows = list((await session.exec(keyset(statement, columns, cursor, limit))).all())
+    more, rows = len(rows) > limit, rows[:limit]
+    next_cursor = None
+    if more and rows:
+        next_cursor = encode_cursor([getattr(rows[-1], column.key) for column in columns])
+    return CursorPage(items=rows, next_cursor=next_cursor)
@@ -0,0 +1,143 @@
+"""
+On-demand request profiling.
+
+A request is profiled when it carries PROFILING_HEADER set to PROFILING_TOKEN,
+or at random with probability PROFILING_SAMPLE_RATE. At most
+PROFILING_MAX_PER_MINUTE profiles are written per worker, and only one request
+is profiled at a time, so the middleware can stay enabled on a canary worker.
+
+PROFILING_MODE "cprofile" writes a deterministic cProfile `.prof` file (open it
+with pstats or snakeviz). "sample" polls the stack of the event loop thread
+every PROFILING_SAMPLE_INTERVAL seconds and writes collapsed stacks for
+flamegraph tools, which costs far less on hot endpoints. Both profile the event
+loop thread, so other requests running concurrently on it show up as well.
+"""
+import cProfile
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from app.core import config, metrics
+
+logger = logging.getLogger(__name__)
+
+
+class StackSampler:
+    """Collects collapsed stacks of one thread from a background thread."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path: str) -> None:
+        with open(path, "w") as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware writing a profile of selected requests to PROFILING_DIR."""
+
+    def __init__(self, app: Any):
+        self.app = app
+        self._active = False
+        self._written: deque = deque()
+
+    def _requested(self, scope: Dict[str, Any]) -> bool:
+        settings = config.settings
+        if settings.PROFILING_TOKEN:
+            header = settings.PROFILING_HEADER.lower().encode()
+            for name, value in scope.get("headers", []):
+                if name == header and hmac.compare_digest(value, settings.PROFILING_TOKEN.encode()):
+                    return True
+        return settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE
+
+    def _within_budget(self) -> bool:
+        now = time.monotonic()
+        while self._written and now - self._written[0] > 60:
+            self._written.popleft()
+        return len(self._written) < config.settings.PROFILING_MAX_PER_MINUTE
+
+    def _path(self, scope: Dict[str, Any]) -> str:
+        route = scope.get(metrics.ROUTE_KEY) or metrics.route_template(scope)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        suffix = ".prof" if config.settings.PROFILING_MODE == "cprofile" else ".collapsed"
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{slug}-{uuid4().hex[:8]}{suffix}"
+        return os.path.join(config.settings.PROFILING_DIR, name)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or self._active or not self._requested(scope) or not self._within_budget():
+            await self.app(scope, receive, send)
+            return
+        self._active = True
+        self._written.append(time.monotonic())
+        path: Optional[str] = None
+
+        async def send_with_path(message: Dict[str, Any]) -> None:
+            nonlocal path
+            if message["type"] == "http.response.start":
+                path = self._path(scope)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-file", os.path.basename(path).encode())
+                ]
+            await send(message)
+
+        if config.settings.PROFILING_MODE == "cprofile":
+            profiler: Any = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler (e.g. a coverage tool) already owns the thread
+                self._active = False
+                await self.app(scope, receive, send)
+                return
+        else:
+            profiler = StackSampler(threading.get_ident(), config.settings.PROFILING_SAMPLE_INTERVAL)
+            profiler.start()
+        try:
+            await self.app(scope, receive, send_with_path)
+        finally:
+            if isinstance(profiler, cProfile.Profile):
+                profiler.disable()
+            else:
+                profiler.stop()
+            self._active = False
+            try:
+                os.makedirs(config.settings.PROFILING_DIR, exist_ok=True)
+                path = path or self._path(scope)
+                if isinstance(profiler, cProfile.Profile):
+                    profiler.dump_stats(path)
+                else:
+                    profiler.dump(path)
+            except OSError as e:
+                logger.error(f"Failed to write profile {path}: {e}")
@@ -0,0 +1,132 @@
+"""
+Per-request SQL statistics collected from engine events.
+
+The middleware opens a `QueryStats` for each request in a context variable;
+cursor-execute listeners on the engines add every statement to it. Totals are
+sent as X-DB-* response headers when DEBUG is set and recorded as Prometheus
+histograms when METRICS_ENABLED is set.
+"""
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event
+
+from app.core import config, metrics
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+QUERIES = metrics.register(metrics.Histogram(
+    "db_queries_per_request", "SQL statements executed per request.", ("method", "route"), QUERY_COUNT_BUCKETS
+))
+DB_TIME = metrics.register(metrics.Histogram(
+    "db_time_per_request_seconds", "Time spent in SQL statements per request.", ("method", "route")
+))
+N_PLUS_ONE = metrics.register(metrics.Counter(
+    "db_repeated_statement_requests_total",
+    "Requests that ran one statement shape more than QUERY_REPEAT_THRESHOLD times.",
+    ("method", "route"),
+))
+
+
+class QueryStats:
+    """Statements executed while handling one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement: Optional[str] = None
+        # statement text (parameters stay as placeholders) -> executions
+        self.shapes: Dict[str, int] = {}
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        self.shapes[statement] = self.shapes.get(statement, 0) + 1
+        if elapsed >= self.slowest:
+            self.slowest = elapsed
+            self.slowest_statement = statement
+
+    def repeated(self, threshold: int) -> Dict[str, int]:
+        """Statement shapes run more than `threshold` times, the usual sign of an N+1 loop."""
+        return {statement: count for statement, count in self.shapes.items() if count > threshold}
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "X-DB-Query-Count": str(self.count),
+            "X-DB-Time-Ms": f"{self.total * 1000:.3f}",
+        }
+        if self.slowest_statement is not None:
+            headers["X-DB-Slowest-Ms"] = f"{self.slowest * 1000:.3f}"
+            headers["X-DB-Slowest-Statement"] = " ".join(self.slowest_statement.split())[:200]
+        return headers
+
+
+current_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_stats", default=None)
+
+
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    if current_stats.get() is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    stats = current_stats.get()
+    started = getattr(context, "_query_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def install_query_stats(sync_engine: Any) -> None:
+    """Attach the statement listeners to an engine (for async engines, pass `.sync_engine`)."""
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware collecting the statements of each HTTP request."""
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = QueryStats()
+        token = current_stats.set(stats)
+
+        async def send_with_headers(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start" and config.settings.DEBUG:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (name.lower().encode(), value.encode()) for name, value in stats.headers().items()
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            current_stats.reset(token)
+            self.report(scope, stats)
+
+    @staticmethod
+    def report(scope: Dict[str, Any], stats: QueryStats) -> None:
+        method = scope["method"]
+        route = scope.get(metrics.ROUTE_KEY) or metrics.route_template(scope)
+        if config.settings.METRICS_ENABLED:
+            QUERIES.observe((method, route), stats.count)
+            DB_TIME.observe((method, route), stats.total)
+        threshold = config.settings.QUERY_REPEAT_THRESHOLD
+        repeated = stats.repeated(threshold) if threshold > 0 else {}
+        if repeated:
+            N_PLUS_ONE.inc((method, route))
+            for statement, count in repeated.items():
+                logger.warning(
+                    "Possible N+1 on %s %s: statement ran %d times: %s",
+                    method, route, count, " ".join(statement.split())[:500],
+                )
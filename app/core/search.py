@@ -0,0 +1,113 @@
+import re
+from typing import Any, List, Optional, Type
+
+from sqlalchemy import column, event, false, literal_column, table, text
+from sqlmodel import SQLModel, or_, select
+
+from app.core import config
+
+# Source tables indexed for full-text search; each gets an external-content "<table>_fts" table
+SEARCH_TABLES = ("inventory", "item")
+SEARCH_COLUMNS = ("name", "description")
+# bm25 column weights: a hit in the name ranks above one in the description
+SEARCH_WEIGHTS = "10.0, 1.0"
+
+
+def fts_enabled(bind: Any) -> bool:
+    return config.settings.SEARCH_BACKEND == "fts" and bind.dialect.name == "sqlite"
+
+
+def match_expression(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 query matching every term as a prefix."""
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def like_statement(model: Type[SQLModel], query: str, statement: Any = None) -> Any:
+    """Substring match on name and description; a full table scan."""
+    statement = select(model) if statement is None else statement
+    return statement.where(or_(model.name.contains(query), model.description.contains(query)))
+
+
+def fts_statement(model: Type[SQLModel], query: str, ranked: bool = True, statement: Any = None) -> Any:
+    """Prefix match through the FTS5 index, best bm25 rank first when `ranked`."""
+    statement = select(model) if statement is None else statement
+    match = match_expression(query)
+    if match is None:
+        return statement.where(false())
+    name = model.__tablename__
+    fts = table(f"{name}_fts", column("rowid"))
+    statement = (
+        statement
+        .join(fts, fts.c.rowid == literal_column(f"{name}.rowid"))
+        .where(text(f"{name}_fts MATCH :match").bindparams(match=match))
+    )
+    if ranked:
+        statement = statement.order_by(text(f"bm25({name}_fts, {SEARCH_WEIGHTS})"))
+    return statement
+
+
+def search_statement(bind: Any, model: Type[SQLModel], query: str, ranked: bool = True, statement: Any = None) -> Any:
+    """
+    Select the rows of `model` matching `query` with the configured search backend.
+
+    `statement` is the select to narrow, `select(model)` by default.
+    """
+    if fts_enabled(bind):
+        return fts_statement(model, query, ranked, statement)
+    return like_statement(model, query, statement)
+
+
+def _index_row(name: str, row: str) -> str:
+    columns = ", ".join(SEARCH_COLUMNS)
+    values = ", ".join(f"{row}.{c}" for c in SEARCH_COLUMNS)
+    return f"INSERT INTO {name}_fts (rowid, {columns}) VALUES ({row}.rowid, {values});"
+
+
+def _unindex_row(name: str, row: str) -> str:
+    columns = ", ".join(SEARCH_COLUMNS)
+    values = ", ".join(f"{row}.{c}" for c in SEARCH_COLUMNS)
+    return f"INSERT INTO {name}_fts ({name}_fts, rowid, {columns}) VALUES ('delete', {row}.rowid, {values});"
+
+
+def search_ddl(name: str) -> List[str]:
+    columns = ", ".join(SEARCH_COLUMNS)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {name}_fts USING fts5("
+        f"{columns}, content='{name}', prefix='2 3', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_fts_insert AFTER INSERT ON {name} BEGIN "
+        f"{_index_row(name, 'NEW')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_fts_delete AFTER DELETE ON {name} BEGIN "
+        f"{_unindex_row(name, 'OLD')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {name}_fts_update AFTER UPDATE OF {columns} ON {name} BEGIN "
+        f"{_unindex_row(name, 'OLD')} {_index_row(name, 'NEW')} END",
+    ]
+
+
+def rebuild_search_index(connection: Any) -> None:
+    """
+    Rebuild every FTS index from its source table.
+
+    Needed after a VACUUM, which may renumber the rowids the index points at.
+    """
+    for name in SEARCH_TABLES:
+        connection.execute(text(f"INSERT INTO {name}_fts ({name}_fts) VALUES ('rebuild')"))
+
+
+@event.listens_for(SQLModel.metadata, "after_create")
+def install_search_index(target: Any, connection: Any, **kw: Any) -> None:
+    if not fts_enabled(connection):
+        return
+    for name in SEARCH_TABLES:
+        if name not in target.tables:
+            continue
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": f"{name}_fts"}
+        ).first()
+        for statement in search_ddl(name):
+            connection.execute(text(statement))
+        # Index rows written before the FTS table existed
+        if not exists:
+            connection.execute(text(f"INSERT INTO {name}_fts ({name}_fts) VALUES ('rebuild')"))
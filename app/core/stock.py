@@ -0,0 +1,86 @@
+from typing import Any, List, Type
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlmodel import SQLModel, select, update
+
+from app.core.cache import invalidate
+from app.exceptions import InsufficientStockError, ItemNotFoundError
+
+
+class StockAdjustment(BaseModel):
+    """Signed change to apply to a row's quantity."""
+    delta: int
+
+
+class StockAdjustmentLine(StockAdjustment):
+    """One line of a pick list."""
+    id: UUID
+
+
+class StockLevel(BaseModel):
+    """Quantity of a row after an adjustment."""
+    id: UUID
+    quantity: int
+
+
+async def _apply(session: Any, model: Type[SQLModel], id: UUID, delta: int) -> int:
+    statement = (
+        update(model)
+        .where(model.id == id, model.quantity + delta >= 0)
+        .values(quantity=model.quantity + delta)
+    )
+    if session.get_bind().dialect.update_returning:
+        quantity = (await session.exec(statement.returning(model.quantity))).scalar_one_or_none()
+    else:
+        rowcount = (await session.exec(statement)).rowcount
+        quantity = (await session.exec(select(model.quantity).where(model.id == id))).one() if rowcount else None
+    if quantity is not None:
+        return quantity
+    # Only the failure path pays for a second query to tell the two cases apart
+    if (await session.exec(select(model.id).where(model.id == id))).first() is None:
+        raise ItemNotFoundError(f"{model.__name__} {id} not found")
+    raise InsufficientStockError(f"Adjusting {model.__name__} {id} by {delta} would make its quantity negative")
+
+
+async def adjust_quantity(session: Any, model: Type[SQLModel], id: UUID, delta: int) -> StockLevel:
+    """
+    Add `delta` to the quantity of one row with a single conditional UPDATE.
+
+    The guard lives in the WHERE clause, so concurrent adjustments never lose
+    each other's writes and the quantity can never drop below zero.
+    """
+    try:
+        quantity = await _apply(session, model, id, delta)
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    invalidate(model, id)
+    return StockLevel(id=id, quantity=quantity)
+
+
+async def adjust_quantities(session: Any, model: Type[SQLModel], lines: List[StockAdjustmentLine]) -> List[StockLevel]:
+    """
+    Apply a pick list in one transaction: either every line applies or none do.
+
+    Rows are updated in id order so concurrent pick lists take row locks in
+    the same order; results are returned in request order.
+    """
+    order = sorted(range(len(lines)), key=lambda i: lines[i].id)
+    levels: List[StockLevel] = [None] * len(lines)  # type: ignore[list-item]
+    try:
+        for i in order:
+            line = lines[i]
+            try:
+                quantity = await _apply(session, model, line.id, line.delta)
+            except (ItemNotFoundError, InsufficientStockError) as e:
+                raise type(e)(f"Line {i}: {e}") from e
+            levels[i] = StockLevel(id=line.id, quantity=quantity)
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    for line in lines:
+        invalidate(model, line.id)
+    return levels
@@ -0,0 +1,245 @@
+import codecs
+import csv
+import json
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, FrozenSet, List, Literal, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, create_model
+from sqlalchemy import Index
+from sqlmodel import SQLModel
+
+from app.core import config
+from app.core.bulk import NDJSON_MEDIA_TYPES, chunked, validate_rows
+from app.core.cache import clear_entity_cache
+from app.core.database import missing_indexes
+from app.exceptions import MissingIndexError
+
+ImportFormat = Literal["csv", "ndjson"]
+
+CSV_MEDIA_TYPES = ("text/csv", "application/csv")
+
+
+class ImportLineError(BaseModel):
+    """A line of the file that was not imported."""
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    """
+    Outcome of a stock-take import; `errors` keeps the first IMPORT_MAX_ERRORS failed lines.
+
+    `unchanged` counts lines that carry only the key of an existing row, so
+    there was nothing to write.
+    """
+    rows: int = 0
+    upserted: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    batches: int = 0
+    errors: List[ImportLineError] = []
+
+
+def media_type_format(content_type: str) -> Optional[ImportFormat]:
+    media_type = content_type.split(";")[0].strip()
+    if media_type in CSV_MEDIA_TYPES:
+        return "csv"
+    if media_type in NDJSON_MEDIA_TYPES:
+        return "ndjson"
+    return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode UTF-8 byte chunks into lines ending in "\\n", never holding more than one partial line."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def csv_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    (line number, row) pairs from CSV with a header line.
+
+    Empty cells are left out so that they keep the column's current value or
+    default; malformed lines are yielded as ValueError rows.
+    """
+    header: Optional[List[str]] = None
+    record: List[str] = []
+    start = number = quotes = 0
+    async for line in lines:
+        number += 1
+        if not record:
+            start = number
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            # An open quoted field carries on to the next line
+            continue
+        text = "".join(record)
+        record, quotes = [], 0
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as e:
+            yield start, ValueError(f"Invalid CSV: {e}")
+            continue
+        if header is None:
+            header = [value.strip() for value in values]
+            continue
+        if len(values) != len(header):
+            yield start, ValueError(f"Expected {len(header)} fields, got {len(values)}")
+            continue
+        yield start, {key: value for key, value in zip(header, values) if value != ""}
+    if record:
+        yield start, ValueError("Unterminated quoted field")
+
+
+async def ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, Any]]:
+    """(line number, row) pairs from NDJSON; lines that are not JSON are yielded as ValueError rows."""
+    number = 0
+    async for line in lines:
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f"Invalid JSON: {e}")
+
+
+def read_records(chunks: AsyncIterator[bytes], format: ImportFormat) -> AsyncIterator[Tuple[int, Any]]:
+    lines = iter_lines(chunks)
+    return csv_records(lines) if format == "csv" else ndjson_records(lines)
+
+
+@lru_cache(maxsize=None)
+def row_schema(model: Type[SQLModel]) -> Type[BaseModel]:
+    """
+    A plain pydantic copy of `model`'s fields, defaults included.
+
+    Validating a table model builds an instrumented ORM instance per row,
+    which costs several times more than the validation itself.
+    """
+    return create_model(f"{model.__name__}Row", **{name: (field.annotation, field) for name, field in model.model_fields.items()})
+
+
+def upsert_key(model: Type[SQLModel], keys: Sequence[str]) -> Index:
+    """The unique index on `keys` that ON CONFLICT targets."""
+    for index in model.__table__.indexes:
+        if index.unique and [column.name for column in index.columns] == list(keys):
+            return index
+    raise ValueError(f"{model.__tablename__} has no unique index on {', '.join(keys)}")
+
+
+def upsert_statement(bind: Any, model: Type[SQLModel], keys: Sequence[str], columns: Sequence[str]) -> Any:
+    """`INSERT ... ON CONFLICT (keys) DO UPDATE` writing `columns` of the incoming row over the existing one."""
+    if bind.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        raise ValueError(f"Upsert is not supported on {bind.dialect.name}")
+    statement = insert(model.__table__)
+    if not columns:
+        return statement.on_conflict_do_nothing(index_elements=list(keys))
+    return statement.on_conflict_do_update(
+        index_elements=list(keys), set_={column: statement.excluded[column] for column in columns}
+    )
+
+
+class StockImport:
+    """
+    Upsert rows into `model` by the unique `keys`, one transaction per IMPORT_BATCH_SIZE rows.
+
+    Only the columns a row carries are written over an existing row; a new
+    row gets the model's defaults for the rest. When a key repeats inside a
+    batch the last line wins.
+    """
+
+    def __init__(
+        self,
+        session: Any,
+        model: Type[SQLModel],
+        keys: Sequence[str] = ("name", "category"),
+        check: Optional[Callable[[BaseModel], None]] = None,
+        on_progress: Optional[Callable[[ImportReport], None]] = None,
+    ):
+        self.session = session
+        self.model = model
+        self.keys = tuple(keys)
+        self.check = check
+        self.on_progress = on_progress
+        self.report = ImportReport()
+
+    def _fail(self, line: int, error: str) -> None:
+        self.report.failed += 1
+        if len(self.report.errors) < config.settings.IMPORT_MAX_ERRORS:
+            self.report.errors.append(ImportLineError(line=line, error=error))
+
+    async def run(self, records: AsyncIterator[Tuple[int, Any]], batch_size: Optional[int] = None) -> ImportReport:
+        index = upsert_key(self.model, self.keys)
+        if index in await self.session.run_sync(lambda session: missing_indexes(session.connection())):
+            raise MissingIndexError(
+                f"Unique index {index.name} is missing; run `python -m app.cli create-indexes` before importing"
+            )
+        batch_size = batch_size or config.settings.IMPORT_BATCH_SIZE
+        batch: List[Tuple[int, Any]] = []
+        async for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                await self._import_batch(batch)
+                batch = []
+        if batch:
+            await self._import_batch(batch)
+        return self.report
+
+    async def _import_batch(self, batch: List[Tuple[int, Any]]) -> None:
+        lines = [line for line, _ in batch]
+        rows = [row for _, row in batch]
+        valid, failures = validate_rows(row_schema(self.model), rows, self.check)
+        for failure in failures:
+            self._fail(lines[failure.index], failure.error)
+
+        columns = set(self.model.__table__.columns.keys()) - {"id"}
+        latest: Dict[Tuple[Any, ...], Tuple[int, FrozenSet[str], dict]] = {}
+        for index, instance in valid:
+            values = instance.model_dump()
+            written = frozenset(columns.intersection(rows[index]) - set(self.keys))
+            latest[tuple(values[key] for key in self.keys)] = (index, written, values)
+        groups: Dict[FrozenSet[str], List[dict]] = {}
+        for _, written, values in latest.values():
+            groups.setdefault(written, []).append(values)
+
+        unchanged = 0
+        try:
+            bind = self.session.get_bind()
+            for written, params in groups.items():
+                statement = upsert_statement(bind, self.model, self.keys, sorted(written))
+                if not written:
+                    # ON CONFLICT DO NOTHING returns only the rows it inserted
+                    statement = statement.returning(self.model.__table__.c.id)
+                for chunk in chunked(params, config.settings.BULK_CHUNK_SIZE):
+                    result = await self.session.exec(statement, params=chunk)
+                    if not written:
+                        unchanged += len(chunk) - len(result.all())
+            await self.session.commit()
+        except Exception as e:
+            await self.session.rollback()
+            for index, _ in valid:
+                self._fail(lines[index], f"Batch rolled back: {e}")
+        else:
+            self.report.upserted += len(valid) - unchanged
+            self.report.unchanged += unchanged
+        clear_entity_cache(self.model)
+        self.report.rows += len(batch)
+        self.report.batches += 1
+        self.report.errors.sort(key=lambda error: error.line)
+        if self.on_progress is not None:
+            self.on_progress(self.report)
@@ -0,0 +1,80 @@
+import logging
+from typing import Any, AsyncIterator, Literal, Optional, Sequence, Type
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import SQLModel
+
+from app.core import config
+from app.core.encoding import dumps
+from app.core.fields import as_dict, column_names
+
+logger = logging.getLogger(__name__)
+
+StreamFormat = Literal["json", "ndjson"]
+
+MEDIA_TYPES = {"json": "application/json", "ndjson": "application/x-ndjson"}
+
+
+def _engine(session: Any) -> Any:
+    """The engine behind a request session; AsyncSession.get_bind() would return its sync facade."""
+    bind = getattr(session, "bind", None)
+    return bind if isinstance(bind, AsyncEngine) else session.get_bind()
+
+
+async def iter_partitions(session: Any, statement: Any, size: int) -> AsyncIterator[Sequence[Any]]:
+    """
+    Batches of at most `size` rows from a server-side cursor.
+
+    Runs on a connection of its own: the request's session may already be
+    closed by the time the response body is being sent.
+    """
+    bind = _engine(session)
+    if isinstance(bind, AsyncEngine):
+        async with bind.connect() as connection:
+            result = await connection.stream(statement.execution_options(yield_per=size))
+            async for rows in result.partitions():
+                yield rows
+    else:
+        with bind.connect() as connection:
+            result = connection.execute(statement.execution_options(yield_per=size))
+            for rows in result.partitions():
+                yield rows
+
+
+async def encode_stream(
+    session: Any, statement: Any, names: Sequence[str], format: StreamFormat, size: int
+) -> AsyncIterator[bytes]:
+    """A JSON array or NDJSON body, one chunk per batch of rows."""
+    first = True
+    if format == "json":
+        yield b"["
+    try:
+        async for rows in iter_partitions(session, statement, size):
+            if format == "json":
+                # Drop the batch's own brackets and join batches with a comma
+                chunk = dumps([as_dict(row, names) for row in rows])[1:-1]
+                yield chunk if first else b"," + chunk
+            else:
+                yield b"".join(dumps(as_dict(row, names)) + b"\n" for row in rows)
+            first = False
+    except Exception as e:
+        # The status line has gone out already; a truncated body is all the client can be told
+        logger.error(f"Error streaming rows: {e}")
+        raise
+    if format == "json":
+        yield b"]"
+
+
+def stream_response(
+    session: Any, model: Type[SQLModel], names: Optional[Sequence[str]], statement: Any, format: StreamFormat
+) -> StreamingResponse:
+    """
+    Stream every row of a `select_fields` statement as a chunked JSON array or NDJSON.
+
+    Rows are read `STREAM_CHUNK_SIZE` at a time and sent as each batch
+    arrives, so memory stays flat and the first bytes leave before the
+    query has finished.
+    """
+    body = encode_stream(session, statement, names or column_names(model), format, config.settings.STREAM_CHUNK_SIZE)
+    return StreamingResponse(body, media_type=MEDIA_TYPES[format])
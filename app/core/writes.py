@@ -0,0 +1,51 @@
+from typing import Any, Dict, Optional, Type
+
+from sqlmodel import SQLModel, delete, select, update
+
+from app.core.cache import invalidate
+from app.core.group_commit import run_write
+
+
+def _update_row(session: Any, model: Type[SQLModel], id: Any, values: Dict[str, Any]) -> Any:
+    statement = update(model).where(model.id == id).values(**values)
+    columns = model.__table__.columns
+    if session.get_bind().dialect.update_returning:
+        return session.execute(statement.returning(*columns)).first()
+    if not session.execute(statement).rowcount:
+        return None
+    return session.execute(select(*columns).where(model.id == id)).first()
+
+
+async def update_returning(session: Any, model: Type[SQLModel], id: Any, values: Dict[str, Any]) -> Optional[SQLModel]:
+    """
+    Apply `values` to one row with a single `UPDATE ... RETURNING` and commit.
+
+    Returns the updated row as a detached instance, or None when no row has
+    `id`. Dialects without UPDATE RETURNING fall back to UPDATE then SELECT.
+    With GROUP_COMMIT_ENABLED the commit is shared with concurrent writes.
+    """
+    if not values:
+        row = (await session.exec(select(*model.__table__.columns).where(model.id == id))).first()
+        return model.model_validate(dict(row._mapping)) if row is not None else None
+    row = await run_write(session, lambda sync_session: _update_row(sync_session, model, id, values))
+    if row is None:
+        return None
+    invalidate(model, id)
+    return model.model_validate(dict(row._mapping))
+
+
+async def delete_returning(session: Any, model: Type[SQLModel], id: Any) -> bool:
+    """Delete one row with a single `DELETE ... RETURNING id` and commit; False when no row has `id`."""
+    statement = delete(model).where(model.id == id)
+    try:
+        if session.get_bind().dialect.delete_returning:
+            deleted = (await session.exec(statement.returning(model.id))).first() is not None
+        else:
+            deleted = (await session.exec(statement)).rowcount > 0
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    if deleted:
+        invalidate(model, id)
+    return deleted
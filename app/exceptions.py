@@ -37,6 +37,26 @@ class CategoryNotFoundException(AppError):
     """Category not found"""
     pass
 
+class CategoryCycleError(AppError):
+    """Category moved under its own subtree"""
+    pass
+
 class ItemAlreadyExistsError(AppError):
     """Item already exists"""
     pass
+
+class InvalidCursorError(AppError):
+    """Invalid pagination cursor"""
+    pass
+
+class InsufficientStockError(AppError):
+    """Adjustment would make a quantity negative"""
+    pass
+
+class InvalidFieldsError(AppError):
+    """Unknown field in a sparse fieldset"""
+    pass
+
+class MissingIndexError(AppError):
+    """A model index is missing from the database"""
+    pass
@@ -1,16 +1,22 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from app.core import config
-from app.core.database import create_db_and_tables
+from app.core import config, metrics
+from app.core.profiling import ProfilingMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.database import create_db_and_tables, dispose_engines
+from app.core.export import fail_interrupted_exports, shutdown_exports
 from app.api.v1.api import api_router
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Create tables
+    # Startup: Create tables, then fail exports a previous process left unfinished
     create_db_and_tables()
+    fail_interrupted_exports()
     yield
-    # Shutdown events if needed
+    # Shutdown: finish running exports, then release pooled connections
+    shutdown_exports()
+    await dispose_engines()
 
 app = FastAPI(
     title="test",
@@ -19,6 +25,7 @@ app = FastAPI(
     lifespan=lifespan,
     openapi_url="/api/v1/openapi.json",
     docs_url="/api/v1/docs",
+    dependencies=[Depends(metrics.track_in_progress)] if config.settings.METRICS_ENABLED else [],
 )
 
 # Set all CORS enabled origins
@@ -31,6 +38,19 @@ if config.settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+if config.settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+app.add_middleware(QueryStatsMiddleware)
+
+# Added last so it wraps CORS and sees the full request latency
+if config.settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def get_metrics():
+        return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 app.include_router(api_router, prefix=config.settings.API_V1_STR)
 
 @app.get("/")
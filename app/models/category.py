@@ -1,11 +1,53 @@
 from typing import Optional
-from uuid import UUID, uuid4
+from uuid import UUID
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
+from app.core.ids import UUIDBinary, uuid7
+
 
 class Category(SQLModel, table=True):
     """Category model."""
-    id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    # Keyset pagination sort key
+    __table_args__ = (Index("ix_category_name_id", "name", "id"),)
+
+    id: Optional[UUID] = Field(default_factory=uuid7, primary_key=True, sa_type=UUIDBinary)
     name: str = Field(index=True)
     description: Optional[str] = None
+    parent_id: Optional[UUID] = Field(default=None, sa_type=UUIDBinary)
+
+
+class CategoryCreate(SQLModel):
+    """Category request body; validated, unlike the table model, so parent_id arrives as a UUID."""
+    id: Optional[UUID] = None
+    name: str
+    description: Optional[str] = None
+    parent_id: Optional[UUID] = None
+
+
+class CategoryUpdate(SQLModel):
+    """Sparse category update: only the fields sent are written; a null parent_id moves to the root."""
+    name: Optional[str] = None
+    description: Optional[str] = None
+    parent_id: Optional[UUID] = None
+
+
+class CategoryNode(SQLModel):
+    """Category within a tree query, with its distance from the queried category."""
+    id: UUID
+    name: str
+    description: Optional[str] = None
+    parent_id: Optional[UUID] = None
+    depth: int
+
+
+class CategoryRollup(SQLModel):
+    """Item and inventory totals of a category and all of its descendants."""
+    id: UUID
+    name: str
     parent_id: Optional[UUID] = None
+    item_count: int = 0
+    item_quantity: int = 0
+    item_value: float = 0.0
+    inventory_count: int = 0
+    inventory_quantity: int = 0
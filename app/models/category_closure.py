@@ -0,0 +1,94 @@
+from typing import Any, List
+from uuid import UUID
+
+from sqlalchemy import Index, event, text
+from sqlmodel import Field, SQLModel
+
+from app.core.ids import UUIDBinary
+
+
+class CategoryClosure(SQLModel, table=True):
+    """
+    One row per (ancestor, descendant) pair of the category tree, including each
+    category paired with itself at depth 0. Maintained by SQLite triggers.
+    """
+    __tablename__ = "category_closure"
+    # Ancestor path lookups go by descendant
+    __table_args__ = (Index("ix_category_closure_descendant_depth", "descendant_id", "depth"),)
+
+    ancestor_id: UUID = Field(primary_key=True, sa_type=UUIDBinary)
+    descendant_id: UUID = Field(primary_key=True, sa_type=UUIDBinary)
+    depth: int = 0
+
+
+# Every (ancestor of the parent, row of the subtree) pair for a node hung under a parent
+_LINK_SUBTREE = """
+    INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+    SELECT a.ancestor_id, d.descendant_id, a.depth + d.depth + 1
+    FROM category_closure a, category_closure d
+    WHERE a.descendant_id = NEW.parent_id AND d.ancestor_id = NEW.id;"""
+
+# Every (ancestor, descendant, depth) path implied by Category.parent_id
+_TREE = """
+    WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+        SELECT id, id, 0 FROM category
+        UNION ALL
+        SELECT tree.ancestor_id, category.id, tree.depth + 1
+        FROM tree JOIN category ON category.parent_id = tree.descendant_id
+    )"""
+
+CLOSURE_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS category_closure_insert AFTER INSERT ON category BEGIN
+    INSERT INTO category_closure (ancestor_id, descendant_id, depth) VALUES (NEW.id, NEW.id, 0);{_LINK_SUBTREE}
+END""",
+    """CREATE TRIGGER IF NOT EXISTS category_closure_cycle BEFORE UPDATE OF parent_id ON category
+WHEN NEW.parent_id IS NOT NULL AND EXISTS (
+    SELECT 1 FROM category_closure WHERE ancestor_id = NEW.id AND descendant_id = NEW.parent_id
+) BEGIN
+    SELECT RAISE(ABORT, 'category cannot be moved under its own subtree');
+END""",
+    f"""CREATE TRIGGER IF NOT EXISTS category_closure_move AFTER UPDATE OF parent_id ON category
+WHEN OLD.parent_id IS NOT NEW.parent_id BEGIN
+    DELETE FROM category_closure
+    WHERE descendant_id IN (SELECT descendant_id FROM category_closure WHERE ancestor_id = NEW.id)
+      AND ancestor_id IN (SELECT ancestor_id FROM category_closure WHERE descendant_id = NEW.id AND depth > 0);{_LINK_SUBTREE}
+END""",
+    # Children of a deleted category move up to its parent, so their subtrees stay attached
+    """CREATE TRIGGER IF NOT EXISTS category_closure_delete AFTER DELETE ON category BEGIN
+    UPDATE category SET parent_id = OLD.parent_id WHERE parent_id = OLD.id;
+    DELETE FROM category_closure WHERE ancestor_id = OLD.id OR descendant_id = OLD.id;
+END""",
+]
+
+
+def closure_enabled(bind: Any) -> bool:
+    """The closure table is only maintained where the triggers can be installed."""
+    return bind.dialect.name == "sqlite"
+
+
+def rebuild_category_closure(connection: Any) -> None:
+    """Recompute the closure table from Category.parent_id."""
+    connection.execute(text("DELETE FROM category_closure"))
+    connection.execute(text(
+        f"INSERT INTO category_closure (ancestor_id, descendant_id, depth) {_TREE} SELECT * FROM tree"
+    ))
+
+
+def check_category_closure(connection: Any) -> List[Any]:
+    """('missing' | 'extra', ancestor_id, descendant_id, depth) rows where the closure disagrees with parent_id."""
+    stored = "SELECT ancestor_id, descendant_id, depth FROM category_closure"
+    return connection.execute(text(
+        f"{_TREE} SELECT 'missing', * FROM (SELECT * FROM tree EXCEPT {stored}) "
+        f"UNION ALL SELECT 'extra', * FROM ({stored} EXCEPT SELECT * FROM tree)"
+    )).all()
+
+
+@event.listens_for(SQLModel.metadata, "after_create")
+def install_closure_triggers(target: Any, connection: Any, **kw: Any) -> None:
+    if not closure_enabled(connection) or not {"category", "category_closure"} <= set(target.tables):
+        return
+    for trigger in CLOSURE_TRIGGERS:
+        connection.execute(text(trigger))
+    # Seed the closure for databases that held categories before the triggers existed
+    if connection.execute(text("SELECT COUNT(*) FROM category_closure")).scalar() == 0:
+        rebuild_category_closure(connection)
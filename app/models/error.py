@@ -16,6 +16,13 @@ class Error(SQLModel, table=True):
     message: str
     code: int
 
+class ErrorUpdate(SQLModel):
+    """
+    Sparse error update: only the fields sent are written.
+    """
+    message: Optional[str] = None
+    code: Optional[int] = None
+
 class ErrorModel(BaseModel):
     """
     Error model for validation.
@@ -1,12 +1,29 @@
 from typing import Optional
-from uuid import UUID, uuid4
+from uuid import UUID
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
+from app.core.ids import UUIDBinary, uuid7
+
 
 class Inventory(SQLModel, table=True):
     """Inventory model."""
-    id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    # Keyset pagination sort key; name+category is the stock-take upsert key
+    __table_args__ = (
+        Index("ix_inventory_name_id", "name", "id"),
+        Index("ux_inventory_name_category", "name", "category", unique=True),
+    )
+
+    id: Optional[UUID] = Field(default_factory=uuid7, primary_key=True, sa_type=UUIDBinary)
     name: str = Field(index=True)
     category: str
     description: Optional[str] = None
     quantity: int = 0
+
+
+class InventoryUpdate(SQLModel):
+    """Sparse inventory update: only the fields sent are written."""
+    name: Optional[str] = None
+    category: Optional[str] = None
+    description: Optional[str] = None
+    quantity: Optional[int] = None
@@ -1,16 +1,31 @@
 from typing import Optional
-from uuid import UUID, uuid4
+from uuid import UUID
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
+from app.core.ids import UUIDBinary, uuid7
+
 
 CATEGORIES = ["Electronics", "Clothing", "Food", "Books", "Other"]
 
 
 class Item(SQLModel, table=True):
     """Item model."""
-    id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    # Keyset pagination sort key
+    __table_args__ = (Index("ix_item_name_id", "name", "id"),)
+
+    id: Optional[UUID] = Field(default_factory=uuid7, primary_key=True, sa_type=UUIDBinary)
     name: str = Field(index=True)
     category: str
     description: Optional[str] = None
     price: Optional[float] = 0.0
     quantity: int = 0
+
+
+class ItemUpdate(SQLModel):
+    """Sparse item update: only the fields sent are written."""
+    name: Optional[str] = None
+    category: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    quantity: Optional[int] = None
@@ -0,0 +1,113 @@
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import event, text
+from sqlmodel import Field, SQLModel
+
+
+class SummaryCounter(SQLModel, table=True):
+    """Per-category totals for a source table, maintained by SQLite triggers."""
+    __tablename__ = "summary_counter"
+
+    source: str = Field(primary_key=True)
+    category: str = Field(primary_key=True)
+    count: int = 0
+    quantity: int = 0
+    value: float = 0.0
+
+
+# source name -> (table, SQL expression for the value of a row given its alias, columns feeding the totals)
+COUNTER_SOURCES = {
+    "item": ("item", "COALESCE({row}.price, 0) * {row}.quantity", "category, quantity, price"),
+    "inventory": ("inventory", "0", "category, quantity"),
+}
+
+
+def _add_row(source: str, value: str) -> str:
+    return f"""
+    INSERT INTO summary_counter (source, category, count, quantity, value)
+    VALUES ('{source}', NEW.category, 1, NEW.quantity, {value.format(row="NEW")})
+    ON CONFLICT (source, category) DO UPDATE SET
+        count = count + 1,
+        quantity = quantity + excluded.quantity,
+        value = value + excluded.value;"""
+
+
+def _remove_row(source: str, value: str) -> str:
+    return f"""
+    UPDATE summary_counter SET
+        count = count - 1,
+        quantity = quantity - OLD.quantity,
+        value = value - {value.format(row="OLD")}
+    WHERE source = '{source}' AND category = OLD.category;"""
+
+
+def counter_triggers(source: str) -> List[str]:
+    table, value, columns = COUNTER_SOURCES[source]
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_counter_insert AFTER INSERT ON {table} BEGIN"
+        f"{_add_row(source, value)}\nEND",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_counter_delete AFTER DELETE ON {table} BEGIN"
+        f"{_remove_row(source, value)}\nEND",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_counter_update AFTER UPDATE OF {columns} ON {table} BEGIN"
+        f"{_remove_row(source, value)}{_add_row(source, value)}\nEND",
+    ]
+
+
+def counters_enabled(bind: Any) -> bool:
+    """Counters are only maintained where the triggers can be installed."""
+    return bind.dialect.name == "sqlite"
+
+
+def live_totals(connection: Any, source: str) -> Dict[str, Tuple[int, int, float]]:
+    """Recompute per-category totals straight from the source table."""
+    table, value, _ = COUNTER_SOURCES[source]
+    rows = connection.execute(text(
+        f"SELECT category, COUNT(*), COALESCE(SUM(quantity), 0), COALESCE(SUM({value.format(row=table)}), 0) "
+        f"FROM {table} GROUP BY category"
+    ))
+    return {category: (count, quantity, float(total)) for category, count, quantity, total in rows}
+
+
+def rebuild_summary_counters(connection: Any) -> None:
+    """Recompute every counter from scratch."""
+    connection.execute(text("DELETE FROM summary_counter"))
+    for source in COUNTER_SOURCES:
+        rows = [
+            {"source": source, "category": category, "count": count, "quantity": quantity, "value": total}
+            for category, (count, quantity, total) in live_totals(connection, source).items()
+        ]
+        if rows:
+            connection.execute(SummaryCounter.__table__.insert(), rows)
+
+
+def check_summary_counters(connection: Any, tolerance: float = 1e-6) -> List[Dict[str, Any]]:
+    """Compare the counters with the live tables and return any mismatches."""
+    mismatches = []
+    for source in COUNTER_SOURCES:
+        live = live_totals(connection, source)
+        stored = {
+            category: (count, quantity, total)
+            for category, count, quantity, total in connection.execute(
+                text("SELECT category, count, quantity, value FROM summary_counter WHERE source = :source"),
+                {"source": source},
+            )
+        }
+        for category in sorted(set(live) | set(stored)):
+            expected, actual = live.get(category, (0, 0, 0.0)), stored.get(category, (0, 0, 0.0))
+            if expected[:2] != actual[:2] or abs(expected[2] - actual[2]) > tolerance * max(1.0, abs(expected[2])):
+                mismatches.append({"source": source, "category": category, "expected": expected, "actual": actual})
+    return mismatches
+
+
+@event.listens_for(SQLModel.metadata, "after_create")
+def install_counter_triggers(target: Any, connection: Any, **kw: Any) -> None:
+    if not counters_enabled(connection) or any(
+        table not in target.tables for table, _, _ in COUNTER_SOURCES.values()
+    ):
+        return
+    for source in COUNTER_SOURCES:
+        for trigger in counter_triggers(source):
+            connection.execute(text(trigger))
+    # Seed counters for databases that already held rows before the triggers existed
+    if connection.execute(text("SELECT COUNT(*) FROM summary_counter")).scalar() == 0:
+        rebuild_summary_counters(connection)
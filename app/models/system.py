@@ -25,9 +25,10 @@ class SystemCreate(SystemBase):
 # Alias for backward compat
 SystemSave = SystemCreate
 
-class SystemUpdate(SystemBase):
-    """System update model."""
-    pass
+class SystemUpdate(SQLModel):
+    """Sparse system update: only the fields sent are written."""
+    version: Optional[str] = None
+    lastUpdated: Optional[datetime] = None
 
 class SystemRead(SystemBase):
     """System read model."""
@@ -55,7 +56,7 @@ def update_system(db: Session, system_id: int, system: SystemUpdate):
         db_system = db.get(System, system_id)
         if not db_system:
             raise SystemError("System not found")
-        update_data = {k: v for k, v in {"version": system.version, "lastUpdated": system.lastUpdated}.items()}
+        update_data = system.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(db_system, key, value)
         db.add(db_system)
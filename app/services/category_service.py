@@ -1,19 +1,25 @@
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Union
 from uuid import UUID
-from sqlmodel import Session, select
+from sqlmodel import select
 
-from app.models.category import Category
+from app.core import category_tree
+from app.core.category_rollup import category_rollup
+from app.core.batch import BatchResult, batch_get
+from app.core.cache import cached_get
+from app.core.database import DBSession, as_async_session
+from app.core.pagination import CursorPage, paginate
+from app.models.category import Category, CategoryNode, CategoryRollup
 import logging
 
 class CategoryService:
-    def __init__(self, session: Session):
-        self.session = session
+    def __init__(self, session: DBSession):
+        self.session = as_async_session(session)
 
     async def create(self, item: Category) -> Category:
         try:
             self.session.add(item)
-            self.session.commit()
-            self.session.refresh(item)
+            await self.session.commit()
+            await self.session.refresh(item)
             return item
         except Exception as e:
             logging.error(f"Failed to create category: {e}")
@@ -21,32 +27,33 @@ class CategoryService:
 
     async def get(self, id: UUID) -> Optional[Category]:
         try:
-            return self.session.get(Category, id)
+            return await cached_get(self.session, Category, id)
         except Exception as e:
             logging.error(f"Failed to retrieve category: {e}")
             raise
 
-    async def list(self, skip: int = 0, limit: int = 100) -> List[Category]:
+    async def get_many(self, ids: List[UUID]) -> BatchResult[Category]:
         try:
+            return await batch_get(self.session, Category, ids)
+        except Exception as e:
+            logging.error(f"Failed to retrieve categories: {e}")
+            raise
+
+    async def list(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Union[List[Category], CursorPage[Category]]:
+        try:
+            if cursor is not None:
+                return await paginate(self.session, select(Category), (Category.name, Category.id), cursor, limit)
             statement = select(Category).offset(skip).limit(limit)
-            return self.session.exec(statement).all()
+            return (await self.session.exec(statement)).all()
         except Exception as e:
             logging.error(f"Failed to retrieve categories: {e}")
             raise
 
     async def update(self, id: UUID, update_data: dict) -> Optional[Category]:
         try:
-            db_item = await self.get(id)
+            db_item = await category_tree.update_category(self.session, id, update_data)
             if not db_item:
                 logging.error("Category not found")
-                return None
-
-            for key, value in update_data.items():
-                setattr(db_item, key, value)
-
-            self.session.add(db_item)
-            self.session.commit()
-            self.session.refresh(db_item)
             return db_item
         except Exception as e:
             logging.error(f"Failed to update category: {e}")
@@ -54,14 +61,38 @@ class CategoryService:
 
     async def delete(self, id: UUID) -> bool:
         try:
-            db_item = await self.get(id)
-            if not db_item:
+            deleted = await category_tree.delete_category(self.session, id)
+            if not deleted:
                 logging.error("Category not found")
-                return False
-
-            self.session.delete(db_item)
-            self.session.commit()
-            return True
+            return deleted
         except Exception as e:
             logging.error(f"Failed to delete category: {e}")
             raise
+
+    async def subtree(self, id: UUID, max_depth: Optional[int] = None) -> List[CategoryNode]:
+        try:
+            return await category_tree.subtree(self.session, id, max_depth)
+        except Exception as e:
+            logging.error(f"Failed to retrieve category subtree: {e}")
+            raise
+
+    async def ancestors(self, id: UUID) -> List[CategoryNode]:
+        try:
+            return await category_tree.ancestors(self.session, id)
+        except Exception as e:
+            logging.error(f"Failed to retrieve category ancestors: {e}")
+            raise
+
+    async def descendant_count(self, id: UUID) -> int:
+        try:
+            return await category_tree.descendant_count(self.session, id)
+        except Exception as e:
+            logging.error(f"Failed to count category descendants: {e}")
+            raise
+
+    async def rollup(self) -> List[CategoryRollup]:
+        try:
+            return await category_rollup(self.session)
+        except Exception as e:
+            logging.error(f"Failed to compute category rollup: {e}")
+            raise
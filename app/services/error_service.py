@@ -1,25 +1,26 @@
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Union
 from uuid import UUID
-from sqlmodel import Session, select
+from sqlmodel import select
 from app.models.error import Error
 import logging
 from pydantic import ValidationError
 from fastapi import HTTPException, status
 
-from app.core.database import get_session
+from app.core.database import DBSession, as_async_session, get_session
+from app.core.pagination import CursorPage, paginate
 
 # Define logging configuration
 logging.basicConfig(level=logging.INFO)
 
 class ErrorService:
-    def __init__(self, session: Session):
-        self.session = session
+    def __init__(self, session: DBSession):
+        self.session = as_async_session(session)
 
     async def create(self, item: Error) -> Error:
         try:
             self.session.add(item)
-            self.session.commit()
-            self.session.refresh(item)
+            await self.session.commit()
+            await self.session.refresh(item)
             return item
         except Exception as e:
             logging.error(f"Error creating item: {e}")
@@ -27,15 +28,17 @@ class ErrorService:
 
     async def get(self, id: UUID) -> Optional[Error]:
         try:
-            return self.session.get(Error, id)
+            return await self.session.get(Error, id)
         except Exception as e:
             logging.error(f"Error getting item: {e}")
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error getting item")
 
-    async def list(self, skip: int = 0, limit: int = 100) -> List[Error]:
+    async def list(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Union[List[Error], CursorPage[Error]]:
         try:
+            if cursor is not None:
+                return await paginate(self.session, select(Error), (Error.id,), cursor, limit)
             statement = select(Error).offset(skip).limit(limit)
-            return self.session.exec(statement).all()
+            return (await self.session.exec(statement)).all()
         except Exception as e:
             logging.error(f"Error listing items: {e}")
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error listing items")
@@ -50,8 +53,8 @@ class ErrorService:
                 setattr(db_item, key, value)
 
             self.session.add(db_item)
-            self.session.commit()
-            self.session.refresh(db_item)
+            await self.session.commit()
+            await self.session.refresh(db_item)
             return db_item
         except Exception as e:
             logging.error(f"Error updating item: {e}")
@@ -63,8 +66,8 @@ class ErrorService:
             if not db_item:
                 return False
 
-            self.session.delete(db_item)
-            self.session.commit()
+            await self.session.delete(db_item)
+            await self.session.commit()
             return True
         except Exception as e:
             logging.error(f"Error deleting item: {e}")
@@ -79,11 +82,11 @@ class ErrorService:
 
     async def validate_unique_item(self, name: str, category: str) -> bool:
         try:
-            db_item = self.session.execute(select(Error).where(Error.name == name)).first()
+            db_item = (await self.session.execute(select(Error).where(Error.name == name))).first()
             if db_item:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Item with name already exists")
 
-            db_category = self.session.execute(select(Error).where(Error.category == category)).first()
+            db_category = (await self.session.execute(select(Error).where(Error.category == category))).first()
             if db_category:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Item with category already exists")
 
@@ -1,92 +1,135 @@
-from typing import List, Optional, Any
+from typing import AsyncIterator, Callable, List, Optional, Any, Tuple, Union
 from uuid import UUID
-from sqlmodel import Session, select
+from sqlmodel import func, select
 
+from app.core.bulk import BulkCreateResult, bulk_insert, validate_rows
+from app.core.batch import BatchResult, batch_get
+from app.core.cache import cached_get
+from app.core.database import DBSession, as_async_session
+from app.core.pagination import CursorPage, paginate
+from app.core.search import search_statement
+from app.core.stock import StockAdjustmentLine, StockLevel, adjust_quantities, adjust_quantity
+from app.core.stock_import import ImportReport, StockImport
+from app.core.writes import delete_returning, update_returning
 from app.models.inventory import Inventory
+from app.models.summary import SummaryCounter, counters_enabled
 
 class InventoryService:
-    def __init__(self, session: Session):
-        self.session = session
+    def __init__(self, session: DBSession):
+        self.session = as_async_session(session)
 
     async def create(self, item: Inventory) -> Inventory:
         try:
             self.session.add(item)
-            self.session.commit()
-            self.session.refresh(item)
+            await self.session.commit()
+            await self.session.refresh(item)
             return item
         except Exception as e:
-            self.session.rollback()
+            await self.session.rollback()
             raise e
 
+    async def bulk_create(self, rows: List[Any]) -> BulkCreateResult:
+        valid, failures = validate_rows(Inventory, rows)
+        return await bulk_insert(self.session, Inventory, valid, failures)
+
+    async def import_stock(
+        self,
+        records: AsyncIterator[Tuple[int, Any]],
+        on_progress: Optional[Callable[[ImportReport], None]] = None,
+        batch_size: Optional[int] = None,
+    ) -> ImportReport:
+        return await StockImport(self.session, Inventory, on_progress=on_progress).run(records, batch_size)
+
     async def get(self, id: UUID) -> Optional[Inventory]:
         try:
-            return self.session.get(Inventory, id)
+            return await cached_get(self.session, Inventory, id)
         except Exception as e:
             raise e
 
-    async def list(self, skip: int = 0, limit: int = 100) -> List[Inventory]:
+    async def get_many(self, ids: List[UUID]) -> BatchResult[Inventory]:
+        return await batch_get(self.session, Inventory, ids)
+
+    async def list(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Union[List[Inventory], CursorPage[Inventory]]:
         try:
+            if cursor is not None:
+                return await paginate(self.session, select(Inventory), (Inventory.name, Inventory.id), cursor, limit)
             statement = select(Inventory).offset(skip).limit(limit)
-            return self.session.exec(statement).all()
+            return (await self.session.exec(statement)).all()
         except Exception as e:
             raise e
 
     async def update(self, id: UUID, update_data: dict) -> Optional[Inventory]:
-        try:
-            db_item = await self.get(id)
-            if not db_item:
-                return None
-                
-            for key, value in update_data.items():
-                setattr(db_item, key, value)
-                
-            self.session.add(db_item)
-            self.session.commit()
-            self.session.refresh(db_item)
-            return db_item
-        except Exception as e:
-            self.session.rollback()
-            raise e
+        return await update_returning(self.session, Inventory, id, update_data)
 
     async def delete(self, id: UUID) -> bool:
-        try:
-            db_item = await self.get(id)
-            if not db_item:
-                return False
-                
-            self.session.delete(db_item)
-            self.session.commit()
-            return True
-        except Exception as e:
-            self.session.rollback()
-            raise e
+        return await delete_returning(self.session, Inventory, id)
+
+    async def adjust(self, id: UUID, delta: int) -> StockLevel:
+        return await adjust_quantity(self.session, Inventory, id, delta)
 
-    async def search(self, name: Optional[str] = None, category: Optional[str] = None) -> List[Inventory]:
+    async def adjust_many(self, lines: List[StockAdjustmentLine]) -> List[StockLevel]:
+        return await adjust_quantities(self.session, Inventory, lines)
+
+    async def search(
+        self, name: Optional[str] = None, category: Optional[str] = None, cursor: Optional[str] = None, limit: int = 100
+    ) -> Union[List[Inventory], CursorPage[Inventory]]:
         try:
             statement = select(Inventory)
             if name:
                 statement = statement.filter(Inventory.name == name)
             if category:
                 statement = statement.filter(Inventory.category == category)
-            return self.session.exec(statement).all()
+            if cursor is not None:
+                return await paginate(self.session, statement, (Inventory.name, Inventory.id), cursor, limit)
+            return (await self.session.exec(statement)).all()
+        except Exception as e:
+            raise e
+
+    async def search_text(
+        self, query: str, cursor: Optional[str] = None, limit: int = 100
+    ) -> Union[List[Inventory], CursorPage[Inventory]]:
+        try:
+            statement = search_statement(self.session.get_bind(), Inventory, query, ranked=cursor is None)
+            if cursor is not None:
+                return await paginate(self.session, statement, (Inventory.name, Inventory.id), cursor, limit)
+            return (await self.session.exec(statement)).all()
         except Exception as e:
             raise e
 
     async def get_summary(self) -> dict:
         try:
-            total_items = self.session.query(Inventory).count()
-            categories = self.session.query(Inventory.category).distinct().all()
+            if counters_enabled(self.session.get_bind()):
+                statement = select(
+                    SummaryCounter.category, SummaryCounter.count, SummaryCounter.quantity
+                ).where(SummaryCounter.source == "inventory", SummaryCounter.count > 0)
+            else:
+                statement = select(
+                    Inventory.category,
+                    func.count(),
+                    func.coalesce(func.sum(Inventory.quantity), 0),
+                ).group_by(Inventory.category)
+            rows = (await self.session.exec(statement)).all()
             return {
-                "total_items": total_items,
-                "categories": categories
+                "total_items": sum(count for _, count, _ in rows),
+                "total_quantity": sum(quantity for _, _, quantity in rows),
+                "category_count": len(rows),
+                "categories": [category for category, _, _ in rows],
+                "by_category": [
+                    {"category": category, "count": count, "quantity": quantity}
+                    for category, count, quantity in rows
+                ],
             }
         except Exception as e:
             raise e
 
-    async def get_items_by_category(self, category: str) -> List[Inventory]:
+    async def get_items_by_category(
+        self, category: str, cursor: Optional[str] = None, limit: int = 100
+    ) -> Union[List[Inventory], CursorPage[Inventory]]:
         try:
             statement = select(Inventory).filter(Inventory.category == category)
-            return self.session.exec(statement).all()
+            if cursor is not None:
+                return await paginate(self.session, statement, (Inventory.name, Inventory.id), cursor, limit)
+            return (await self.session.exec(statement)).all()
         except Exception as e:
             raise e
 
@@ -97,6 +140,6 @@ class InventoryService:
                 statement = statement.filter(Inventory.name == name)
             if category:
                 statement = statement.filter(Inventory.category == category)
-            return self.session.exec(statement).all()
+            return (await self.session.exec(statement)).all()
         except Exception as e:
             raise e
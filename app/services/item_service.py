@@ -1,72 +1,83 @@
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Union
 from uuid import UUID
-from sqlmodel import Session, select
+from sqlmodel import func, select
 
+from app.core.bulk import BulkCreateResult, bulk_insert, validate_rows
+from app.core.batch import BatchResult, batch_get
+from app.core.cache import cached_get
+from app.core.database import DBSession, as_async_session
+from app.core.pagination import CursorPage, paginate
+from app.core.search import search_statement
+from app.core.stock import StockAdjustmentLine, StockLevel, adjust_quantities, adjust_quantity
+from app.core.writes import delete_returning, update_returning
 from app.models.item import Item, CATEGORIES
+from app.models.summary import SummaryCounter, counters_enabled
 from app.exceptions import InvalidCategoryError, ItemNotFoundError
 
 class ItemService:
-    def __init__(self, session: Session):
-        self.session = session
+    def __init__(self, session: DBSession):
+        self.session = as_async_session(session)
 
     async def create(self, item: Item) -> Item:
         try:
             if item.category not in CATEGORIES:
                 raise InvalidCategoryError("Invalid category")
             self.session.add(item)
-            self.session.commit()
-            self.session.refresh(item)
+            await self.session.commit()
+            await self.session.refresh(item)
             return item
         except Exception as e:
-            self.session.rollback()
+            await self.session.rollback()
             raise e
 
+    async def bulk_create(self, rows: List[Any]) -> BulkCreateResult:
+        def check_category(item: Item) -> None:
+            if item.category not in CATEGORIES:
+                raise InvalidCategoryError("Invalid category")
+
+        valid, failures = validate_rows(Item, rows, check_category)
+        return await bulk_insert(self.session, Item, valid, failures)
+
     async def get(self, id: UUID) -> Optional[Item]:
         try:
-            return self.session.get(Item, id)
+            return await cached_get(self.session, Item, id)
         except Exception as e:
             raise e
 
-    async def list(self, skip: int = 0, limit: int = 100) -> List[Item]:
+    async def get_many(self, ids: List[UUID]) -> BatchResult[Item]:
+        return await batch_get(self.session, Item, ids)
+
+    async def list(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Union[List[Item], CursorPage[Item]]:
         try:
+            if cursor is not None:
+                return await paginate(self.session, select(Item), (Item.name, Item.id), cursor, limit)
             statement = select(Item).offset(skip).limit(limit)
-            return self.session.exec(statement).all()
+            return (await self.session.exec(statement)).all()
         except Exception as e:
             raise e
 
     async def update(self, id: UUID, update_data: dict) -> Optional[Item]:
-        try:
-            db_item = await self.get(id)
-            if not db_item:
-                raise ItemNotFoundError("Item not found")
-
-            for key, value in update_data.items():
-                setattr(db_item, key, value)
-                if key == "category" and value not in CATEGORIES:
-                    raise InvalidCategoryError("Invalid category")
-
-            self.session.add(db_item)
-            self.session.commit()
-            self.session.refresh(db_item)
-            return db_item
-        except Exception as e:
-            self.session.rollback()
-            raise e
+        if "category" in update_data and update_data["category"] not in CATEGORIES:
+            raise InvalidCategoryError("Invalid category")
+        db_item = await update_returning(self.session, Item, id, update_data)
+        if not db_item:
+            raise ItemNotFoundError("Item not found")
+        return db_item
 
     async def delete(self, id: UUID) -> bool:
-        try:
-            db_item = await self.get(id)
-            if not db_item:
-                raise ItemNotFoundError("Item not found")
+        if not await delete_returning(self.session, Item, id):
+            raise ItemNotFoundError("Item not found")
+        return True
 
-            self.session.delete(db_item)
-            self.session.commit()
-            return True
-        except Exception as e:
-            self.session.rollback()
-            raise e
+    async def adjust(self, id: UUID, delta: int) -> StockLevel:
+        return await adjust_quantity(self.session, Item, id, delta)
+
+    async def adjust_many(self, lines: List[StockAdjustmentLine]) -> List[StockLevel]:
+        return await adjust_quantities(self.session, Item, lines)
 
-    async def filter(self, name: Optional[str] = None, category: Optional[str] = None) -> List[Item]:
+    async def filter(
+        self, name: Optional[str] = None, category: Optional[str] = None, cursor: Optional[str] = None, limit: int = 100
+    ) -> Union[List[Item], CursorPage[Item]]:
         try:
             statement = select(Item)
             if name:
@@ -75,7 +86,20 @@ class ItemService:
                 if category not in CATEGORIES:
                     raise InvalidCategoryError("Invalid category")
                 statement = statement.where(Item.category == category)
-            return self.session.exec(statement).all()
+            if cursor is not None:
+                return await paginate(self.session, statement, (Item.name, Item.id), cursor, limit)
+            return (await self.session.exec(statement)).all()
+        except Exception as e:
+            raise e
+
+    async def search_text(
+        self, query: str, cursor: Optional[str] = None, limit: int = 100
+    ) -> Union[List[Item], CursorPage[Item]]:
+        try:
+            statement = search_statement(self.session.get_bind(), Item, query, ranked=cursor is None)
+            if cursor is not None:
+                return await paginate(self.session, statement, (Item.name, Item.id), cursor, limit)
+            return (await self.session.exec(statement)).all()
         except Exception as e:
             raise e
 
@@ -87,11 +111,29 @@ class ItemService:
 
     async def get_item_summary(self) -> dict:
         try:
-            total_items = self.session.query(Item).count()
-            categories = {}
-            for category in CATEGORIES:
-                category_items = self.session.query(Item).filter(Item.category == category).count()
-                categories[category] = category_items
-            return {"total_items": total_items, "categories": categories}
+            if counters_enabled(self.session.get_bind()):
+                statement = select(
+                    SummaryCounter.category, SummaryCounter.count, SummaryCounter.quantity, SummaryCounter.value
+                ).where(SummaryCounter.source == "item", SummaryCounter.count > 0)
+            else:
+                statement = select(
+                    Item.category,
+                    func.count(),
+                    func.coalesce(func.sum(Item.quantity), 0),
+                    func.coalesce(func.sum(Item.price * Item.quantity), 0.0),
+                ).group_by(Item.category)
+            totals = {category: (0, 0, 0.0) for category in CATEGORIES}
+            for category, count, quantity, value in (await self.session.exec(statement)).all():
+                totals[category] = (count, quantity, value)
+            return {
+                "total_items": sum(count for count, _, _ in totals.values()),
+                "total_quantity": sum(quantity for _, quantity, _ in totals.values()),
+                "total_value": sum(value for _, _, value in totals.values()),
+                "categories": {category: count for category, (count, _, _) in totals.items()},
+                "by_category": [
+                    {"category": category, "count": count, "quantity": quantity, "value": value}
+                    for category, (count, quantity, value) in totals.items()
+                ],
+            }
         except Exception as e:
             raise e
@@ -1,25 +1,29 @@
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Union
 from uuid import UUID
-from sqlmodel import Session, select
+from sqlmodel import select
 
+from app.core.database import DBSession, as_async_session
+from app.core.pagination import CursorPage, paginate
 from app.models.system import System
 
 class SystemService:
-    def __init__(self, session: Session):
-        self.session = session
+    def __init__(self, session: DBSession):
+        self.session = as_async_session(session)
 
     async def create(self, item: System) -> System:
         self.session.add(item)
-        self.session.commit()
-        self.session.refresh(item)
+        await self.session.commit()
+        await self.session.refresh(item)
         return item
 
     async def get(self, id: UUID) -> Optional[System]:
-        return self.session.get(System, id)
+        return await self.session.get(System, id)
 
-    async def list(self, skip: int = 0, limit: int = 100) -> List[System]:
+    async def list(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Union[List[System], CursorPage[System]]:
+        if cursor is not None:
+            return await paginate(self.session, select(System), (System.id,), cursor, limit)
         statement = select(System).offset(skip).limit(limit)
-        return self.session.exec(statement).all()
+        return (await self.session.exec(statement)).all()
 
     async def update(self, id: UUID, update_data: dict) -> Optional[System]:
         db_item = await self.get(id)
@@ -30,8 +34,8 @@ class SystemService:
             setattr(db_item, key, value)
             
         self.session.add(db_item)
-        self.session.commit()
-        self.session.refresh(db_item)
+        await self.session.commit()
+        await self.session.refresh(db_item)
         return db_item
 
     async def delete(self, id: UUID) -> bool:
@@ -39,6 +43,6 @@ class SystemService:
         if not db_item:
             return False
             
-        self.session.delete(db_item)
-        self.session.commit()
+        await self.session.delete(db_item)
+        await self.session.commit()
         return True
\ No newline at end of file
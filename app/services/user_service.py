@@ -1,10 +1,12 @@
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Union
 from uuid import UUID
-from sqlmodel import Session, select
+from sqlmodel import select
 from app.models.user import User
 from fastapi import HTTPException
 
-from app.core.database import get_session
+from app.core.cache import cached_get, invalidate
+from app.core.database import DBSession, as_async_session, get_session
+from app.core.pagination import CursorPage, paginate
 import logging
 from pydantic import ValidationError
 
@@ -13,14 +15,14 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class UserService:
-    def __init__(self, session: Session):
-        self.session = session
+    def __init__(self, session: DBSession):
+        self.session = as_async_session(session)
 
     async def create(self, item: User) -> User:
         try:
             self.session.add(item)
-            self.session.commit()
-            self.session.refresh(item)
+            await self.session.commit()
+            await self.session.refresh(item)
             return item
         except Exception as e:
             logger.error(str(e))
@@ -28,22 +30,24 @@ class UserService:
 
     async def get(self, id: UUID) -> Optional[User]:
         try:
-            return self.session.get(User, id)
+            return await cached_get(self.session, User, id)
         except Exception as e:
             logger.error(str(e))
             raise HTTPException(status_code=404, detail="User not found")
 
-    async def list(self, skip: int = 0, limit: int = 100) -> List[User]:
+    async def list(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> Union[List[User], CursorPage[User]]:
         try:
+            if cursor is not None:
+                return await paginate(self.session, select(User), (User.id,), cursor, limit)
             statement = select(User).offset(skip).limit(limit)
-            return self.session.exec(statement).all()
+            return (await self.session.exec(statement)).all()
         except Exception as e:
             logger.error(str(e))
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
     async def update(self, id: UUID, update_data: dict) -> Optional[User]:
         try:
-            db_item = await self.get(id)
+            db_item = await self.session.get(User, id)
             if not db_item:
                 return None
             
@@ -54,8 +58,9 @@ class UserService:
                     raise HTTPException(status_code=400, detail=f"Invalid field: {key}")
             
             self.session.add(db_item)
-            self.session.commit()
-            self.session.refresh(db_item)
+            await self.session.commit()
+            invalidate(User, id)
+            await self.session.refresh(db_item)
             return db_item
         except Exception as e:
             logger.error(str(e))
@@ -63,12 +68,13 @@ class UserService:
 
     async def delete(self, id: UUID) -> bool:
         try:
-            db_item = await self.get(id)
+            db_item = await self.session.get(User, id)
             if not db_item:
                 return False
             
-            self.session.delete(db_item)
-            self.session.commit()
+            await self.session.delete(db_item)
+            await self.session.commit()
+            invalidate(User, id)
             return True
         except Exception as e:
             logger.error(str(e))
@@ -0,0 +1,107 @@
+"""
+Compare a commit per write with the group-commit writer at 1, 16 and 128 concurrent writers.
+
+Usage:
+    python -m benchmarks.group_commit_benchmark [--writes 4000] [--writers 1 16 128] [--synchronous FULL]
+
+Each writer inserts Item rows one at a time, awaiting each insert before the
+next, as a client calling POST /items/ in a loop does. "commit each" is the
+previous create path: every insert is its own transaction, run on a worker
+thread so the event loop stays free. "group" runs the same inserts through
+GroupCommitWriter with GROUP_COMMIT_WINDOW_MS and GROUP_COMMIT_MAX_OPS. Both
+run against a WAL file with the given synchronous level, FULL by default so
+that every commit is fsynced as it would be on a durable deployment.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine, func, select
+
+from app.core import config
+from app.core.group_commit import GroupCommitWriter
+from app.models.item import Item
+
+
+def file_engine(path: str, synchronous: str):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 60})
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, _):
+        dbapi_connection.execute("PRAGMA journal_mode = WAL")
+        dbapi_connection.execute(f"PRAGMA synchronous = {synchronous}")
+
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def insert_one(engine, n: int) -> None:
+    with Session(engine) as session:
+        session.add(Item(name=f"item {n}", category="Other", quantity=n))
+        session.commit()
+
+
+async def commit_each(engine, writers: int, writes: int) -> int:
+    async def writer(w: int) -> None:
+        for n in range(w, writes, writers):
+            await asyncio.to_thread(insert_one, engine, n)
+
+    await asyncio.gather(*(writer(w) for w in range(writers)))
+    return writes
+
+
+async def group(engine, writers: int, writes: int) -> int:
+    group_writer = GroupCommitWriter(
+        engine, config.settings.GROUP_COMMIT_WINDOW_MS / 1000, config.settings.GROUP_COMMIT_MAX_OPS
+    )
+
+    def add(session: Session, n: int) -> Item:
+        item = Item(name=f"item {n}", category="Other", quantity=n)
+        session.add(item)
+        session.flush()
+        return item
+
+    async def writer(w: int) -> None:
+        for n in range(w, writes, writers):
+            await group_writer.run(lambda session, n=n: add(session, n))
+
+    await asyncio.gather(*(writer(w) for w in range(writers)))
+    return group_writer.commits
+
+
+MODES = {"commit each": commit_each, "group": group}
+
+
+def run(mode: str, writers: int, args: argparse.Namespace, directory: str) -> dict:
+    path = os.path.join(directory, f"{mode.replace(' ', '_')}_{writers}.db")
+    engine = file_engine(path, args.synchronous)
+    started = time.perf_counter()
+    commits = asyncio.run(MODES[mode](engine, writers, args.writes))
+    elapsed = time.perf_counter() - started
+    with Session(engine) as session:
+        assert session.exec(select(func.count()).select_from(Item)).one() == args.writes
+    engine.dispose()
+    return {"writes/s": args.writes / elapsed, "commits": commits, "ms/write": elapsed * 1000 / args.writes * writers}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writes", type=int, default=4_000, help="total inserts per run")
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 16, 128], help="concurrent writers")
+    parser.add_argument("--synchronous", default="FULL", choices=["OFF", "NORMAL", "FULL", "EXTRA"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {(mode, writers): run(mode, writers, args, directory) for writers in args.writers for mode in MODES}
+
+    columns = list(next(iter(results.values())))
+    print(f"{'mode':<12}{'writers':>8}" + "".join(f"{column:>12}" for column in columns))
+    for (mode, writers), result in results.items():
+        print(f"{mode:<12}{writers:>8}" + "".join(f"{result[column]:>12.1f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
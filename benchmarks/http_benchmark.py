@@ -0,0 +1,282 @@
+"""
+HTTP load benchmark for the v1 API.
+
+Usage:
+    python -m benchmarks.http_benchmark [--target asgi|uvicorn] [--rows 10000] [--concurrency 16]
+                                        [--requests 2000] [--scenarios item.list item.get ...]
+                                        [--output results.json] [--baseline benchmarks/baselines/http_asgi.json]
+                                        [--save-baseline] [--tolerance 0.15]
+
+"asgi" drives app.main.app in-process through httpx's ASGI transport, which
+isolates application cost from the network stack. "uvicorn" starts a real
+server in a subprocess and measures over loopback. Both run against a fresh
+SQLite database seeded with --rows items and inventory rows.
+
+Results are written as JSON. With --baseline, every scenario whose throughput
+dropped, or whose p95 latency grew, by more than --tolerance is reported and
+the exit status is 1, so a CI job can flag the regression.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+import httpx
+
+SYLLABLES = "ka lo mi ne ru sa te vo zi pa de fu go hi ja".split()
+WORDS = [a + b for a in SYLLABLES for b in SYLLABLES]
+INVENTORY_CATEGORIES = ("Tools", "Parts", "Hardware", "Paint", "Garden")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "http_asgi.json")
+
+# A scenario builds one request: (method, path, params, json body)
+Request = Tuple[str, str, Optional[dict], Optional[Any]]
+
+
+def seed(database_url: str, rows: int, seed: int = 1) -> Dict[str, List[str]]:
+    """Fill a fresh database through the application schema and return the ids used by the scenarios."""
+    from sqlmodel import SQLModel, create_engine
+
+    from app.models.category import Category
+    from app.models.inventory import Inventory
+    from app.models.item import CATEGORIES, Item
+    from app.models import summary  # noqa: F401  (register tables)
+    from app.core import search  # noqa: F401  (install FTS tables and triggers on create_all)
+
+    rng = random.Random(seed)
+    words = lambda k: " ".join(rng.choices(WORDS, k=k))
+    engine = create_engine(database_url)
+    SQLModel.metadata.create_all(engine)
+    ids: Dict[str, List[str]] = {"item": [], "inventory": [], "category": []}
+    with engine.begin() as connection:
+        categories = [{"id": uuid4(), "name": f"Category {i}", "description": words(4)} for i in range(50)]
+        connection.execute(Category.__table__.insert(), categories)
+        ids["category"] = [str(c["id"]) for c in categories]
+        for start in range(0, rows, 5000):
+            batch = range(start, min(rows, start + 5000))
+            items = [
+                {
+                    "id": uuid4(), "name": f"{words(2)} {i}", "category": rng.choice(CATEGORIES),
+                    "description": words(10), "price": round(rng.uniform(1, 500), 2), "quantity": rng.randint(0, 100),
+                }
+                for i in batch
+            ]
+            inventory = [
+                {
+                    "id": uuid4(), "name": f"{words(2)} {i}", "category": rng.choice(INVENTORY_CATEGORIES),
+                    "description": words(10), "quantity": rng.randint(0, 500),
+                }
+                for i in batch
+            ]
+            connection.execute(Item.__table__.insert(), items)
+            connection.execute(Inventory.__table__.insert(), inventory)
+            ids["item"] += [str(i["id"]) for i in items[:200]]
+            ids["inventory"] += [str(i["id"]) for i in inventory[:200]]
+    engine.dispose()
+    return ids
+
+
+def scenarios(ids: Dict[str, List[str]]) -> Dict[str, Callable[[random.Random], Request]]:
+    api = "/api/v1"
+    return {
+        "item.create": lambda rng: (
+            "POST", f"{api}/item/", None,
+            {"name": f"bench {rng.random()}", "category": "Other", "price": 1.0, "quantity": 1},
+        ),
+        "item.get": lambda rng: ("GET", f"{api}/item/{rng.choice(ids['item'])}", None, None),
+        "item.list": lambda rng: ("GET", f"{api}/item/", {"limit": 50, "skip": rng.randrange(1000)}, None),
+        "item.list_cursor": lambda rng: ("GET", f"{api}/item/", {"limit": 50, "cursor": ""}, None),
+        "item.filter": lambda rng: ("GET", f"{api}/item/filter", {"category": "Books", "cursor": "", "limit": 50}, None),
+        "item.search": lambda rng: ("GET", f"{api}/item/search", {"query": rng.choice(WORDS)}, None),
+        "item.summary": lambda rng: ("GET", f"{api}/item/summary", None, None),
+        "inventory.create": lambda rng: (
+            "POST", f"{api}/inventory/", None, {"name": f"bench {rng.random()}", "category": "Tools", "quantity": 1},
+        ),
+        "inventory.get": lambda rng: ("GET", f"{api}/inventory/{rng.choice(ids['inventory'])}", None, None),
+        "inventory.list": lambda rng: ("GET", f"{api}/inventory/", {"limit": 50, "skip": rng.randrange(1000)}, None),
+        "inventory.search": lambda rng: ("GET", f"{api}/inventory/search", {"query": rng.choice(WORDS)}, None),
+        "inventory.by_category": lambda rng: (
+            "GET", f"{api}/inventory/category/{rng.choice(INVENTORY_CATEGORIES)}", {"cursor": "", "limit": 50}, None,
+        ),
+        "inventory.summary": lambda rng: ("GET", f"{api}/inventory/summary", None, None),
+        "inventory.adjust": lambda rng: (
+            "POST", f"{api}/inventory/{rng.choice(ids['inventory'])}/adjust", None, {"delta": rng.choice((1, -1))},
+        ),
+        "category.get": lambda rng: ("GET", f"{api}/category/{rng.choice(ids['category'])}", None, None),
+        "category.list": lambda rng: ("GET", f"{api}/category/", {"limit": 50}, None),
+    }
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, build: Callable[[random.Random], Request], requests: int, concurrency: int, seed: int
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker(rng: random.Random) -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            method, path, params, body = build(rng)
+            started = time.perf_counter()
+            resp = await client.request(method, path, params=params, json=body)
+            latencies.append(time.perf_counter() - started)
+            if resp.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(random.Random(seed + i)) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def run_all(client: httpx.AsyncClient, args: argparse.Namespace, ids: Dict[str, List[str]]) -> Dict[str, Any]:
+    available = scenarios(ids)
+    results = {}
+    for name in args.scenarios or list(available):
+        build = available[name]
+        # Warm caches, the connection pool and code paths before measuring
+        await run_scenario(client, build, min(100, args.requests), args.concurrency, seed=0)
+        results[name] = await run_scenario(client, build, args.requests, args.concurrency, seed=1)
+        result = results[name]
+        print(
+            f"{name:<24}{result['rps']:>10.0f}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+            f"{result['p99_ms']:>10.2f}{result['errors']:>8}"
+        )
+    return results
+
+
+async def bench_asgi(args: argparse.Namespace, ids: Dict[str, List[str]]) -> Dict[str, Any]:
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        return await run_all(client, args, ids)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def bench_uvicorn(args: argparse.Namespace, ids: Dict[str, List[str]]) -> Dict[str, Any]:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning",
+         "--workers", str(args.workers)],
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            for _ in range(100):
+                try:
+                    await client.get("/")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn did not start")
+            return await run_all(client, args, ids)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Scenarios slower than the baseline by more than `tolerance`, as readable lines."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        if result["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['rps']:.0f} -> {result['rps']:.0f} req/s")
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--rows", type=int, default=10_000, help="items and inventory rows seeded")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests per scenario")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--scenarios", nargs="+", help="subset of scenarios to run (default: all)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help=f"compare against this results file, e.g. {DEFAULT_BASELINE}")
+    parser.add_argument("--save-baseline", action="store_true", help="write the results to --baseline instead")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The app builds its engine at import time, so point it at the benchmark database first
+        database_url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        os.environ["DATABASE_URL"] = database_url
+        os.environ.setdefault("PROFILING_ENABLED", "false")
+        ids = seed(database_url, args.rows)
+        print(f"{'scenario':<24}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        bench = bench_asgi if args.target == "asgi" else bench_uvicorn
+        results = asyncio.run(bench(args, ids))
+
+    report = {
+        "meta": {
+            "target": args.target,
+            "rows": args.rows,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline and args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"No scenario slower than the baseline by more than {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Compare the ORM read path with the Core row + fast JSON read path for list pages.
+
+Usage:
+    python -m benchmarks.read_path_benchmark [--rows 20000] [--page 1000] [--repeat 20]
+
+"orm" is the previous list route: select(Item) hydrates ORM objects, FastAPI
+validates them against response_model=List[Item], serializes the models and
+encodes the result with the stdlib json module. "core" is the current one:
+select_fields() reads plain rows and fields_response() encodes them with
+orjson (or pydantic's encoder when orjson is missing) without revalidation.
+Each page is fetched and encoded into response bytes; fetch and encode are
+timed separately.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+from pydantic import TypeAdapter
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.core.fields import fields_response, parse_fields, select_fields
+from app.core.ids import uuid7
+from app.models.item import CATEGORIES, Item
+
+ITEMS = TypeAdapter(List[Item])
+
+
+def orm_page(session: Session, page: int) -> Tuple[list, Callable[[list], bytes]]:
+    rows = session.exec(select(Item).limit(page)).all()
+
+    def encode(rows: list) -> bytes:
+        # What FastAPI does with a response_model: validate, serialize, then JSONResponse.render
+        value = ITEMS.validate_python(rows, from_attributes=True)
+        content = ITEMS.dump_python(value, mode="json")
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+    return rows, encode
+
+
+def core_page(session: Session, page: int, fields: str = None) -> Tuple[list, Callable[[list], bytes]]:
+    names = parse_fields(Item, fields)
+    rows = session.exec(select_fields(Item, names).limit(page)).all()
+    return rows, lambda rows: fields_response(Item, names, rows).body
+
+
+VARIANTS: Dict[str, Callable] = {
+    "orm": orm_page,
+    "core": core_page,
+    "core fields": lambda session, page: core_page(session, page, "name,quantity"),
+}
+
+
+def seed(engine, rows: int) -> None:
+    rng = random.Random(1)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            Item.__table__.insert(),
+            [
+                {
+                    "id": uuid7(), "name": f"item {i}", "category": rng.choice(CATEGORIES),
+                    "description": "benchmark row " * rng.randint(1, 8),
+                    "price": round(rng.uniform(1, 500), 2), "quantity": rng.randint(0, 100),
+                }
+                for i in range(rows)
+            ],
+        )
+
+
+def run(variant: str, engine, args: argparse.Namespace) -> dict:
+    fetch = encode = 0.0
+    size = 0
+    with Session(engine) as session:
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            rows, encoder = VARIANTS[variant](session, args.page)
+            fetched = time.perf_counter()
+            body = encoder(rows)
+            encode += time.perf_counter() - fetched
+            fetch += fetched - started
+            size = len(body)
+            session.expunge_all()
+    total = args.page * args.repeat
+    return {
+        "rows/s": total / (fetch + encode),
+        "fetch ms/page": fetch / args.repeat * 1000,
+        "encode ms/page": encode / args.repeat * 1000,
+        "KiB/page": size / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--variants", nargs="+", default=list(VARIANTS), choices=list(VARIANTS))
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--page", type=int, default=1_000, help="rows per list page")
+    parser.add_argument("--repeat", type=int, default=20, help="pages fetched per variant")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'read_path.db')}")
+        seed(engine, args.rows)
+        # Warm the page cache and the statement caches before timing
+        for variant in args.variants:
+            run(variant, engine, argparse.Namespace(page=args.page, repeat=2))
+        results = {variant: run(variant, engine, args) for variant in args.variants}
+        engine.dispose()
+
+    columns = list(next(iter(results.values())))
+    print(f"{'variant':<12}" + "".join(f"{column:>16}" for column in columns))
+    for variant, result in results.items():
+        print(f"{variant:<12}" + "".join(f"{result[column]:>16.1f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Compare inventory search through the FTS5 index against the LIKE '%q%' scan.
+
+Usage:
+    python -m benchmarks.search_benchmark [--rows 1000000] [--repeat 5] [--db PATH]
+
+Builds (or reuses) a SQLite database with the application schema, so the
+FTS index is populated by the same triggers the API relies on.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from uuid import uuid4
+
+from sqlmodel import Session, SQLModel, create_engine, func, select
+
+from app.core.search import fts_statement, like_statement
+from app.models.inventory import Inventory
+from app.models import summary  # noqa: F401  (register tables)
+
+SYLLABLES = "ka lo mi ne ru sa te vo zi pa de fu go hi ja".split()
+# Word frequencies follow a Zipf curve, so queries range from very common to rare terms
+WORDS = sorted({a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES})
+WEIGHTS = [1 / rank for rank in range(1, len(WORDS) + 1)]
+QUERIES = {
+    "common": WORDS[0],
+    "medium": WORDS[50],
+    "rare": WORDS[2000],
+    "prefix": WORDS[300][:4],
+    "two terms": f"{WORDS[10]} {WORDS[80]}",
+    "no match": "qqqq",
+}
+
+
+def build(engine, rows: int, seed: int = 1, batch: int = 10000) -> float:
+    rng = random.Random(seed)
+    words = lambda k: " ".join(rng.choices(WORDS, weights=WEIGHTS, k=k))
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        for start in range(0, rows, batch):
+            connection.execute(Inventory.__table__.insert(), [
+                {
+                    "id": uuid4(),
+                    "name": f"{words(2)} {start + i}",
+                    "category": rng.choice(("Tools", "Parts", "Hardware")),
+                    "description": words(12),
+                    "quantity": rng.randint(0, 500),
+                }
+                for i in range(min(batch, rows - start))
+            ])
+    return time.perf_counter() - started
+
+
+def timed(session: Session, statement, repeat: int):
+    timings, count = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count = len(session.exec(statement).all())
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=100, help="rows fetched per query, as a search box would")
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "search_benchmark.db"))
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{args.db}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        existing = session.exec(select(func.count()).select_from(Inventory)).one()
+    if existing < args.rows:
+        elapsed = build(engine, args.rows - existing)
+        print(f"Inserted {args.rows - existing} rows in {elapsed:.1f}s (FTS and counters maintained by triggers)")
+
+    print(f"{'query':<22}{'like ms':>10}{'fts ms':>10}{'ranked ms':>11}{'like n':>8}{'fts n':>8}")
+    with Session(engine) as session:
+        for label, query in QUERIES.items():
+            like_ms, like_n = timed(session, like_statement(Inventory, query).limit(args.limit), args.repeat)
+            fts_ms, fts_n = timed(session, fts_statement(Inventory, query, ranked=False).limit(args.limit), args.repeat)
+            ranked_ms, _ = timed(session, fts_statement(Inventory, query).limit(args.limit), args.repeat)
+            print(f"{label + ' ' + repr(query):<22}{like_ms:>10.2f}{fts_ms:>10.2f}{ranked_ms:>11.2f}{like_n:>8}{fts_n:>8}")
+
+
+if __name__ == "__main__":
+    main()
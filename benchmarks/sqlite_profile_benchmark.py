@@ -0,0 +1,138 @@
+"""
+Compare the SQLite PRAGMA presets on write, read and mixed workloads.
+
+Usage:
+    python -m benchmarks.sqlite_profile_benchmark [--profiles none dev throughput durable] [--commits 500]
+
+Each profile gets a fresh database file with the application schema, so the
+summary-counter and FTS triggers run on every write as they do in the API.
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from uuid import uuid4
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.core.database import SQLITE_PROFILES, connect_args, install_sqlite_pragmas, sqlite_pragmas
+from app.models.inventory import Inventory
+from app.models import summary  # noqa: F401  (register tables)
+
+
+def row(rng: random.Random) -> dict:
+    return {
+        "id": uuid4(),
+        "name": f"part {rng.randrange(10 ** 6)}",
+        "category": rng.choice(("Tools", "Parts", "Hardware")),
+        "description": "benchmark row",
+        "quantity": rng.randint(0, 500),
+    }
+
+
+def single_commits(engine, commits: int, rng: random.Random) -> float:
+    """Inserts per second when every row is its own transaction, as POST / does."""
+    started = time.perf_counter()
+    for _ in range(commits):
+        with engine.begin() as connection:
+            connection.execute(Inventory.__table__.insert(), row(rng))
+    return commits / (time.perf_counter() - started)
+
+
+def bulk_load(engine, rows: int, rng: random.Random) -> float:
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        connection.execute(Inventory.__table__.insert(), [row(rng) for _ in range(rows)])
+    return rows / (time.perf_counter() - started)
+
+
+def point_reads(engine, ids: list, reads: int, rng: random.Random) -> float:
+    started = time.perf_counter()
+    with Session(engine) as session:
+        for _ in range(reads):
+            session.get(Inventory, rng.choice(ids))
+            session.expunge_all()
+    return reads / (time.perf_counter() - started)
+
+
+def mixed(engine, ids: list, readers: int, seconds: float) -> dict:
+    """One writer committing single rows while `readers` threads run range scans."""
+    stop = time.perf_counter() + seconds
+    counts = {"writes": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+
+    def bump(key: str) -> None:
+        with lock:
+            counts[key] += 1
+
+    def writer() -> None:
+        rng = random.Random(7)
+        while time.perf_counter() < stop:
+            try:
+                with engine.begin() as connection:
+                    connection.execute(Inventory.__table__.insert(), row(rng))
+                bump("writes")
+            except OperationalError:
+                bump("locked")
+
+    def reader(seed: int) -> None:
+        rng = random.Random(seed)
+        while time.perf_counter() < stop:
+            try:
+                with Session(engine) as session:
+                    session.exec(select(Inventory).where(Inventory.name >= f"part {rng.randrange(10 ** 6)}").limit(50)).all()
+                bump("reads")
+            except OperationalError:
+                bump("locked")
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {key: value / seconds if key != "locked" else value for key, value in counts.items()}
+
+
+def run(profile: str, args: argparse.Namespace, directory: str) -> dict:
+    path = os.path.join(directory, f"{profile}.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args=connect_args, pool_size=args.readers + 1)
+    install_sqlite_pragmas(engine, sqlite_pragmas(profile))
+    SQLModel.metadata.create_all(engine)
+    rng = random.Random(1)
+    result = {"bulk rows/s": bulk_load(engine, args.rows, rng)}
+    result["commits/s"] = single_commits(engine, args.commits, rng)
+    with Session(engine) as session:
+        ids = list(session.exec(select(Inventory.id).limit(10000)).all())
+    result["gets/s"] = point_reads(engine, ids, args.reads, rng)
+    concurrent = mixed(engine, ids, args.readers, args.seconds)
+    result["mixed writes/s"] = concurrent["writes"]
+    result["mixed reads/s"] = concurrent["reads"]
+    result["locked errors"] = concurrent["locked"]
+    engine.dispose()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", nargs="+", default=list(SQLITE_PROFILES), choices=list(SQLITE_PROFILES))
+    parser.add_argument("--rows", type=int, default=100_000, help="rows bulk loaded before the other workloads")
+    parser.add_argument("--commits", type=int, default=500, help="single-row transactions")
+    parser.add_argument("--reads", type=int, default=20_000, help="point reads by primary key")
+    parser.add_argument("--readers", type=int, default=4, help="reader threads in the mixed workload")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of the mixed workload")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {profile: run(profile, args, directory) for profile in args.profiles}
+
+    columns = list(next(iter(results.values())))
+    print(f"{'profile':<12}" + "".join(f"{column:>16}" for column in columns))
+    for profile, result in results.items():
+        print(f"{profile:<12}" + "".join(f"{result[column]:>16.0f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Compare primary key generators and storage types on insert throughput and database size.
+
+Usage:
+    python -m benchmarks.uuid_storage_benchmark [--rows 200000] [--batch 1000] [--cache-pages 2000]
+
+Each variant loads an item-shaped table with the same secondary indexes as
+Item into a fresh file. "uuid4 text" is the previous layout: random keys stored
+by SQLAlchemy's Uuid type as 32 hex characters. The page cache is kept small so
+that inserts into a primary key index larger than memory show their real cost.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from uuid import uuid4
+
+from sqlalchemy import Column, Float, Index, Integer, MetaData, String, Table, Uuid, create_engine, event, select, text
+
+from app.core.ids import UUIDBinary, uuid7
+
+VARIANTS = {
+    "uuid4 text": (uuid4, Uuid),
+    "uuid4 blob": (uuid4, UUIDBinary),
+    "uuid7 text": (uuid7, Uuid),
+    "uuid7 blob": (uuid7, UUIDBinary),
+}
+
+
+def item_table(id_type) -> Table:
+    table = Table(
+        "item", MetaData(),
+        Column("id", id_type, primary_key=True),
+        Column("name", String, index=True),
+        Column("category", String),
+        Column("description", String),
+        Column("price", Float),
+        Column("quantity", Integer),
+    )
+    Index("ix_item_name_id", table.c.name, table.c.id)
+    return table
+
+
+def index_sizes(connection) -> dict:
+    """Bytes per table and index, when SQLite was built with the dbstat virtual table."""
+    try:
+        rows = connection.execute(text("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")).all()
+    except Exception:
+        return {}
+    return dict(rows)
+
+
+def run(variant: str, args: argparse.Namespace, directory: str) -> dict:
+    new_id, id_type = VARIANTS[variant]
+    path = os.path.join(directory, f"{variant.replace(' ', '_')}.db")
+    engine = create_engine(f"sqlite:///{path}")
+
+    @event.listens_for(engine, "connect")
+    def set_cache(dbapi_connection, _):
+        dbapi_connection.execute(f"PRAGMA cache_size = {args.cache_pages}")
+
+    table = item_table(id_type)
+    table.metadata.create_all(engine)
+    rng = random.Random(1)
+    started = time.perf_counter()
+    for start in range(0, args.rows, args.batch):
+        rows = [
+            {
+                "id": new_id(),
+                "name": f"item {rng.randrange(10 ** 6)}",
+                "category": "Other",
+                "description": "benchmark row",
+                "price": 1.0,
+                "quantity": rng.randrange(100),
+            }
+            for _ in range(min(args.batch, args.rows - start))
+        ]
+        with engine.begin() as connection:
+            connection.execute(table.insert(), rows)
+    elapsed = time.perf_counter() - started
+
+    with engine.connect() as connection:
+        sizes = index_sizes(connection)
+        started = time.perf_counter()
+        # Walk the table in primary key order a page at a time, as keyset pagination on id does
+        last, pages = None, 0
+        while pages < args.pages:
+            statement = select(table.c.id).order_by(table.c.id).limit(100)
+            if last is not None:
+                statement = statement.where(table.c.id > last)
+            ids = connection.execute(statement).scalars().all()
+            if not ids:
+                break
+            last, pages = ids[-1], pages + 1
+        keyset = pages / (time.perf_counter() - started)
+    engine.dispose()
+    result = {"rows/s": args.rows / elapsed, "file MiB": os.path.getsize(path) / 2 ** 20, "id pages/s": keyset}
+    if sizes:
+        result["pk index MiB"] = sizes.get("sqlite_autoindex_item_1", 0) / 2 ** 20
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--variants", nargs="+", default=list(VARIANTS), choices=list(VARIANTS))
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=1_000, help="rows per transaction")
+    parser.add_argument("--cache-pages", type=int, default=2_000, help="SQLite page cache size in pages")
+    parser.add_argument("--pages", type=int, default=500, help="keyset pages of 100 ids to walk")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {variant: run(variant, args, directory) for variant in args.variants}
+
+    columns = list(next(iter(results.values())))
+    print(f"{'variant':<12}" + "".join(f"{column:>16}" for column in columns))
+    for variant, result in results.items():
+        print(f"{variant:<12}" + "".join(f"{result[column]:>16.1f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
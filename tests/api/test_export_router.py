@@ -0,0 +1,79 @@
+import csv
+import gzip
+import io
+import json
+import threading
+import time
+from uuid import uuid4
+
+from app.core import config, export
+from app.models.inventory import Inventory
+from app.models.item import Item
+
+
+def wait_for(client, job_id):
+    for _ in range(200):
+        job = client.get(f"/api/v1/export/{job_id}").json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"export {job_id} did not finish")
+
+
+def test_export_item_csv_with_valuation_and_ranges(client, session, monkeypatch, tmp_path):
+    monkeypatch.setattr(config.settings, "EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(config.settings, "STREAM_CHUNK_SIZE", 2)
+    for i in range(5):
+        session.add(Item(name=f"Lamp {i}", category="Electronics", price=2.5, quantity=i))
+    session.commit()
+
+    resp = client.post("/api/v1/export/", json={"table": "item"})
+    assert resp.status_code == 202 and resp.json()["status"] == "queued"
+    job = wait_for(client, resp.json()["id"])
+    assert (job["status"], job["rows"]) == ("done", 5)
+
+    download = client.get(f"/api/v1/export/{job['id']}/download")
+    assert download.status_code == 200 and download.headers["accept-ranges"] == "bytes"
+    data = download.content
+    assert len(data) == job["size"]
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(data).decode())))
+    assert [(row["name"], float(row["value"])) for row in rows] == [(f"Lamp {i}", 2.5 * i) for i in range(5)]
+
+    part = client.get(f"/api/v1/export/{job['id']}/download", headers={"Range": "bytes=10-"})
+    assert part.status_code == 206
+    assert part.headers["content-range"] == f"bytes 10-{len(data) - 1}/{len(data)}"
+    assert part.content == data[10:]
+    assert client.get(f"/api/v1/export/{job['id']}/download", headers={"Range": "bytes=-4"}).content == data[-4:]
+    assert client.get(f"/api/v1/export/{job['id']}/download", headers={"Range": f"bytes={len(data)}-"}).status_code == 416
+
+
+def test_export_inventory_ndjson_and_errors(client, session, monkeypatch, tmp_path):
+    monkeypatch.setattr(config.settings, "EXPORT_DIR", str(tmp_path))
+    session.add(Inventory(name="Bolt", category="Hardware", quantity=3))
+    session.commit()
+    job = wait_for(client, client.post("/api/v1/export/", json={"table": "inventory", "format": "ndjson"}).json()["id"])
+    lines = gzip.decompress(client.get(f"/api/v1/export/{job['id']}/download").content).splitlines()
+    assert [json.loads(line)["quantity"] for line in lines] == [3]
+
+    assert client.post("/api/v1/export/", json={"table": "user"}).status_code == 422
+    assert client.get(f"/api/v1/export/{uuid4()}").status_code == 404
+
+
+
+def test_unfinished_exports_end_up_failed(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(config.settings, "EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(config.settings, "EXPORT_WORKERS", 1)
+    release = threading.Event()
+    monkeypatch.setattr(export, "run_export", lambda job, engine: release.wait())
+    export.shutdown_exports()
+    running, queued = (client.post("/api/v1/export/", json={"table": "item"}).json()["id"] for _ in range(2))
+    threading.Timer(0.1, release.set).start()
+    export.shutdown_exports()
+    job = client.get(f"/api/v1/export/{queued}").json()
+    assert job["status"] == "failed" and "shutdown" in job["error"]
+
+    # The first job's manifest still says queued, as after a crash mid-export
+    assert client.get(f"/api/v1/export/{running}").json()["status"] == "queued"
+    assert export.fail_interrupted_exports() == 1
+    job = client.get(f"/api/v1/export/{running}").json()
+    assert job["status"] == "failed" and job["finished_at"] is not None
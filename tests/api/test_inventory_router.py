@@ -1,7 +1,9 @@
+import json
+from uuid import UUID
 from app.core.database import get_session
 from app.models.inventory import Inventory
 import pytest
-from sqlmodel import Session
+from sqlmodel import Session, select
 
 def test_create_inventory(client, session):
     """Test creating a new inventory item."""
@@ -187,4 +189,325 @@ def test_search_items(client, session):
     session.commit()
     resp = client.get("/inventory/search", params={"query": "Test Item"})
     assert resp.status_code == 200
-    assert len(resp.json()) == 3
\ No newline at end of file
+    assert len(resp.json()) == 3
+def test_search_items_cursor(client, session):
+    """Test paging through search results with a cursor."""
+    session.add_all([Inventory(name=f"Widget {i}", category="Tools") for i in range(5)])
+    session.add(Inventory(name="Gadget", category="Tools", description="spare part"))
+    session.commit()
+    resp = client.get("/api/v1/inventory/search", params={"query": "Widget", "cursor": "", "limit": 2})
+    assert resp.status_code == 200
+    names = [i["name"] for i in resp.json()["items"]]
+    cursor = resp.json()["next_cursor"]
+    while cursor:
+        resp = client.get("/api/v1/inventory/search", params={"query": "Widget", "cursor": cursor, "limit": 2})
+        names += [i["name"] for i in resp.json()["items"]]
+        cursor = resp.json()["next_cursor"]
+    assert names == ["Widget 0", "Widget 1", "Widget 2", "Widget 3", "Widget 4"]
+
+def test_get_items_by_category_cursor(client, session):
+    """Test that the category listing is bounded in cursor mode."""
+    session.add_all([Inventory(name=f"Bolt {i}", category="Hardware") for i in range(3)])
+    session.commit()
+    resp = client.get("/api/v1/inventory/category/Hardware", params={"cursor": "", "limit": 2})
+    assert len(resp.json()["items"]) == 2
+    assert resp.json()["next_cursor"] is not None
+    resp = client.get("/api/v1/inventory/category/Hardware")
+    assert len(resp.json()) == 3
+
+def test_bulk_create_inventory_ndjson(client, session):
+    """Test bulk creating inventory from an NDJSON body with bad lines."""
+    existing = Inventory(id=UUID("123e4567-e89b-12d3-a456-426655440000"), name="Existing", category="Tools")
+    session.add(existing)
+    session.commit()
+    lines = [
+        '{"name": "Hammer", "category": "Tools", "quantity": 5}',
+        '{"name": "broken"',
+        '{"id": "123e4567-e89b-12d3-a456-426655440000", "name": "Clash", "category": "Tools"}',
+        '{"name": "Saw", "category": "Tools"}',
+    ]
+    resp = client.post(
+        "/api/v1/inventory/bulk",
+        content="\n".join(lines),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert (body["created"], body["failed"]) == (2, 2)
+    assert body["results"][1]["error"].startswith("Invalid JSON")
+    assert body["results"][2]["error"].startswith("Duplicate id")
+    assert session.exec(select(Inventory).where(Inventory.name == "Hammer")).one().quantity == 5
+
+def test_bulk_create_inventory_reports_duplicate_name_and_category(client, session):
+    """Rows repeating a name+category fail one by one instead of failing the batch."""
+    session.add(Inventory(name="Hammer", category="Tools"))
+    session.commit()
+    rows = [
+        {"name": "Hammer", "category": "Tools"},
+        {"name": "Saw", "category": "Tools"},
+        {"name": "Saw", "category": "Tools"},
+        {"name": "Hammer", "category": "Hardware"},
+    ]
+    resp = client.post("/api/v1/inventory/bulk", json=rows)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert (body["created"], body["failed"]) == (2, 2)
+    assert [result["status"] for result in body["results"]] == ["failed", "created", "failed", "created"]
+    assert body["results"][0]["error"] == "Duplicate name+category: Hammer, Tools"
+
+def test_inventory_summary_grouped(client, session):
+    """Test the inventory summary is reachable and grouped by category."""
+    session.add_all([
+        Inventory(name="Hammer", category="Tools", quantity=3),
+        Inventory(name="Saw", category="Tools", quantity=1),
+        Inventory(name="Nails", category="Hardware", quantity=500),
+    ])
+    session.commit()
+    resp = client.get("/api/v1/inventory/summary")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["total_items"] == 3
+    assert body["category_count"] == 2
+    assert body["total_quantity"] == 504
+    tools = next(c for c in body["by_category"] if c["category"] == "Tools")
+    assert (tools["count"], tools["quantity"]) == (2, 4)
+
+def test_search_items_ranked_prefix(client, session):
+    """Test full-text search matches term prefixes and ranks name hits first."""
+    session.add_all([
+        Inventory(name="Cordless drill", category="Tools", description="18V battery"),
+        Inventory(name="Battery pack", category="Tools", description="Spare cells"),
+        Inventory(name="Drill bits", category="Tools", description="For any drill"),
+    ])
+    session.commit()
+    resp = client.get("/api/v1/inventory/search", params={"query": "batt"})
+    assert [i["name"] for i in resp.json()] == ["Battery pack", "Cordless drill"]
+    resp = client.get("/api/v1/inventory/search", params={"query": "dri bit"})
+    assert [i["name"] for i in resp.json()] == ["Drill bits"]
+
+def test_search_index_follows_writes(client, session):
+    """Test the search index tracks updates and deletes."""
+    item = Inventory(name="Old name", category="Tools")
+    session.add(item)
+    session.commit()
+    item.name = "Fresh label"
+    session.add(item)
+    session.commit()
+    assert client.get("/api/v1/inventory/search", params={"query": "old"}).json() == []
+    assert len(client.get("/api/v1/inventory/search", params={"query": "fresh"}).json()) == 1
+    session.delete(item)
+    session.commit()
+    assert client.get("/api/v1/inventory/search", params={"query": "fresh"}).json() == []
+
+
+def test_adjust_inventory(client, session):
+    saw = Inventory(name="Saw", category="Tools", quantity=5)
+    session.add(saw)
+    session.commit()
+    saw_id = saw.id
+    resp = client.post(f"/api/v1/inventory/{saw_id}/adjust", json={"delta": -3})
+    assert resp.status_code == 200
+    assert resp.json() == {"id": str(saw_id), "quantity": 2}
+    resp = client.post(f"/api/v1/inventory/{saw_id}/adjust", json={"delta": -3})
+    assert resp.status_code == 409
+    assert client.get(f"/api/v1/inventory/{saw_id}").json()["quantity"] == 2
+    missing = "123e4567-e89b-12d3-a456-426655440099"
+    assert client.post(f"/api/v1/inventory/{missing}/adjust", json={"delta": 1}).status_code == 404
+
+
+def test_adjust_inventory_pick_list_is_atomic(client, session):
+    saw = Inventory(name="Saw", category="Tools", quantity=5)
+    nail = Inventory(name="Nail", category="Tools", quantity=1)
+    session.add_all([saw, nail])
+    session.commit()
+    saw_id, nail_id = saw.id, nail.id
+    lines = [{"id": str(saw_id), "delta": -2}, {"id": str(nail_id), "delta": -2}]
+    resp = client.post("/api/v1/inventory/adjust", json=lines)
+    assert resp.status_code == 409
+    assert "Line 1" in resp.json()["detail"]
+    session.expire_all()
+    assert (session.get(Inventory, saw_id).quantity, session.get(Inventory, nail_id).quantity) == (5, 1)
+
+    lines = [{"id": str(nail_id), "delta": 4}, {"id": str(saw_id), "delta": -2}, {"id": str(nail_id), "delta": -5}]
+    resp = client.post("/api/v1/inventory/adjust", json=lines)
+    assert resp.status_code == 200
+    assert [level["quantity"] for level in resp.json()] == [5, 3, 0]
+
+
+def test_query_stats_headers_and_repeat_warning(client, session, monkeypatch, caplog):
+    from app.core import config
+    from app.core.query_stats import install_query_stats
+
+    install_query_stats(session.get_bind())
+    monkeypatch.setattr(config.settings, "DEBUG", True)
+    monkeypatch.setattr(config.settings, "QUERY_REPEAT_THRESHOLD", 2)
+    rows = [Inventory(name=f"Bin {i}", category="Tools", quantity=5) for i in range(3)]
+    session.add_all(rows)
+    session.commit()
+    lines = [{"id": str(row.id), "delta": -1} for row in rows]
+    with caplog.at_level("WARNING", logger="app.core.query_stats"):
+        resp = client.post("/api/v1/inventory/adjust", json=lines)
+    assert resp.status_code == 200
+    assert resp.headers["X-DB-Query-Count"] == "3"
+    assert float(resp.headers["X-DB-Time-Ms"]) >= 0
+    assert resp.headers["X-DB-Slowest-Statement"].startswith("UPDATE inventory")
+    assert "Possible N+1 on POST /api/v1/inventory/adjust: statement ran 3 times" in caplog.text
+
+
+@pytest.mark.parametrize("mode, suffix", [("cprofile", ".prof"), ("sample", ".collapsed")])
+def test_profiling_middleware_writes_profile(client, monkeypatch, tmp_path, mode, suffix):
+    from fastapi.testclient import TestClient
+    from app.core import config
+    from app.core.profiling import ProfilingMiddleware
+    from app.main import app
+
+    monkeypatch.setattr(config.settings, "PROFILING_TOKEN", "secret")
+    monkeypatch.setattr(config.settings, "PROFILING_MODE", mode)
+    monkeypatch.setattr(config.settings, "PROFILING_DIR", str(tmp_path))
+    profiled = TestClient(ProfilingMiddleware(app))
+    assert "x-profile-file" not in profiled.get("/api/v1/inventory/search", params={"query": "saw"}).headers
+    assert "x-profile-file" not in profiled.get(
+        "/api/v1/inventory/search", params={"query": "saw"}, headers={"X-Profile": "wrong"}
+    ).headers
+    resp = profiled.get("/api/v1/inventory/search", params={"query": "saw"}, headers={"X-Profile": "secret"})
+    assert resp.status_code == 200
+    name = resp.headers["x-profile-file"]
+    assert "-GET-api_v1_inventory_search-" in name and name.endswith(suffix)
+    assert [p.name for p in tmp_path.iterdir()] == [name]
+
+
+def test_batch_get_keeps_request_order_and_reports_misses(client, session, monkeypatch, capture_statements):
+    from uuid import uuid4
+    from app.core import config
+
+    rows = [Inventory(name=f"Part {i}", category="Tools", quantity=i) for i in range(5)]
+    session.add_all(rows)
+    session.commit()
+    ids = [str(row.id) for row in rows]
+    session.expunge_all()
+    assert client.get(f"/api/v1/inventory/{ids[0]}").status_code == 200
+    monkeypatch.setattr(config.settings, "BULK_CHUNK_SIZE", 2)
+    missing = str(uuid4())
+    wanted = [ids[3], missing, ids[0], ids[1], ids[3], ids[2], ids[4]]
+
+    with capture_statements() as statements:
+        resp = client.get("/api/v1/inventory/batch", params={"ids": ",".join(wanted[:4])})
+        body = resp.json()
+        assert resp.status_code == 200
+        assert [item and item["name"] for item in body["items"]] == ["Part 3", None, "Part 0", "Part 1"]
+        assert body["missing"] == [missing]
+        # ids[0] came from the cache; the other three take two chunks of two
+        assert len(statements) == 2
+        assert all(" IN (" in statement for statement in statements)
+
+    resp = client.post("/api/v1/inventory/batch", json={"ids": wanted})
+    assert [item and item["quantity"] for item in resp.json()["items"]] == [3, None, 0, 1, 3, 2, 4]
+    assert client.get("/api/v1/inventory/batch", params={"ids": "not-a-uuid"}).status_code == 400
+    monkeypatch.setattr(config.settings, "BATCH_GET_MAX_IDS", 3)
+    assert client.post("/api/v1/inventory/batch", json={"ids": wanted}).status_code == 400
+
+
+@pytest.mark.parametrize("fixture", ["client", "async_client"])
+def test_stream_json_and_ndjson_in_batches(request, fixture, monkeypatch):
+    from app.core import config
+    api = request.getfixturevalue(fixture)
+    monkeypatch.setattr(config.settings, "STREAM_CHUNK_SIZE", 2)
+    for i in range(5):
+        api.post("/api/v1/inventory/", json={"name": f"Bolt {i}", "category": "Hardware", "quantity": i})
+    with api.stream("GET", "/api/v1/inventory/category/Hardware?stream=ndjson&fields=quantity") as resp:
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        chunks = list(resp.iter_raw())
+    rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert sorted(row["quantity"] for row in rows) == list(range(5))
+    assert all(sorted(row) == ["id", "quantity"] for row in rows)
+
+    streamed = api.get("/api/v1/inventory/?stream=json&limit=1")
+    assert streamed.headers["content-type"] == "application/json"
+    assert streamed.json() == api.get("/api/v1/inventory/?limit=10").json()
+    assert api.get("/api/v1/inventory/search?query=nothing&stream=json").json() == []
+    assert api.get("/api/v1/inventory/?stream=xml").status_code == 422
+
+
+def test_import_stock_take_upserts_by_name_and_category(client, session, monkeypatch):
+    from app.core import config
+    monkeypatch.setattr(config.settings, "IMPORT_BATCH_SIZE", 2)
+    existing = client.post("/api/v1/inventory/", json={"name": "Bolt", "category": "Hardware", "description": "M4", "quantity": 1}).json()
+    body = 'name,category,quantity\nBolt,Hardware,40\n"Nut, hex",Hardware,12\nWasher,Hardware,lots\nBolt,Parts,3\n'
+    resp = client.post("/api/v1/inventory/import", content=body, headers={"content-type": "text/csv"})
+    assert resp.status_code == 200
+    report = resp.json()
+    assert (report["rows"], report["upserted"], report["failed"], report["batches"]) == (4, 3, 1, 2)
+    assert report["errors"][0]["line"] == 4 and "quantity" in report["errors"][0]["error"]
+    # Columns missing from the file keep their value, and the cached copy is dropped
+    bolt = client.get(f"/api/v1/inventory/{existing['id']}").json()
+    assert (bolt["quantity"], bolt["description"]) == (40, "M4")
+
+    ndjson = '{"name": "Bolt", "category": "Hardware", "quantity": 7}\nnot json\n'
+    report = client.post("/api/v1/inventory/import?format=ndjson", content=ndjson).json()
+    assert (report["upserted"], report["errors"][0]["line"]) == (1, 2)
+    levels = {(row["name"], row["category"]): row["quantity"] for row in client.get("/api/v1/inventory/").json()}
+    assert levels == {("Bolt", "Hardware"): 7, ("Nut, hex", "Hardware"): 12, ("Bolt", "Parts"): 3}
+    assert client.get("/api/v1/inventory/summary").json()["total_quantity"] == 22
+    assert client.post("/api/v1/inventory/import", content=body).status_code == 415
+
+    # A line with only the key writes nothing to an existing row
+    report = client.post("/api/v1/inventory/import?format=ndjson", content='{"name": "Bolt", "category": "Parts"}\n{"name": "Pin", "category": "Parts"}\n').json()
+    assert (report["upserted"], report["unchanged"]) == (1, 1)
+
+    session.connection().exec_driver_sql("DROP INDEX ux_inventory_name_category")
+    session.commit()
+    resp = client.post("/api/v1/inventory/import?format=ndjson", content=ndjson)
+    assert resp.status_code == 409 and "create-indexes" in resp.json()["detail"]
+
+
+def test_group_commit_shares_transactions_and_isolates_failures(client, session, monkeypatch):
+    import asyncio
+    from sqlalchemy.exc import IntegrityError
+    from app.core import config
+    from app.core.database import AwaitableSession
+    from app.core.group_commit import add_and_commit, group_writer
+    from app.core.query_stats import QueryStats, current_stats, install_query_stats
+    monkeypatch.setattr(config.settings, "GROUP_COMMIT_ENABLED", True)
+    monkeypatch.setattr(config.settings, "GROUP_COMMIT_WINDOW_MS", 50.0)
+    monkeypatch.setattr(config.settings, "GROUP_COMMIT_MAX_OPS", 20)
+    writes = AwaitableSession(session)
+    writer = group_writer(writes)
+
+    async def create(i):
+        # Row 7 repeats row 3's name+category and breaks the unique key
+        return await add_and_commit(writes, Inventory(name=f"Bolt {3 if i == 7 else i}", category="Hardware", quantity=i))
+
+    async def main():
+        return await asyncio.gather(*(create(i) for i in range(50)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert isinstance(results[7], IntegrityError)
+    assert sorted(r.quantity for r in results if isinstance(r, Inventory)) == [i for i in range(50) if i != 7]
+    # Groups of at most 20; the group holding the duplicate is retried one write at a time
+    assert writer.commits == 2 + 19
+    assert len(session.exec(select(Inventory)).all()) == 49
+
+    # The drainer runs outside the context of the request that started it
+    install_query_stats(session.get_bind())
+    stats = QueryStats()
+    async def tracked():
+        current_stats.set(stats)
+        return await create(100)
+    asyncio.run(tracked())
+    assert stats.count == 0
+
+    created = client.post("/api/v1/inventory/", json={"name": "Nut", "category": "Hardware", "quantity": 1}).json()
+    assert client.patch(f"/api/v1/inventory/{created['id']}", json={"quantity": 5}).json()["quantity"] == 5
+    assert client.get("/api/v1/inventory/summary").json()["total_quantity"] == sum(range(50)) - 7 + 100 + 5
+
+
+def test_update_into_existing_name_and_category_is_a_conflict(client, session):
+    saw = Inventory(name="Saw", category="Tools", quantity=5)
+    nail = Inventory(name="Nail", category="Tools", quantity=1)
+    session.add_all([saw, nail])
+    session.commit()
+    nail_id = nail.id
+    body = {"name": "Saw", "category": "Tools", "quantity": 1}
+    assert client.put(f"/api/v1/inventory/{nail_id}", json=body).status_code == 409
+    assert client.patch(f"/api/v1/inventory/{nail_id}", json={"name": "Saw"}).status_code == 409
+    assert client.get(f"/api/v1/inventory/{nail_id}").json()["name"] == "Nail"
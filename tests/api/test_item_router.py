@@ -1,8 +1,10 @@
 import pytest
 from fastapi import status
+from app.core.database import create_missing_indexes
 from app.exceptions import InvalidCategoryError, ItemNotFoundError
 from app.models.item import Item, CATEGORIES
-from uuid import uuid4
+from uuid import UUID, uuid4
+from sqlmodel import select
 
 def test_create_item(client, session):
     item_data = {"name": "Test Item", "category": CATEGORIES[0]}
@@ -98,4 +100,259 @@ def test_filter_items(client, session):
     assert len(resp.json()) == 1
     resp = client.get("/items/filter", params={"category": CATEGORIES[0]})
     assert resp.status_code == 200
-    assert len(resp.json()) == 5
\ No newline at end of file
+    assert len(resp.json()) == 5
+
+def test_item_crud_async_session(async_client):
+    item_data = {"name": "Async Item", "category": CATEGORIES[0], "price": 2.5, "quantity": 4}
+    resp = async_client.post("/api/v1/item/", json=item_data)
+    assert resp.status_code == 200
+    item_id = resp.json()["id"]
+    resp = async_client.get(f"/api/v1/item/{item_id}")
+    assert resp.status_code == 200
+    assert resp.json()["name"] == "Async Item"
+    resp = async_client.get("/api/v1/item/")
+    assert [i["id"] for i in resp.json()] == [item_id]
+    resp = async_client.delete(f"/api/v1/item/{item_id}")
+    assert resp.status_code == 204
+    assert async_client.get("/api/v1/item/").json() == []
+
+
+def test_item_crud_sync_session(client, session):
+    resp = client.post("/api/v1/item/", json={"name": "Sync Item", "category": CATEGORIES[1]})
+    assert resp.status_code == 200
+    item_id = resp.json()["id"]
+    assert session.get(Item, UUID(item_id)).name == "Sync Item"
+    resp = client.get(f"/api/v1/item/{item_id}")
+    assert resp.json()["category"] == CATEGORIES[1]
+
+
+def test_list_items_cursor_pages(client, session):
+    for i in range(7):
+        session.add(Item(name=f"Item {i % 3}", category=CATEGORIES[0]))
+    session.commit()
+    expected = [(i.name, str(i.id)) for i in session.exec(select(Item).order_by(Item.name, Item.id)).all()]
+    seen, cursor = [], ""
+    while cursor is not None:
+        resp = client.get("/api/v1/item/", params={"cursor": cursor, "limit": 3})
+        assert resp.status_code == 200
+        page = resp.json()
+        assert len(page["items"]) <= 3
+        seen += [(i["name"], i["id"]) for i in page["items"]]
+        cursor = page["next_cursor"]
+    assert seen == expected
+
+
+def test_list_items_invalid_cursor(client, session):
+    resp = client.get("/api/v1/item/", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+
+
+def test_list_items_rejects_out_of_range_limit(client, session):
+    session.add(Item(name="Item", category=CATEGORIES[0]))
+    session.commit()
+    for limit in (0, -5, 10_001):
+        assert client.get("/api/v1/item/", params={"cursor": "", "limit": limit}).status_code == 422
+    assert client.get("/api/v1/item/search", params={"query": "Item", "cursor": "", "limit": 0}).status_code == 422
+    page = client.get("/api/v1/item/filter", params={"name": "Nothing", "cursor": "", "limit": 1}).json()
+    assert page == {"items": [], "next_cursor": None}
+
+
+def test_create_missing_indexes_on_existing_table(session):
+    connection = session.connection()
+    connection.exec_driver_sql("DROP INDEX ix_item_name_id")
+    assert create_missing_indexes(connection) == ["ix_item_name_id"]
+    assert create_missing_indexes(connection) == []
+
+
+def test_filter_items_cursor(client, session):
+    for i in range(5):
+        session.add(Item(name=f"Phone {i}", category=CATEGORIES[0]))
+    session.add(Item(name="Shirt", category=CATEGORIES[1]))
+    session.commit()
+    resp = client.get("/api/v1/item/filter", params={"category": CATEGORIES[0], "cursor": "", "limit": 4})
+    page = resp.json()
+    assert [i["name"] for i in page["items"]] == ["Phone 0", "Phone 1", "Phone 2", "Phone 3"]
+    resp = client.get("/api/v1/item/filter", params={"category": CATEGORIES[0], "cursor": page["next_cursor"], "limit": 4})
+    assert [i["name"] for i in resp.json()["items"]] == ["Phone 4"]
+    assert resp.json()["next_cursor"] is None
+
+
+def test_bulk_create_items(client, session):
+    rows = [
+        {"name": "Laptop", "category": CATEGORIES[0], "price": 999.0, "quantity": 2},
+        {"name": "Mystery", "category": "Invalid Category"},
+        {"name": "No category"},
+        {"name": "Novel", "category": CATEGORIES[3]},
+    ]
+    resp = client.post("/api/v1/item/bulk", json=rows)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["created"] == 2
+    assert body["failed"] == 2
+    assert [r["status"] for r in body["results"]] == ["created", "failed", "failed", "created"]
+    assert body["results"][1]["error"] == "Invalid category"
+    assert "category" in body["results"][2]["error"]
+    names = sorted(i.name for i in session.exec(select(Item)).all())
+    assert names == ["Laptop", "Novel"]
+
+
+def test_bulk_create_items_async_session(async_client):
+    rows = [{"name": f"Item {i}", "category": CATEGORIES[i % len(CATEGORIES)]} for i in range(1200)]
+    resp = async_client.post("/api/v1/item/bulk", json=rows)
+    assert resp.json()["created"] == 1200
+    assert len(async_client.get("/api/v1/item/", params={"limit": 2000}).json()) == 1200
+
+
+def test_item_summary_single_query(client, session, capture_statements):
+    session.add_all([
+        Item(name="TV", category="Electronics", price=100.0, quantity=2),
+        Item(name="Radio", category="Electronics", price=20.0, quantity=5),
+        Item(name="Apple", category="Food", price=0.5, quantity=10),
+    ])
+    session.commit()
+    with capture_statements() as statements:
+        resp = client.get("/api/v1/item/summary")
+    assert resp.status_code == 200
+    assert len(statements) == 1
+    body = resp.json()
+    assert body["total_items"] == 3
+    assert body["total_quantity"] == 17
+    assert body["total_value"] == 305.0
+    assert body["categories"] == {"Electronics": 2, "Clothing": 0, "Food": 1, "Books": 0, "Other": 0}
+    electronics = next(c for c in body["by_category"] if c["category"] == "Electronics")
+    assert (electronics["count"], electronics["quantity"], electronics["value"]) == (2, 7, 300.0)
+
+
+def test_search_items_full_text(client, session):
+    session.add_all([
+        Item(name="Laptop stand", category="Electronics", description="Aluminium"),
+        Item(name="Cookbook", category="Books", description="Recipes for a laptop-free kitchen"),
+    ])
+    session.commit()
+    resp = client.get("/api/v1/item/search", params={"query": "lap"})
+    assert resp.status_code == 200
+    assert [i["name"] for i in resp.json()] == ["Laptop stand", "Cookbook"]
+    assert client.get("/api/v1/item/search", params={"query": "%"}).json() == []
+
+
+def test_get_item_cached_until_write(client, session, capture_statements):
+    item = Item(name="Lamp", category="Electronics", quantity=1)
+    session.add(item)
+    session.commit()
+    item_id = item.id
+    session.expunge_all()
+    before = client.get("/api/v1/system/cache").json().get("item", {"hits": 0, "misses": 0})
+    with capture_statements() as statements:
+        assert client.get(f"/api/v1/item/{item_id}").json()["name"] == "Lamp"
+        reads = len(statements)
+        assert client.get(f"/api/v1/item/{item_id}").json()["name"] == "Lamp"
+        assert len(statements) == reads
+    stats = client.get("/api/v1/system/cache").json()["item"]
+    assert (stats["hits"] - before["hits"], stats["misses"] - before["misses"]) == (1, 1)
+
+    update = {"name": "Desk lamp", "category": "Electronics", "quantity": 1}
+    assert client.put(f"/api/v1/item/{item_id}", json=update).status_code == 200
+    assert client.get(f"/api/v1/item/{item_id}").json()["name"] == "Desk lamp"
+    assert client.delete(f"/api/v1/item/{item_id}").status_code == 204
+    assert client.get(f"/api/v1/item/{item_id}").status_code == 404
+
+
+def test_entity_cache_lru_and_ttl(monkeypatch):
+    from app.core import cache
+
+    lru = cache.EntityCache("item", maxsize=2, ttl=10.0)
+    lru.set("a", {"id": "a"})
+    lru.set("b", {"id": "b"})
+    assert lru.get("a") == {"id": "a"}
+    lru.set("c", {"id": "c"})
+    assert lru.get("b") is None
+    assert lru.evictions == 1
+    # A fill that started before an invalidation is dropped
+    epoch = lru.epoch()
+    lru.invalidate("a")
+    lru.set("a", {"id": "stale"}, epoch)
+    assert lru.get("a") is None
+    now = cache.time.monotonic()
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now + 11)
+    assert lru.get("c") is None
+    assert lru.expirations == 1
+
+
+def test_adjust_item_single_statement(client, session, capture_statements):
+    item = Item(name="Pen", category="Other", price=2.0, quantity=10)
+    session.add(item)
+    session.commit()
+    item_id = item.id
+    with capture_statements() as statements:
+        resp = client.post(f"/api/v1/item/{item_id}/adjust", json={"delta": -4})
+    assert resp.status_code == 200
+    assert resp.json()["quantity"] == 6
+    assert len(statements) == 1 and statements[0].startswith("UPDATE item")
+    assert client.get("/api/v1/item/summary").json()["total_quantity"] == 6
+
+
+def test_metrics_per_route_template(client, session):
+    item = Item(name="Mug", category="Other")
+    session.add(item)
+    session.commit()
+    client.get(f"/api/v1/item/{item.id}")
+    client.get(f"/api/v1/item/{uuid4()}")
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = resp.text.splitlines()
+    assert any(line.startswith('http_requests_total{method="GET",route="/api/v1/item/{id}",status="404"}') for line in lines)
+    assert any(line.startswith('http_request_duration_seconds_bucket{method="GET",route="/api/v1/item/{id}",le="+Inf"}') for line in lines)
+    assert 'http_requests_in_progress{method="GET",route="/api/v1/item/{id}"} 0' in lines
+    # A parameter value equal to a literal segment keeps the template intact
+    client.get("/api/v1/category/subtree/subtree")
+    client.get("/api/v1/nowhere")
+    lines = client.get("/metrics").text.splitlines()
+    assert any(line.startswith('http_requests_total{method="GET",route="/api/v1/category/{id}/subtree",status="422"}') for line in lines)
+    assert any(line.startswith('http_requests_total{method="GET",route="<unmatched>",status="404"}') for line in lines)
+
+
+def test_patch_and_delete_are_single_statements(client, session, capture_statements):
+    item_id = client.post("/api/v1/item/", json={"name": "Lamp", "category": "Electronics", "price": 5.0, "quantity": 1}).json()["id"]
+    assert client.get(f"/api/v1/item/{item_id}").json()["quantity"] == 1
+    with capture_statements() as statements:
+        resp = client.patch(f"/api/v1/item/{item_id}", json={"quantity": 4})
+        assert resp.status_code == 200
+        assert (resp.json()["name"], resp.json()["quantity"]) == ("Lamp", 4)
+        assert client.delete(f"/api/v1/item/{item_id}").status_code == 204
+        assert [statement.split()[0] for statement in statements] == ["UPDATE", "DELETE"]
+    assert client.get(f"/api/v1/item/{item_id}").status_code == 404
+    assert client.delete(f"/api/v1/item/{item_id}").status_code == 404
+    assert client.patch(f"/api/v1/item/{item_id}", json={"quantity": 1}).status_code == 404
+
+
+def test_patch_validates_sparse_body(async_client):
+    item_id = async_client.post("/api/v1/item/", json={"name": "Lamp", "category": "Electronics", "quantity": 1}).json()["id"]
+    assert async_client.get(f"/api/v1/item/{item_id}").json()["quantity"] == 1
+    assert async_client.patch(f"/api/v1/item/{item_id}", json={"category": "Nope"}).status_code == 400
+    assert async_client.patch(f"/api/v1/item/{item_id}", json={"quantity": "many"}).status_code == 422
+    assert async_client.patch(f"/api/v1/item/{item_id}", json={"quantity": 3}).json()["quantity"] == 3
+    # The cached copy from the first GET was invalidated
+    assert async_client.get(f"/api/v1/item/{item_id}").json()["quantity"] == 3
+
+
+def test_fields_narrow_select_and_response(client, session, capture_statements):
+    for name in ("Lamp", "Desk", "Mug"):
+        session.add(Item(name=name, category="Other", description="long text " * 50, quantity=2))
+    session.commit()
+    with capture_statements() as statements:
+        resp = client.get("/api/v1/item/?fields=name,quantity")
+    assert resp.status_code == 200
+    assert sorted(resp.json()[0]) == ["id", "name", "quantity"]
+    assert "description" not in statements[0] and "item.quantity" in statements[0]
+
+    page = client.get("/api/v1/item/filter?category=Other&cursor=&limit=2&fields=quantity").json()
+    assert [sorted(row) for row in page["items"]] == [["id", "quantity"]] * 2
+    rest = client.get(f"/api/v1/item/filter?category=Other&cursor={page['next_cursor']}&limit=2&fields=quantity").json()
+    assert len(rest["items"]) == 1 and rest["next_cursor"] is None
+
+    item_id = page["items"][0]["id"]
+    assert client.get(f"/api/v1/item/{item_id}?fields=name").json() == {"id": item_id, "name": "Desk"}
+    assert client.get("/api/v1/item/search?query=lamp&fields=name").json()[0]["name"] == "Lamp"
+    resp = client.get("/api/v1/item/?fields=name,secret")
+    assert resp.status_code == 400 and "secret" in resp.json()["detail"]
@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+
+from app.models.system import System
+
+
+def test_update_patch_and_delete_system(client, session):
+    system = System(version="1.0", lastUpdated=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    session.add(system)
+    session.commit()
+    system_id = system.id
+
+    resp = client.put(f"/api/v1/system/{system_id}", json={"version": "2.0", "lastUpdated": "2024-02-01T00:00:00Z"})
+    assert resp.status_code == 200
+    assert resp.json()["version"] == "2.0"
+    resp = client.patch(f"/api/v1/system/{system_id}", json={"version": "2.1"})
+    assert resp.status_code == 200
+    assert resp.json() == {"id": system_id, "version": "2.1", "lastUpdated": "2024-02-01T00:00:00Z"}
+
+    assert client.delete(f"/api/v1/system/{system_id}").status_code == 204
+    assert client.get(f"/api/v1/system/{system_id}").status_code == 404
+    assert client.patch(f"/api/v1/system/{system_id}", json={"version": "3.0"}).status_code == 404
+    assert client.delete(f"/api/v1/system/{system_id}").status_code == 404
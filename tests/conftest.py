@@ -1,10 +1,17 @@
+from contextlib import contextmanager
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.pool import StaticPool
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 
 from app.main import app
-from app.core.database import get_session
+from app.core.cache import clear_entity_caches
+from app.core.database import AwaitableSession, get_async_database_url, get_session
 
 @pytest.fixture(name="session")
 def session_fixture():
@@ -21,17 +28,56 @@ def session_fixture():
     with Session(engine) as session:
         yield session
 
+@pytest.fixture(name="capture_statements")
+def capture_statements_fixture(session: Session):
+    """
+    Context manager collecting the SQL statements the in-memory database runs inside its block.
+    """
+    @contextmanager
+    def capture():
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(session.get_bind(), "before_cursor_execute", listener)
+        try:
+            yield statements
+        finally:
+            event.remove(session.get_bind(), "before_cursor_execute", listener)
+
+    return capture
+
 @pytest.fixture(name="client")
 def client_fixture(session: Session):
     """
     Create a TestClient that uses the in-memory DB session.
     """
     def get_session_override():
-        return session
+        return AwaitableSession(session)
 
     app.dependency_overrides[get_session] = get_session_override
+    clear_entity_caches()
     
     client = TestClient(app)
     yield client
     
-    app.dependency_overrides.clear()
\ No newline at end of file
+    app.dependency_overrides.clear()
+
+@pytest.fixture(name="async_client")
+def async_client_fixture(tmp_path):
+    """
+    Create a TestClient whose requests run on an aiosqlite AsyncSession.
+    """
+    db_url = f"sqlite:///{tmp_path}/async.db"
+    SQLModel.metadata.create_all(create_engine(db_url))
+    async_engine = create_async_engine(get_async_database_url(db_url), poolclass=NullPool)
+
+    async def get_session_override():
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    clear_entity_caches()
+
+    client = TestClient(app)
+    yield client
+
+    app.dependency_overrides.clear()
@@ -0,0 +1,34 @@
+from sqlalchemy import text
+from sqlmodel import Session, create_engine, func, select
+
+from app.cli import main
+from app.core.dataset import DatasetGenerator, DatasetSpec, load_dataset
+from app.models.category import Category
+from app.models.item import Item
+from app.models.summary import SummaryCounter, check_summary_counters
+
+
+def test_generated_dataset_is_deterministic_and_consistent(session):
+    spec = DatasetSpec(items=300, inventory=200, categories=40, users=5, errors=20, tree_depth=4, batch_size=64)
+    first = list(DatasetGenerator(spec).items())
+    assert first == list(DatasetGenerator(spec).items())
+    load_dataset(session.get_bind(), spec)
+    assert check_summary_counters(session.connection()) == []
+    counts = session.exec(select(SummaryCounter.count).where(SummaryCounter.source == "item")).all()
+    assert sum(counts) == 300
+    categories = {c.id: c for c in session.exec(select(Category)).all()}
+    depth = lambda c: 0 if c.parent_id is None else 1 + depth(categories[c.parent_id])
+    assert max(depth(c) for c in categories.values()) == 3
+    hits = session.exec(text("SELECT count(*) FROM item_fts WHERE item_fts MATCH :q"), params={"q": first[0]["name"].split()[0]}).one()
+    assert hits[0] > 0
+
+
+def test_generate_creates_the_schema_on_the_target_database(tmp_path):
+    url = f"sqlite:///{tmp_path}/other.db"
+    args = ["--items", "50", "--inventory", "10", "--categories", "5", "--users", "2", "--errors", "3"]
+    assert main(["generate", *args, "--database-url", url]) == 0
+    engine = create_engine(url)
+    with Session(engine) as session:
+        assert session.exec(select(func.count()).select_from(Item)).one() == 50
+        assert check_summary_counters(session.connection()) == []
+    engine.dispose()
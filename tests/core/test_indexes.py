@@ -0,0 +1,22 @@
+from sqlmodel import delete
+
+from app.core.database import create_missing_indexes, duplicate_keys, missing_indexes
+from app.models.inventory import Inventory
+
+
+def test_unique_index_waits_for_duplicates_to_be_resolved(session):
+    connection = session.connection()
+    connection.exec_driver_sql("DROP INDEX ux_inventory_name_category")
+    session.add_all([Inventory(name="Bolt", category="Hardware", quantity=q) for q in (1, 2)])
+    session.add(Inventory(name="Nut", category="Hardware"))
+    session.flush()
+
+    assert create_missing_indexes(connection) == []
+    (index,) = missing_indexes(connection)
+    assert index.name == "ux_inventory_name_category"
+    assert duplicate_keys(connection, index) == [("Bolt", "Hardware", 2)]
+
+    session.exec(delete(Inventory).where(Inventory.quantity == 2))
+    assert duplicate_keys(connection, index) == []
+    assert create_missing_indexes(connection, unique=True) == ["ux_inventory_name_category"]
+    assert missing_indexes(connection) == []
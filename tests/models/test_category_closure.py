@@ -0,0 +1,121 @@
+import warnings
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from app.models.category import Category
+from app.models.category_closure import check_category_closure, rebuild_category_closure
+
+
+def test_closure_follows_inserts_moves_and_deletes(session):
+    root = Category(name="Root")
+    a = Category(name="A", parent_id=root.id)
+    b = Category(name="B", parent_id=a.id)
+    other = Category(name="Other")
+    session.add_all([root, a, b, other])
+    session.commit()
+    assert check_category_closure(session.connection()) == []
+
+    a.parent_id = other.id
+    session.add(a)
+    session.commit()
+    assert check_category_closure(session.connection()) == []
+
+    root.parent_id = b.id
+    session.add(root)
+    session.commit()
+    other.parent_id = b.id
+    session.add(other)
+    with pytest.raises(IntegrityError):
+        session.commit()
+    session.rollback()
+
+    a_id, b_id, other_id = a.id, b.id, other.id
+    session.delete(a)
+    session.commit()
+    assert session.get(Category, b_id).parent_id == other_id
+    assert check_category_closure(session.connection()) == []
+    assert session.exec(text("SELECT COUNT(*) FROM category_closure WHERE descendant_id = :id"), params={"id": a_id.bytes}).one()[0] == 0
+
+
+def test_rebuild_repairs_closure(session):
+    root = Category(name="Root")
+    session.add_all([root, Category(name="Child", parent_id=root.id)])
+    session.commit()
+    session.exec(text("DELETE FROM category_closure WHERE depth > 0"))
+    assert [row[0] for row in check_category_closure(session.connection())] == ["missing"]
+    rebuild_category_closure(session.connection())
+    session.commit()
+    assert check_category_closure(session.connection()) == []
+
+
+@pytest.mark.parametrize("client_fixture", ["client", "async_client"])
+def test_category_tree_endpoints(client_fixture, request):
+    client = request.getfixturevalue(client_fixture)
+    ids = {}
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        for name, parent in [("Root", None), ("A", "Root"), ("B", "A"), ("C", "A"), ("Other", None)]:
+            response = client.post("/api/v1/category/", json={"name": name, "parent_id": ids.get(parent)})
+            assert response.status_code == 200
+            ids[name] = response.json()["id"]
+    # parent_id reaches the table model as a UUID, not a string the serializer warns about
+    assert not [warning for warning in caught if "Expected `uuid`" in str(warning.message)]
+
+    subtree = client.get(f"/api/v1/category/{ids['Root']}/subtree").json()
+    assert [(node["name"], node["depth"]) for node in subtree] == [("Root", 0), ("A", 1), ("B", 2), ("C", 2)]
+    shallow = client.get(f"/api/v1/category/{ids['Root']}/subtree", params={"max_depth": 1}).json()
+    assert [node["name"] for node in shallow] == ["Root", "A"]
+    ancestors = client.get(f"/api/v1/category/{ids['B']}/ancestors").json()
+    assert [(node["name"], node["depth"]) for node in ancestors] == [("Root", 2), ("A", 1)]
+    assert client.get(f"/api/v1/category/{ids['Root']}/descendants/count").json()["count"] == 3
+
+    response = client.put(f"/api/v1/category/{ids['A']}", json={"name": "A", "parent_id": ids["Other"]})
+    assert response.status_code == 200
+    assert client.get(f"/api/v1/category/{ids['Root']}/descendants/count").json()["count"] == 0
+    ancestors = client.get(f"/api/v1/category/{ids['C']}/ancestors").json()
+    assert [node["name"] for node in ancestors] == ["Other", "A"]
+
+    response = client.put(f"/api/v1/category/{ids['Other']}", json={"name": "Other", "parent_id": ids["B"]})
+    assert response.status_code == 409
+    response = client.put(f"/api/v1/category/{ids['A']}", json={"name": "A", "parent_id": None})
+    assert response.status_code == 200
+    assert client.get(f"/api/v1/category/{ids['C']}/ancestors").json()[0]["name"] == "A"
+
+    assert client.delete(f"/api/v1/category/{ids['A']}").status_code == 204
+    assert client.get(f"/api/v1/category/{ids['B']}").json()["parent_id"] is None
+    assert client.get(f"/api/v1/category/{ids['A']}/subtree").status_code == 404
+
+
+@pytest.mark.parametrize("client_fixture", ["client", "async_client"])
+def test_category_rollup_follows_writes(client_fixture, request):
+    client = request.getfixturevalue(client_fixture)
+    ids = {}
+    for name, parent in [("Other", None), ("Electronics", "Other"), ("Cases", "Electronics"), ("Food", None)]:
+        ids[name] = client.post("/api/v1/category/", json={"name": name, "parent_id": ids.get(parent)}).json()["id"]
+    client.post("/api/v1/item/", json={"name": "TV", "category": "Other", "price": 100.0, "quantity": 2})
+    phone = client.post("/api/v1/item/", json={"name": "Phone", "category": "Electronics", "price": 50.0, "quantity": 3}).json()
+    client.post("/api/v1/inventory/", json={"name": "Case", "category": "Cases", "quantity": 7})
+
+    def totals():
+        nodes = client.get("/api/v1/category/rollup").json()
+        return {
+            node["name"]: (node["item_count"], node["item_quantity"], node["item_value"], node["inventory_quantity"])
+            for node in nodes
+        }
+
+    assert totals() == {
+        "Other": (2, 5, 350.0, 7),
+        "Electronics": (1, 3, 150.0, 7),
+        "Cases": (0, 0, 0.0, 7),
+        "Food": (0, 0, 0.0, 0),
+    }
+    client.post(f"/api/v1/item/{phone['id']}/adjust", json={"delta": -1})
+    client.put(f"/api/v1/category/{ids['Electronics']}", json={"name": "Electronics", "parent_id": ids["Food"]})
+    assert totals() == {
+        "Other": (1, 2, 200.0, 0),
+        "Electronics": (1, 2, 100.0, 7),
+        "Cases": (0, 0, 0.0, 7),
+        "Food": (1, 2, 100.0, 7),
+    }
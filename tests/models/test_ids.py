@@ -0,0 +1,66 @@
+import time
+from uuid import uuid4
+
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.core import database
+
+from app.core.ids import migrate_uuid_storage, uuid7, uuid7_time
+from app.models.category import Category
+from app.models.category_closure import check_category_closure
+from app.models.item import Item
+
+
+def test_uuid7_is_time_ordered():
+    ids = [uuid7() for _ in range(10_000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert all(value.version == 7 and value.variant == "specified in RFC 4122" for value in ids[:10])
+    assert abs(uuid7_time(ids[0]) - time.time()) < 5
+
+
+def test_ids_are_stored_as_16_byte_blobs_in_creation_order(session):
+    items = [Item(name=f"Item {i}", category="Other") for i in range(5)]
+    session.add_all(reversed(items))
+    session.commit()
+    assert session.exec(text("SELECT DISTINCT typeof(id), length(id) FROM item")).all() == [("blob", 16)]
+    assert session.exec(select(Item.name).order_by(Item.id)).all() == [f"Item {i}" for i in range(5)]
+
+
+def test_migrate_uuid_storage_converts_text_ids(session):
+    root, child = uuid4(), uuid4()
+    session.exec(text("INSERT INTO category (id, name) VALUES (:id, 'Root')"), params={"id": root.hex})
+    session.exec(
+        text("INSERT INTO category (id, name, parent_id) VALUES (:id, 'Child', :parent)"),
+        params={"id": child.hex, "parent": root.hex},
+    )
+    session.exec(
+        text("INSERT INTO item (id, name, category, quantity) VALUES (:id, 'Legacy', 'Other', 1)"),
+        params={"id": uuid4().hex},
+    )
+    session.commit()
+    assert session.get(Category, child) is None
+
+    assert migrate_uuid_storage(session.connection()) == {"category": 2, "category_closure": 3, "inventory": 0, "item": 1}
+    session.commit()
+    assert session.get(Category, child).parent_id == root
+    assert check_category_closure(session.connection()) == []
+    assert session.exec(text("SELECT DISTINCT typeof(id) FROM item")).all() == [("blob",)]
+    assert migrate_uuid_storage(session.connection()) == dict.fromkeys(("category", "category_closure", "inventory", "item"), 0)
+
+
+def test_startup_converts_text_ids(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    SQLModel.metadata.create_all(engine)
+    legacy = uuid4()
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO item (id, name, category, quantity) VALUES (:id, 'Legacy', 'Other', 1)"),
+            {"id": str(legacy)},
+        )
+    monkeypatch.setattr(database, "engine", engine)
+    database.create_db_and_tables()
+    with Session(engine) as session:
+        assert session.get(Item, legacy).name == "Legacy"
+    engine.dispose()
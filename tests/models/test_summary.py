@@ -0,0 +1,48 @@
+from sqlalchemy import text
+from sqlmodel import select
+
+from app.models.inventory import Inventory
+from app.models.item import Item
+from app.models.summary import SummaryCounter, check_summary_counters, rebuild_summary_counters
+
+
+def counters(session, source):
+    rows = session.exec(select(SummaryCounter).where(SummaryCounter.source == source)).all()
+    return {row.category: (row.count, row.quantity, row.value) for row in rows if row.count}
+
+
+def test_counters_follow_item_writes(session):
+    tv = Item(name="TV", category="Electronics", price=100.0, quantity=2)
+    apple = Item(name="Apple", category="Food", price=0.5, quantity=10)
+    session.add_all([tv, apple])
+    session.commit()
+    assert counters(session, "item") == {"Electronics": (1, 2, 200.0), "Food": (1, 10, 5.0)}
+
+    tv.quantity = 3
+    apple.category = "Other"
+    session.add_all([tv, apple])
+    session.commit()
+    assert counters(session, "item") == {"Electronics": (1, 3, 300.0), "Other": (1, 10, 5.0)}
+
+    session.delete(tv)
+    session.commit()
+    assert counters(session, "item") == {"Other": (1, 10, 5.0)}
+    assert check_summary_counters(session.connection()) == []
+
+
+def test_counters_follow_inventory_writes(session):
+    session.add_all([Inventory(name="Saw", category="Tools", quantity=2), Inventory(name="Nail", category="Tools")])
+    session.commit()
+    assert counters(session, "inventory") == {"Tools": (2, 2, 0.0)}
+
+
+def test_rebuild_repairs_drift(session):
+    session.add(Item(name="Book", category="Books", price=10.0, quantity=1))
+    session.commit()
+    session.exec(text("UPDATE summary_counter SET count = 7 WHERE source = 'item'"))
+    mismatches = check_summary_counters(session.connection())
+    assert [(m["source"], m["category"]) for m in mismatches] == [("item", "Books")]
+    rebuild_summary_counters(session.connection())
+    session.commit()
+    assert check_summary_counters(session.connection()) == []
+    assert counters(session, "item") == {"Books": (1, 1, 10.0)}